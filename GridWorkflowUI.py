@@ -7,6 +7,7 @@ import sys
 import json, jsonc
 
 from WorkflowStream import WorkflowStream, Stream, Task
+from RecipeCache import load_workflow
 
 from GridUI import GridController
 
@@ -39,6 +40,8 @@ if __name__ == "__main__":
 
     # Define arguments
     parser.add_argument("filename", help="recipe/workflow in json/jsonc format (required)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse and rebuild the recipe instead of using the compiled recipe cache (optional)")
+    parser.add_argument("--lazy", action="store_true", help="Only resolve the GoStream up front; other streams are resolved when first reached (optional, for very large recipes)")
 
     args = parser.parse_args()
         
@@ -55,15 +58,12 @@ if __name__ == "__main__":
 
 
     try:
-        with open(args.filename, "r") as file:
-            recipe_dict = jsonc.load(file)
-        w2 = WorkflowStream(args.filename, recipe_dict)
+        w2, warnings = load_workflow(args.filename, use_cache=not args.no_cache, lazy=args.lazy)
         print("w2.go_stream_name", w2.go_stream_name)
     except OSError as e:
         print(f"Uable to open Workflow file {args.filename}:\n{e}")
     except json.decoder.JSONDecodeError as e:
         print(f"Uable to interpret Workflow file {args.filename}:\n{e}")
-    warnings=w2.build()
     if warnings!=[]:
         print("Warnings building workflow from {args.filename}")
         print(warnings)
@@ -0,0 +1,243 @@
+import logging
+import argparse
+import json
+import re
+import sys
+import typing
+
+import jsonc
+
+from WorkflowStream import WorkflowStream
+from RecipeCache import _plain
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Several recipes cooked together as one meal, in one player session.
+merge_recipes() turns the recipe dictionaries into a single recipe dictionary:
+- every Stream is namespaced by its recipe ("Eggs_and_Soldiers.Eggs"), and Triggers are rewritten to match,
+  so Stream names from different recipes never collide; Stream titles get the recipe name in front
+- a synthetic GoStream ("Meal") has one task that triggers every recipe's GoStream: press Start and all
+  of the recipes begin (or, with the player's --finish-together, each is held until its planned start)
+- PreFlight/PostFlight (and Final) are merged key by key:
+  - Equipment lists: one entry per item; "Stove : 2" in one recipe and "Stove" in another is "Stove : 2"
+    (the kitchen is shared - WorkflowScheduler serializes the tasks that need it)
+  - Ingredients/Serving lists: one entry per item with the amounts added up when they are plain numbers
+    with the same unit ("Medium Eggs : 2" + "Medium Eggs : 2" -> "Medium Eggs : 4"), otherwise listed ("Salt : Pinch (x2) + 1 tsp");
+    an item written number first is added up the same way ("2 tomatoes" + "2 tomatoes" -> "4 tomatoes"), and one
+    with no amount at all is counted ("Salt" + "Salt" -> "Salt (x2)")
+  - an item that is Essential in one recipe isn't repeated under Optional
+  - other lists (Steps, LaterSteps, ...) are de-duplicated; text (Description) is joined
+The merged dictionary is an ordinary recipe, so everything else (timing, scheduling, the player) just works
+on it; Task Equipment is left as it is, since the recipes share the kitchen.
+
+    python3 MealMerger.py recipes/recipe-simple.jsonc recipes/recipe-eggs-toast-and-soldiers.jsonc [--output meal.jsonc]
+    python3 Workstream_Player.py recipes/recipe-simple.jsonc recipes/recipe-eggs-toast-and-soldiers.jsonc
+"""
+
+MEAL_GO_STREAM = "Meal"
+AMOUNT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([A-Za-z ]*?)\s*$")  # "2", "3 slices", "500ml"
+
+
+def recipe_prefix(name: str, taken: typing.Container) -> str:
+    """ A Stream name prefix for a recipe, from its name; made unique against taken """
+    prefix = re.sub(r"[^A-Za-z0-9_]+", "_", str(name)).strip("_") or "Recipe"
+    candidate, count = prefix, 1
+    while candidate in taken:
+        count += 1
+        candidate = f"{prefix}_{count}"
+    return candidate
+
+
+def _namespaced(names: typing.Any, prefix: str) -> typing.Any:
+    if isinstance(names, str):
+        return f"{prefix}.{names}"
+    if isinstance(names, list):
+        return [f"{prefix}.{name}" if isinstance(name, str) else name for name in names]
+    return names  # left for the build to warn about
+
+
+def _split_item(entry: typing.Any) -> typing.Tuple[str, str]:
+    name, _, amount = str(entry).partition(":")
+    return name.strip(), amount.strip()
+
+
+def _merge_equipment(lists: list) -> list:
+    counts = {}  # name -> count (None = just the one)
+    for entries in lists:
+        for entry in entries:
+            name, amount = _split_item(entry)
+            count = int(amount) if amount.isdigit() else None
+            if name not in counts or (count or 1) > (counts[name] or 1):
+                counts[name] = count
+    return [f"{name} : {count}" if count is not None else name for name, count in counts.items()]
+
+
+def _merge_amounts(lists: list) -> list:
+    amounts = {}   # name -> [amount, ...]
+    mentions = {}  # name -> how many times it is listed without an amount
+    counted = set()  # names written number first ("2 tomatoes") rather than "name : amount"
+    for entries in lists:
+        for entry in entries:
+            name, amount = _split_item(entry)
+            if ":" not in str(entry):
+                match = AMOUNT.match(name)
+                if match and match.group(2):
+                    name, amount = match.group(2), match.group(1)
+                    counted.add(name)
+            amounts.setdefault(name, [])
+            if amount:
+                amounts[name].append(amount)
+            else:
+                mentions[name] = mentions.get(name, 0) + 1
+    merged = []
+    for name, found in amounts.items():
+        totals = {}  # unit -> total, for plain numbers
+        listed = {}  # other amounts -> how many recipes need it
+        for amount in found:
+            match = AMOUNT.match(amount)
+            if match:
+                totals[match.group(2)] = totals.get(match.group(2), 0) + float(match.group(1))
+            else:
+                listed[amount] = listed.get(amount, 0) + 1
+        parts = [f"{total:g} {unit}".strip() for unit, total in totals.items()]
+        parts += [f"{amount} (x{count})" if count > 1 else amount for amount, count in listed.items()]
+        if name in counted and list(totals) == [""] and not listed:
+            merged.append(f"{totals['']:g} {name}")  # in the form it was written
+        elif parts:
+            merged.append(f"{name} : {' + '.join(parts)}")
+        else:
+            merged.append(f"{name} (x{mentions[name]})" if mentions[name] > 1 else name)
+    return merged
+
+
+def merge_sections(sections: list) -> dict:
+    """ Merges checklist-like dictionaries (PreFlight, PostFlight, Final) key by key """
+    merged = {}
+    keys = list(dict.fromkeys(key for section in sections for key in section))
+    for key in keys:
+        values = [section[key] for section in sections if section.get(key) is not None]
+        lists = [[value] if isinstance(value, str) else value for value in values if isinstance(value, (list, str))]
+        if all(isinstance(value, list) for value in values) or (key.endswith(("Equipment", "Ingredients", "Serving", "Steps")) and lists):
+            if key.endswith("Equipment"):
+                merged[key] = _merge_equipment(lists)
+            elif key.endswith(("Ingredients", "Serving")):
+                merged[key] = _merge_amounts(lists)
+            else:
+                merged[key] = list(dict.fromkeys(entry for entries in lists for entry in entries))
+        elif values and all(isinstance(value, str) for value in values):
+            merged[key] = "; ".join(dict.fromkeys(values))
+        elif values:
+            merged[key] = values[0]
+    # needed by one recipe is needed by the meal
+    for key in list(merged):
+        if key.startswith("Optional") and isinstance(merged[key], list):
+            essential = set(_split_item(entry)[0] for entry in merged.get("Essential" + key[len("Optional"):], []))
+            merged[key] = [entry for entry in merged[key] if _split_item(entry)[0] not in essential]
+    return merged
+
+
+def merge_recipes(recipes: list, name: typing.Optional[str] = None) -> dict:
+    """ recipes is a list of recipe dictionaries; returns one recipe dictionary for cooking them together """
+    streams = {}
+    go_triggers = []
+    recipe_names = []
+    prefixes = set([MEAL_GO_STREAM])
+    for recipe in recipes:
+        recipe_name = recipe.get("Identity", {}).get("Name", "Recipe") if isinstance(recipe.get("Identity"), dict) else "Recipe"
+        prefix = recipe_prefix(recipe_name, prefixes)
+        prefixes.add(prefix)
+        recipe_names.append(recipe_name)
+        if recipe.get("GoStream") is not None:
+            go_triggers.append(f"{prefix}.{recipe['GoStream']}")
+        for stream_name, stream in (recipe.get("Streams") or {}).items():
+            if not isinstance(stream, dict):
+                streams[f"{prefix}.{stream_name}"] = stream
+                continue
+            merged_stream = {}
+            for task_name, task in stream.items():
+                if task_name == "Settings" and isinstance(task, dict):
+                    settings = dict(task)
+                    settings["Title"] = f"{recipe_name}: {task.get('Title') or stream_name}"
+                    merged_stream[task_name] = settings
+                elif isinstance(task, dict) and "Trigger" in task:
+                    merged_stream[task_name] = dict(task, Trigger=_namespaced(task["Trigger"], prefix))
+                else:
+                    merged_stream[task_name] = task
+            if "Settings" not in merged_stream:
+                merged_stream = {"Settings": {"Title": f"{recipe_name}: {stream_name}"}, **merged_stream}
+            streams[f"{prefix}.{stream_name}"] = merged_stream
+
+    meal_name = name or " + ".join(recipe_names)
+    streams = {MEAL_GO_STREAM: {
+        "Settings": {"Title": meal_name},
+        "Start": {
+            "Title": "Start the meal",
+            "Type": "Active",
+            "Steps": [f"Start {recipe_name}" for recipe_name in recipe_names],
+            "DurationSeconds": 0,
+            "Autoprogress": True,
+            "Trigger": go_triggers,
+        }}, **streams}
+    merged = {
+        "Identity": {"Name": meal_name, "Type": "Meal", "Recipes": recipe_names},
+        "GoStream": MEAL_GO_STREAM,
+    }
+    for section in ("PreFlight", "PostFlight", "Final"):
+        found = [recipe[section] for recipe in recipes if isinstance(recipe.get(section), dict)]
+        if found:
+            merged[section] = merge_sections(found)
+    merged["Streams"] = streams
+    return merged
+
+
+def read_recipe(filename: str) -> dict:
+    with open(filename, "r", encoding="utf-8") as file:
+        return _plain(jsonc.loads(file.read()))
+
+
+def load_meal(filenames: typing.Iterable[str], lazy: bool = False, name: typing.Optional[str] = None) -> typing.Tuple[WorkflowStream, list]:
+    """ Builds one WorkflowStream cooking all of the recipes; raises as load_workflow does """
+    filenames = list(filenames)
+    merged = merge_recipes([read_recipe(filename) for filename in filenames], name=name)
+    w = WorkflowStream(" + ".join(filenames), merged)
+    warnings = w.build(lazy=lazy)
+    return w, warnings
+
+
+if __name__ == "__main__":
+    from WorkflowScheduler import ResourceSchedule
+    from WorkflowTiming import _minutes
+
+    parser = argparse.ArgumentParser(description="Merges several recipes into one meal: namespaced streams, one PreFlight/PostFlight and one schedule")
+    parser.add_argument("filenames", nargs="+", help="recipes/workflows in json/jsonc format")
+    parser.add_argument("--name", help="name of the meal (default: the recipe names joined with +)")
+    parser.add_argument("--output", help="write the merged recipe here, to run or edit later")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    w, warnings = load_meal(args.filenames, name=args.name)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(w.dictionary, file, indent=4)
+        print(f"Wrote {args.output}")
+    for warning in warnings + w.check_workflow_for_issues():
+        print(f"warning: {warning}")
+    pre = w.dictionary.get("PreFlight", {})
+    for key in ("EssentialEquipment", "EssentialIngredients"):
+        if pre.get(key):
+            print(f"{key}: {', '.join(pre[key])}")
+    schedule = ResourceSchedule(w)
+    print(f"{w.name}: {_minutes(schedule.makespan)} with {schedule._constraint()}, {_minutes(schedule.unconstrained_makespan)} unconstrained")
+    for warning in schedule.warnings():
+        print(f"  {warning}")
+    for task in schedule.tasks:
+        print(f"{_minutes(schedule.start[task.fullname]):>7} {_minutes(schedule.finish[task.fullname]):>7}  {task.fullname}  ({task.type})")
@@ -0,0 +1,276 @@
+import logging
+import argparse
+import json
+import os
+import sys
+import typing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # only needed here; the rest of the app runs without it
+
+from WorkflowTiming import _minutes
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Monte Carlo estimate of how long a recipe really takes, and how likely each task is to go Red.
+Every task's real duration is drawn from a distribution:
+- recorded history (the player's --history file) for that task, if there is any - resampled as recorded
+- otherwise the recipe's DurationMinSeconds/DurationMaxSeconds hint: triangular from min via DurationSeconds to max
+- otherwise a default spread by type: Active tasks are done by hand and overrun more often than they
+  finish early (DEFAULT_SPREAD); Background tasks vary a little; Autoprogress tasks take exactly their time
+A batch of runs is sampled at once - a (runs x tasks) array - and pushed through the trigger DAG one Stream
+at a time: a Stream starts when its triggering task finishes (a column of the array), and its tasks finish
+at that start plus the cumulative sum of their durations. So the Python work is per Stream and the
+per-run work is all NumPy. Batches are independent (each has its own seed from one SeedSequence, so the
+result doesn't depend on how they are shared out) and can be spread over a process pool.
+A task crosses its Red threshold when its real duration is at least DurationSeconds - Red (the countdown
+reaches Red); tasks without a Red threshold, and Autoprogress tasks (they move on at zero), never do.
+The results: the distribution of total time (percentiles give realistic serve times), and for each task
+the chance of going Red or overrunning, and the Red value that would be crossed one time in ten.
+
+    python3 MonteCarlo.py recipes/recipe-eggs-toast-and-soldiers.jsonc [--runs 20000] [--history history.jsonl] [--workers 4] [--json]
+"""
+
+# (low, high) multiples of DurationSeconds for tasks with no hint or history
+DEFAULT_SPREAD = {"Active": (0.8, 1.5), "Background": (0.95, 1.1)}
+PERCENTILES = (50, 80, 90, 95, 99)
+
+
+def load_history(filename: str, recipe_name: typing.Optional[str] = None) -> dict:
+    """
+    Task fullname -> recorded durations in seconds. Reads the player's --history JSON lines
+    ({"recipe", "task", "seconds", ...}; only lines for recipe_name if given), or a JSON {fullname: [seconds, ...]}
+    """
+    history = {}
+    with open(filename, "r", encoding="utf-8") as file:
+        text = file.read()
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        document = None
+    if isinstance(document, dict):
+        for fullname, seconds in document.items():
+            history.setdefault(fullname, []).extend(float(value) for value in seconds)
+        return history
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if recipe_name is not None and record.get("recipe", recipe_name) != recipe_name:
+                continue
+            history.setdefault(record["task"], []).append(float(record["seconds"]))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"{filename}:{line_number}: skipping unreadable history record: {e}")
+    return history
+
+
+def duration_source(task) -> str:
+    """ Where a task's duration distribution comes from, when there is no history for it """
+    if task.Autoprogress:
+        return "fixed"
+    if task.duration_min or task.duration_max:
+        return "hint"
+    return "default"
+
+
+def duration_range(task) -> typing.Tuple[float, float]:
+    """ (low, high) of a task's real duration, triangular with the mode at DurationSeconds """
+    duration = max(task.duration, 0)
+    source = duration_source(task)
+    if source == "hint":
+        return task.duration_min or duration, task.duration_max or duration
+    if source == "default":
+        spread_low, spread_high = DEFAULT_SPREAD.get(task.type, (1.0, 1.0))
+        return duration * spread_low, duration * spread_high
+    return duration, duration
+
+
+class MonteCarloModel:
+    """ The sampling distributions and trigger structure of a workflow, as arrays (picklable, for worker processes) """
+    def __init__(self, w, history: typing.Optional[dict] = None):
+        if np is None:
+            raise ImportError("MonteCarlo needs numpy; pip install numpy")
+        timing = w.timing()
+        history = history or {}
+        self.tasks = []             # fullnames, Stream by Stream in trigger order
+        self.stream_names = []
+        self.stream_slices = []     # (first, end) task columns of each Stream
+        self.stream_trigger = []    # column of the task that starts each Stream, -1 for the GoStream
+        planned, low, high, red, autoprogress, source = [], [], [], [], [], []
+        column = {}
+        for stream in w.topological_order:
+            if stream.name not in timing.stream_start:
+                continue
+            trigger = timing.started_by.get(stream.name)
+            self.stream_names.append(stream.name)
+            self.stream_trigger.append(column[trigger.fullname] if trigger is not None else -1)
+            first = len(self.tasks)
+            for task in stream.task_list:
+                column[task.fullname] = len(self.tasks)
+                self.tasks.append(task.fullname)
+                duration = max(task.duration, 0)
+                planned.append(duration)
+                red.append(task.red)
+                autoprogress.append(task.Autoprogress)
+                if task.fullname in history and history[task.fullname]:
+                    source.append("history")
+                    low.append(duration)
+                    high.append(duration)
+                    continue
+                source.append(duration_source(task))
+                task_low, task_high = duration_range(task)
+                low.append(task_low)
+                high.append(task_high)
+            self.stream_slices.append((first, len(self.tasks)))
+        self.planned = np.array(planned, dtype=np.float64)
+        self.low = np.array(low, dtype=np.float64)
+        self.high = np.array(high, dtype=np.float64)
+        self.red = np.array(red, dtype=np.float64)
+        self.autoprogress = np.array(autoprogress, dtype=bool)
+        self.source = source
+        self.triangular = np.flatnonzero(self.high > self.low)
+        # history is resampled from a padded (tasks with history x most samples) array
+        self.history_columns = np.array([index for index, kind in enumerate(source) if kind == "history"], dtype=np.int64)
+        samples = [history[self.tasks[index]] for index in self.history_columns]
+        self.history_counts = np.array([len(values) for values in samples], dtype=np.int64)
+        self.history_values = np.zeros((len(samples), max((len(values) for values in samples), default=0)))
+        for row, values in enumerate(samples):
+            self.history_values[row, :len(values)] = values
+
+    def sample_durations(self, rng, runs: int):
+        """ (runs x tasks) real durations """
+        durations = np.broadcast_to(self.planned, (runs, len(self.tasks))).copy()
+        if len(self.triangular):
+            columns = self.triangular
+            durations[:, columns] = rng.triangular(self.low[columns], np.clip(self.planned[columns], self.low[columns], self.high[columns]),
+                                                   self.high[columns], size=(runs, len(columns)))
+        if len(self.history_columns):
+            picks = (rng.random((runs, len(self.history_columns))) * self.history_counts).astype(np.int64)
+            durations[:, self.history_columns] = self.history_values[np.arange(len(self.history_columns)), picks]
+        return durations
+
+    def finish_times(self, durations):
+        """ (runs x tasks) finish times through the trigger DAG """
+        finish = np.empty_like(durations)
+        for (first, end), trigger in zip(self.stream_slices, self.stream_trigger):
+            if first == end:
+                continue
+            start = finish[:, trigger] if trigger >= 0 else 0.0
+            finish[:, first:end] = np.cumsum(durations[:, first:end], axis=1) + (start[:, None] if trigger >= 0 else 0.0)
+        return finish
+
+    def crosses_red(self, durations):
+        """ (runs x tasks) True where a task's countdown reaches its Red threshold """
+        return (durations >= self.planned - self.red) & (self.red > 0) & ~self.autoprogress
+
+
+def _run_batch(model: MonteCarloModel, runs: int, seed) -> dict:
+    """ One batch of runs; in a worker process when spread over a pool """
+    rng = np.random.default_rng(seed)
+    durations = model.sample_durations(rng, runs)
+    finish = model.finish_times(durations)
+    return {
+        "totals": finish.max(axis=1) if finish.shape[1] else np.zeros(runs),
+        "red": model.crosses_red(durations).sum(axis=0),
+        "overrun": (durations > model.planned).sum(axis=0),
+        "duration_sum": durations.sum(axis=0),
+        "duration_p90": np.percentile(durations, 90, axis=0) if runs else model.planned,
+    }
+
+
+class MonteCarloResult:
+    def __init__(self, model: MonteCarloModel, batches: list, planned_makespan: int):
+        self.model = model
+        self.planned_makespan = planned_makespan
+        self.totals = np.concatenate([batch["totals"] for batch in batches])
+        self.runs = len(self.totals)
+        self.p_red = sum(batch["red"] for batch in batches) / self.runs
+        self.p_overrun = sum(batch["overrun"] for batch in batches) / self.runs
+        self.mean_duration = sum(batch["duration_sum"] for batch in batches) / self.runs
+        # every batch is the same size (bar the last), so the mean of the batch percentiles is close enough
+        self.duration_p90 = np.mean([batch["duration_p90"] for batch in batches], axis=0)
+
+    def percentiles(self) -> dict:
+        return {percentile: float(value) for percentile, value in zip(PERCENTILES, np.percentile(self.totals, PERCENTILES))}
+
+    def p_on_time(self, seconds: float) -> float:
+        """ Chance everything is done within seconds """
+        return float((self.totals <= seconds).mean())
+
+    def suggested_red(self) -> list:
+        """ Per task, the Red threshold a run would reach one time in ten (DurationSeconds - 90th percentile duration) """
+        return np.maximum(self.model.planned - self.duration_p90, 0).round().astype(int).tolist()
+
+    def report(self) -> dict:
+        suggested = self.suggested_red()
+        return {
+            "runs": self.runs,
+            "planned_makespan": self.planned_makespan,
+            "mean": float(self.totals.mean()),
+            "std": float(self.totals.std()),
+            "percentiles": self.percentiles(),
+            "p_on_time": self.p_on_time(self.planned_makespan),
+            "tasks": {fullname: {"source": self.model.source[index], "planned": float(self.model.planned[index]),
+                                 "mean": float(self.mean_duration[index]), "p_red": float(self.p_red[index]),
+                                 "p_overrun": float(self.p_overrun[index]), "suggested_red": suggested[index]}
+                      for index, fullname in enumerate(self.model.tasks)},
+        }
+
+
+def run_monte_carlo(w, runs: int = 10000, history: typing.Optional[dict] = None, workers: typing.Optional[int] = None,
+                    batch_size: int = 2000, seed: int = 0) -> MonteCarloResult:
+    """ workers > 1 spreads the batches over a process pool; the result is the same either way """
+    if runs < 1:
+        raise ValueError(f"Need at least one run to estimate from, not {runs}")
+    model = MonteCarloModel(w, history)
+    sizes = [min(batch_size, runs - done) for done in range(0, runs, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is not None and workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(_run_batch, [model] * len(sizes), sizes, seeds))
+    else:
+        batches = [_run_batch(model, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+    return MonteCarloResult(model, batches, w.timing().makespan)
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+
+    parser = argparse.ArgumentParser(description="Estimates how long a recipe really takes and how likely each task is to go Red, by sampling task durations")
+    parser.add_argument("filename", help="recipe/workflow in json/jsonc format")
+    parser.add_argument("--runs", type=int, default=10000, help="number of simulated runs (default 10000)")
+    parser.add_argument("--history", help="recorded task durations: the player's --history file, or JSON {task fullname: [seconds, ...]}")
+    parser.add_argument("--workers", type=int, default=None, help=f"spread the runs over this many processes (default: one; this machine has {os.cpu_count()} cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the full result as JSON")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    w, warnings = load_workflow(args.filename)
+    history = load_history(args.history, w.name) if args.history else None
+    result = run_monte_carlo(w, args.runs, history, workers=args.workers, seed=args.seed)
+    if args.json:
+        print(json.dumps(result.report(), indent=2))
+        sys.exit(0)
+    print(f"{w.name}: planned {_minutes(result.planned_makespan)}; done on time in {result.p_on_time(result.planned_makespan):.0%} of {result.runs} runs")
+    print("  total time: " + ", ".join(f"p{percentile} {_minutes(int(round(value)))}" for percentile, value in result.percentiles().items()))
+    print(f"{'task':40} {'source':8} {'planned':>7} {'mean':>7} {'red':>5} {'overrun':>7} {'red for 10%':>11}")
+    suggested = result.suggested_red()
+    for index, fullname in enumerate(result.model.tasks):
+        print(f"{fullname:40} {result.model.source[index]:8} {_minutes(int(result.model.planned[index])):>7} "
+              f"{_minutes(int(round(result.mean_duration[index]))):>7} {result.p_red[index]:>5.0%} {result.p_overrun[index]:>7.0%} {suggested[index]:>11}")
@@ -0,0 +1,180 @@
+import logging
+import argparse
+import contextlib
+import copy
+import io
+import json
+import sys
+import typing
+from dataclasses import dataclass, field
+
+from WorkflowStream import WorkflowStream, Helper
+from WorkflowScheduler import ResourceSchedule
+from WorkflowTiming import _minutes
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Parallelization advice for recipe authors.
+Recipes tend to be written as one long Stream of tasks, so a task that only needs waiting for (a Background
+task - the kettle boiling, the potato in the microwave) holds up everything after it. The advisor tries two
+kinds of edit on a copy of the recipe dictionary and keeps the ones that shorten the recipe:
+- split: move a Background task into a Stream of its own, triggered by the task before it, so the rest of
+  its Stream carries straight on (its own Triggers move with it)
+- trigger earlier: have a Stream started by an earlier task of the same Stream
+Each edited recipe is built and timed again (WorkflowStream.timing()), so the saving is the real change in
+makespan - and the makespan with one cook and the equipment (WorkflowScheduler) is given alongside, since
+the cook's hands often can't follow. Only the author knows whether the later tasks really need the one
+being moved (the eggs can't go in until the kettle has boiled), so these are suggestions, best first.
+
+    python3 ParallelAdvisor.py recipes/recipe-simple.jsonc [--json] [--output improved.jsonc --apply 1]
+"""
+
+
+@dataclass
+class Suggestion:
+    kind: str               # "split" or "trigger earlier"
+    description: str
+    makespan: int           # after the change
+    saving: int             # seconds, unconstrained
+    scheduled_saving: int   # seconds, with one cook and the equipment
+    dictionary: dict = field(repr=False, default_factory=dict)  # the edited recipe
+
+
+def _trigger_list(task_dict: dict) -> list:
+    trigger = task_dict.get("Trigger")
+    if isinstance(trigger, str):
+        return [trigger]
+    return list(trigger) if isinstance(trigger, list) else []
+
+
+def _time(dictionary: dict) -> typing.Optional[typing.Tuple[int, int]]:
+    """ (makespan, makespan with one cook and the equipment) of a recipe dictionary, or None if it doesn't build """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            w = WorkflowStream("advice", dictionary)
+            w.build()
+        if w.graph_issues["cycles"] or w.graph_issues["unreachable"]:
+            return None
+        return w.timing().makespan, ResourceSchedule(w).makespan
+    except (ValueError, KeyError) as e:
+        logger.info(f"Candidate edit doesn't build: {e}")
+        return None
+
+
+class ParallelAdvisor:
+    def __init__(self, w):
+        self.workflow_name = w.name
+        self.dictionary = w.dictionary
+        timing = w.timing()
+        self.makespan = timing.makespan
+        self.scheduled_makespan = ResourceSchedule(w).makespan
+        self.suggestions = []
+        for stream in w.stream_list:
+            if stream.name not in timing.stream_start:
+                continue
+            for task in stream.task_list:
+                if task.type == "Background" and task.duration > 0 and task.task_next is not None:
+                    self._consider(self._split(w, stream, task, timing))
+                for triggered_stream in task.trigger_stream_list:
+                    if timing.started_by.get(triggered_stream.name) is task:
+                        self._consider(self._trigger_earlier(w, stream, task, triggered_stream))
+        self.suggestions.sort(key=lambda suggestion: (-suggestion.saving, -suggestion.scheduled_saving))
+
+    def _consider(self, candidate: typing.Optional[Suggestion]):
+        if candidate is not None and candidate.saving > 0:
+            self.suggestions.append(candidate)
+
+    def _edited(self, dictionary: dict, kind: str, description: str) -> typing.Optional[Suggestion]:
+        times = _time(dictionary)
+        if times is None:
+            return None
+        makespan, scheduled = times
+        return Suggestion(kind, description, makespan, self.makespan - makespan, self.scheduled_makespan - scheduled, dictionary)
+
+    def _split(self, w, stream, task, timing) -> typing.Optional[Suggestion]:
+        # who starts the new Stream: the task before, or whatever starts this Stream if it is the first
+        starter = task.task_previous
+        if starter is None:
+            starter = timing.started_by.get(stream.name)
+            if starter is None:  # the first task of the GoStream can't be moved off it
+                return None
+        starter_stream = starter.fullname.partition("/")[0]
+        new_name = f"{stream.name}_{task.name}"
+        while new_name in w.stream_name_to_stream_reference_map:
+            new_name += "_"
+        if not Helper._is_name_OK(new_name):
+            return None
+        dictionary = copy.deepcopy(self.dictionary)
+        streams = dictionary["Streams"]
+        moved = streams[stream.name].pop(task.name)
+        streams[new_name] = {task.name: moved}
+        starter_dict = streams[starter_stream][starter.name]
+        starter_dict["Trigger"] = _trigger_list(starter_dict) + [new_name]
+        return self._edited(dictionary, "split",
+                            f"Move Background task '{task.fullname}' ({_minutes(task.duration)}) into its own Stream '{new_name}', "
+                            f"triggered by '{starter.fullname}', so '{task.task_next.fullname}' doesn't wait for it")
+
+    def _trigger_earlier(self, w, stream, task, triggered_stream) -> typing.Optional[Suggestion]:
+        best = None
+        earlier = task.task_previous
+        while earlier is not None:
+            dictionary = copy.deepcopy(self.dictionary)
+            task_dicts = dictionary["Streams"][stream.name]
+            task_dicts[task.name]["Trigger"] = [name for name in _trigger_list(task_dicts[task.name]) if name != triggered_stream.name]
+            task_dicts[earlier.name]["Trigger"] = _trigger_list(task_dicts[earlier.name]) + [triggered_stream.name]
+            candidate = self._edited(dictionary, "trigger earlier",
+                                     f"Start Stream '{triggered_stream.name}' from '{earlier.fullname}' instead of '{task.fullname}'")
+            # the latest task that saves the most: the smallest change for the saving
+            if candidate is not None and (best is None or candidate.saving > best.saving):
+                best = candidate
+            earlier = earlier.task_previous
+        return best
+
+    def report(self) -> dict:
+        return {
+            "workflow": self.workflow_name,
+            "makespan": self.makespan,
+            "scheduled_makespan": self.scheduled_makespan,
+            "suggestions": [{"kind": suggestion.kind, "description": suggestion.description, "makespan": suggestion.makespan,
+                             "saving": suggestion.saving, "scheduled_saving": suggestion.scheduled_saving}
+                            for suggestion in self.suggestions],
+        }
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+
+    parser = argparse.ArgumentParser(description="Suggests edits that let a recipe's streams run in parallel, and how much time each saves")
+    parser.add_argument("filename", help="recipe/workflow in json/jsonc format")
+    parser.add_argument("--json", action="store_true", help="print the suggestions as JSON")
+    parser.add_argument("--apply", type=int, default=1, help="with --output, the suggestion to apply (default 1, the best)")
+    parser.add_argument("--output", help="write the recipe with one suggestion applied here")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    w, warnings = load_workflow(args.filename)
+    advisor = ParallelAdvisor(w)
+    if args.json:
+        print(json.dumps(advisor.report(), indent=2))
+    else:
+        print(f"{w.name}: {_minutes(advisor.makespan)} ({_minutes(advisor.scheduled_makespan)} with one cook and the equipment)")
+        if not advisor.suggestions:
+            print("  no edit found that makes it shorter")
+        for number, suggestion in enumerate(advisor.suggestions, 1):
+            print(f"{number:3}. saves {_minutes(suggestion.saving)} ({_minutes(suggestion.scheduled_saving)} with one cook): {suggestion.description}")
+    if args.output:
+        if not 1 <= args.apply <= len(advisor.suggestions):
+            print(f"No suggestion {args.apply} to apply")
+            sys.exit(1)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(advisor.suggestions[args.apply - 1].dictionary, file, indent=4)
+        print(f"Wrote {args.output} with suggestion {args.apply} applied")
@@ -0,0 +1,197 @@
+import logging
+import jsonc, json
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import typing
+
+from WorkflowStream import WorkflowStream, Helper
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Compiled recipe cache.
+Opening a recipe means jsonc parsing, building every Stream/Task and linking the triggers; for a big
+library that is most of the start-up time. The cache keeps the built (linked) WorkflowStream, plus its
+build warnings, pickled on disk, keyed by the hash of the recipe file contents, so a warm start
+just reads one file and skips parsing and linking entirely.
+- The key also includes CACHE_FORMAT_VERSION and a fingerprint of WorkflowStream.py, so changing the
+  model code invalidates old entries without anyone having to remember to clear the cache.
+- The Identity ID/Name/Version of the recipe is stored in the entry, along with the source filename, for anyone
+  looking through the cache; it needs no check on load, as the content hash in the key already covers it.
+- Entries are pickles; only point the cache at a folder you own.
+"""
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "workflow-app", "recipes")
+
+
+def _plain(item: typing.Any) -> typing.Any:
+    """
+    jsonc gives back JSONCDict/JSONCList (which don't pickle); swap them for plain dict/list.
+    Strings are interned on the way, so the dictionary shares its text with the built Tasks (see SharedText)
+    """
+    if isinstance(item, dict):
+        return {sys.intern(key) if type(key) is str else key: _plain(value) for key, value in item.items()}
+    if isinstance(item, (list, jsonc.JSONCList)):
+        return [_plain(value) for value in item]
+    if type(item) is str:
+        return sys.intern(item)
+    return item
+
+
+def _intern_in_place(item: typing.Any, seen: set):
+    """ Re-shares the text of an unpickled recipe dictionary (pickle only shares it within one file) """
+    if id(item) in seen:
+        return
+    seen.add(id(item))
+    if isinstance(item, dict):
+        items = [(sys.intern(key) if type(key) is str else key, value) for key, value in item.items()]
+        item.clear() # re-insert, since assigning to an existing key keeps the old key object
+        for key, value in items:
+            item[key] = sys.intern(value) if type(value) is str else value
+            _intern_in_place(value, seen)
+    elif isinstance(item, list):
+        for index, value in enumerate(item):
+            if type(value) is str:
+                item[index] = sys.intern(value)
+            else:
+                _intern_in_place(value, seen)
+
+
+def recipe_identity(recipe_dict: dict) -> dict:
+    identity = Helper._get_item_from_dict(recipe_dict, "Identity", default={})
+    if not isinstance(identity, dict):
+        identity = {}
+    return {field: str(identity.get(field, "")) for field in ("ID", "Name", "Version")}
+
+
+_model_fingerprint = None
+
+def _get_model_fingerprint() -> str:
+    global _model_fingerprint
+    if _model_fingerprint is None:
+        model_file = sys.modules[WorkflowStream.__module__].__file__
+        with open(model_file, "rb") as file:
+            _model_fingerprint = hashlib.sha256(file.read()).hexdigest()
+    return _model_fingerprint
+
+
+class RecipeCache:
+    # refresh=True ignores existing entries but still writes new ones (i.e. force a recompile)
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, enabled: bool = True, refresh: bool = False):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, content: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"format:{CACHE_FORMAT_VERSION};model:{_get_model_fingerprint()};".encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def load(self, filename: str, lazy: bool = False, keep_dictionaries: bool = True) -> typing.Tuple[WorkflowStream, list]:
+        """
+        Returns a built WorkflowStream and its build warnings, from the cache if possible.
+        Raises the same errors as opening the recipe directly (OSError, JSONDecodeError, ValueError).
+        Cache entries are always fully built; lazy only applies on a cache miss, and a lazily built
+        workflow is not cached since its warnings only cover the GoStream.
+        keep_dictionaries=False drops the raw json once the workflow is loaded (see WorkflowStream.build), to keep
+        many recipes resident in less memory; cache entries always keep it.
+        """
+        w, warnings = self._load(filename, lazy)
+        if not keep_dictionaries:
+            w.drop_dictionaries()
+        return w, warnings
+
+    def _load(self, filename: str, lazy: bool) -> typing.Tuple[WorkflowStream, list]:
+        with open(filename, "rb") as file:
+            content = file.read()
+        key = self.key_for(content)
+        if self.enabled and not self.refresh:
+            entry = self._read_entry(key)
+            if entry is not None:
+                _intern_in_place(entry["workflow"].dictionary, set())
+                logger.info(f"Loaded compiled recipe {filename} from cache {self.path_for(key)}")
+                self.hits += 1
+                return entry["workflow"], entry["warnings"]
+
+        self.misses += 1
+        w, warnings = self.compile(filename, content, lazy=lazy)
+        if self.enabled and not lazy:
+            self._write_entry(key, filename, w, warnings)
+        return w, warnings
+
+    def compile(self, filename: str, content: bytes, lazy: bool = False) -> typing.Tuple[WorkflowStream, list]:
+        recipe_dict = _plain(jsonc.loads(content.decode("utf-8")))
+        w = WorkflowStream(filename, recipe_dict)
+        warnings = w.build(lazy=lazy)
+        return w, warnings
+
+    def _read_entry(self, key: str) -> typing.Optional[dict]:
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+        except Exception as e:  # a corrupt or stale entry is only ever a cache miss
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+        if not isinstance(entry, dict) or entry.get("format") != CACHE_FORMAT_VERSION:
+            logger.warning(f"Ignoring cache entry {path} with an old format")
+            return None
+        return entry
+
+    def _write_entry(self, key: str, filename: str, w: WorkflowStream, warnings: list):
+        entry = {
+            "format": CACHE_FORMAT_VERSION,
+            "identity": recipe_identity(w.dictionary),
+            "source": filename,
+            "workflow": w,
+            "warnings": warnings,
+        }
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temp file then rename, so a crash never leaves a half-written entry behind
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path_for(key))
+            logger.info(f"Cached compiled recipe {filename} as {self.path_for(key)}")
+        except (OSError, pickle.PicklingError, RecursionError) as e:
+            logger.warning(f"Unable to cache compiled recipe {filename}: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def load_workflow(filename: str, use_cache: bool = True, cache_dir: str = DEFAULT_CACHE_DIR, lazy: bool = False,
+                  keep_dictionaries: bool = True) -> typing.Tuple[WorkflowStream, list]:
+    return RecipeCache(cache_dir, enabled=use_cache).load(filename, lazy=lazy, keep_dictionaries=keep_dictionaries)
+
+
+if __name__ == "__main__":
+    import time
+    file_name = sys.argv[1] if len(sys.argv) > 1 else "recipes/recipe-eggs-toast-and-soldiers.jsonc"
+    cache = RecipeCache()
+    for attempt in ("cold/warm", "warm"):
+        start = time.perf_counter()
+        w, warnings = cache.load(file_name)
+        print(f"{attempt}: loaded '{w.name}' in {1000 * (time.perf_counter() - start):.2f}ms; warnings {warnings}")
+    w.display()
@@ -0,0 +1,147 @@
+import logging
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from RecipeCache import RecipeCache, DEFAULT_CACHE_DIR
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Headless batch compiler for a library (directory tree) of recipes.
+Each recipe is built in its own worker process (one per core by default), which also writes its compiled
+recipe cache entry, so the player/grid open them warm afterwards. The per-file warnings from build() -
+duplicate tasks, unknown trigger streams, invalid names etc - are gathered into one combined report.
+
+    python3 RecipeCompiler.py recipes/ --report recipe_report.json
+"""
+
+RECIPE_EXTENSIONS = (".jsonc", ".json")
+
+
+def find_recipes(directory: str) -> list:
+    recipes = []
+    for folder, subfolders, files in os.walk(directory):
+        subfolders[:] = sorted(subfolder for subfolder in subfolders if not subfolder.startswith("."))
+        for file_name in sorted(files):
+            if file_name.lower().endswith(RECIPE_EXTENSIONS):
+                recipes.append(os.path.join(folder, file_name))
+    return recipes
+
+
+def _flatten_warnings(warnings: typing.Any) -> list:
+    # build() returns a mix of strings and per-stream lists of strings
+    if warnings is None:
+        return []
+    if isinstance(warnings, str):
+        return [warnings]
+    flat = []
+    for warning in warnings:
+        flat.extend(_flatten_warnings(warning))
+    return flat
+
+
+def _init_worker():
+    # the model classes log/print a lot while building; the report carries anything that matters
+    for name in ("WorkflowStream", "RecipeCache"):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+
+def compile_recipe(filename: str, cache_dir: str = DEFAULT_CACHE_DIR, refresh: bool = False) -> dict:
+    """ Builds one recipe (through the cache) and returns a report entry; runs in a worker process """
+    result = {"file": filename, "name": None, "seconds": 0.0, "cached": False, "warnings": [], "error": None}
+    cache = RecipeCache(cache_dir, refresh=refresh)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            w, warnings = cache.load(filename)
+            warnings = _flatten_warnings(warnings) + _flatten_warnings(w.check_workflow_for_issues())
+        result["name"] = w.name
+        result["warnings"] = warnings
+        result["cached"] = cache.hits > 0
+    except Exception as e:  # one bad recipe mustn't stop the rest of the library
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def compile_library(recipes: list, cache_dir: str = DEFAULT_CACHE_DIR, workers: typing.Optional[int] = None,
+                    refresh: bool = False, progress: typing.Optional[typing.Callable] = None) -> list:
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(compile_recipe, filename, cache_dir, refresh) for filename in recipes]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if progress:
+                progress(result)
+    results.sort(key=lambda result: result["file"])
+    return results
+
+
+def _print_result(result: dict):
+    if result["error"]:
+        status = "ERROR"
+    elif result["warnings"]:
+        status = f"{len(result['warnings'])} warning(s)"
+    else:
+        status = "OK"
+    source = "cache" if result["cached"] else "built"
+    print(f"{1000 * result['seconds']:9.1f}ms  {source:5}  {status:14}  {result['file']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds every recipe in a directory in parallel, filling the compiled recipe cache and reporting build warnings")
+    parser.add_argument("directory", help="folder to search (recursively) for .jsonc/.json recipes")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes (default: one per core)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"compiled recipe cache folder (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--force", action="store_true", help="rebuild every recipe even if it is already in the cache")
+    parser.add_argument("--report", default="recipe_report.json", help="combined warnings report to write (JSON)")
+    args = parser.parse_args()
+
+    recipes = find_recipes(args.directory)
+    if not recipes:
+        logger.error(f"No recipes found in {args.directory}")
+        sys.exit(1)
+    print(f"Compiling {len(recipes)} recipes from {args.directory} using {args.workers or os.cpu_count()} workers")
+
+    start = time.perf_counter()
+    results = compile_library(recipes, args.cache_dir, args.workers, args.force, progress=_print_result)
+    elapsed = time.perf_counter() - start
+
+    errors = [result for result in results if result["error"]]
+    with_warnings = [result for result in results if result["warnings"]]
+    report = {
+        "directory": args.directory,
+        "recipes": len(results),
+        "errors": len(errors),
+        "with_warnings": len(with_warnings),
+        "wall_seconds": elapsed,
+        "cpu_seconds": sum(result["seconds"] for result in results),
+        "results": results,
+    }
+    with open(args.report, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"\n{len(results)} recipes in {elapsed:.2f}s ({report['cpu_seconds']:.2f}s of build time); "
+          f"{len(errors)} with errors, {len(with_warnings)} with warnings; report written to {args.report}")
+    for result in errors:
+        print(f"ERROR   {result['file']}: {result['error']}")
+    for result in with_warnings:
+        for warning in result["warnings"]:
+            print(f"WARNING {result['file']}: {warning}")
+    sys.exit(1 if errors else 0)
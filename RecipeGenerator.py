@@ -0,0 +1,193 @@
+import logging
+import argparse
+import collections
+import json
+import random
+import sys
+import typing
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Synthetic recipes of any size and shape, for benchmarks and for trying the tools on something bigger than a real meal.
+The Streams form a trigger tree under the GoStream (Stream_0): breadth first, each Stream triggers up to
+fanout others (spread over its tasks), and no Stream is more than depth triggers from the GoStream - so
+fanout=1 is one long chain, a large fanout is a flat fan of Streams all started from the GoStream.
+Every Stream is reachable and triggered once, so the recipe builds without warnings.
+The optional task fields (OPTIONAL_FIELDS) can be left out to get the smallest recipe the parser accepts, or
+all put in to exercise every field decoder; durations are random but repeatable (seed).
+The output is JSONC - with // comments, as a hand written recipe has - that jsonc (and RecipeCache/load_workflow) reads.
+
+    python3 RecipeGenerator.py out.jsonc --streams 100 --tasks 10 --fanout 3 [--depth 5] [--fields Steps Type] [--seed 1]
+"""
+
+# the optional task fields; Check is CheckEverySeconds+CheckMessage, Colours is Green/Amber/Red,
+# DurationRange is DurationMinSeconds/DurationMaxSeconds
+OPTIONAL_FIELDS = ("Title", "Description", "Steps", "Type", "Stakes", "Autoprogress", "StartMessage",
+                   "Check", "Colours", "DurationRange", "Equipment", "Settings")
+EQUIPMENT = {"Stove": 4, "Oven": 1, "Microwave": 1, "ElectricKettle": 1, "Knife": 2}
+COLUMNS = ("Left", "Middle", "Right")
+
+
+class RecipeGenerator:
+    def __init__(self, streams: int = 10, tasks_per_stream: int = 10, fanout: int = 2, depth: typing.Optional[int] = None,
+                 fields: typing.Iterable[str] = OPTIONAL_FIELDS, seed: typing.Optional[int] = 0, name: str = "Synthetic recipe"):
+        if streams < 1 or tasks_per_stream < 1:
+            raise ValueError("A recipe needs at least one Stream of at least one task")
+        if streams > 1 and (fanout < 1 or (depth is not None and depth < 1)):
+            raise ValueError(f"{streams} Streams need a fanout and depth of at least 1")
+        unknown = set(fields) - set(OPTIONAL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown optional field(s) {sorted(unknown)}; choose from {', '.join(OPTIONAL_FIELDS)}")
+        self.streams = streams
+        self.tasks_per_stream = tasks_per_stream
+        self.fanout = fanout
+        self.depth = depth
+        self.fields = frozenset(fields)
+        self.seed = seed
+        self.name = name
+        self.parent, self.levels = self._trigger_tree()
+
+    @property
+    def number_of_tasks(self) -> int:
+        return self.streams * self.tasks_per_stream
+
+    def _trigger_tree(self) -> typing.Tuple[dict, list]:
+        """ Stream index -> (the Stream and task index triggering it), and the depth of every Stream """
+        parent = {}
+        levels = [0]
+        waiting = collections.deque([0])
+        next_stream = 1
+        while waiting and next_stream < self.streams:
+            stream = waiting.popleft()
+            if self.depth is not None and levels[stream] >= self.depth:
+                continue
+            for child in range(min(self.fanout, self.streams - next_stream)):
+                # the triggers are spread through the Stream's tasks, the first on its first task
+                parent[next_stream] = (stream, child * self.tasks_per_stream // self.fanout)
+                levels.append(levels[stream] + 1)
+                waiting.append(next_stream)
+                next_stream += 1
+        if next_stream < self.streams:
+            raise ValueError(f"A fanout of {self.fanout} and depth of {self.depth} only reach {next_stream} of {self.streams} Streams")
+        return parent, levels
+
+    def task(self, rng: random.Random, stream: int, index: int, triggers: list) -> dict:
+        duration = rng.randrange(10, 900, 5)
+        task = {"DurationSeconds": duration}
+        fields = self.fields
+        if "Title" in fields:
+            task["Title"] = f"Task {index} of stream {stream}"
+        if "Description" in fields:
+            task["Description"] = "A synthetic task; press Done when it is finished"
+        if "Steps" in fields:
+            task["Steps"] = [f"Step {step}" for step in range(1, 1 + index % 4 + 1)]
+        if "Type" in fields:
+            task["Type"] = "Active" if index % 3 == 0 else "Background"
+        if "Stakes" in fields:
+            task["Stakes"] = ("Low", "Medium", "High")[index % 3]
+        checked = "Check" in fields and index % 4 == 1
+        if "Autoprogress" in fields and index % 4 == 2 and not triggers:
+            task["Autoprogress"] = True
+        if "StartMessage" in fields and index % 5 == 0:
+            task["StartMessage"] = f"Start task {index}"
+        if checked:
+            task["CheckEverySeconds"] = max(duration // 3, 5)
+            task["CheckMessage"] = "Check it"
+        if "Colours" in fields:
+            task["Green"], task["Amber"], task["Red"] = duration // 2, duration // 4, duration // 10
+        if "DurationRange" in fields:
+            task["DurationMinSeconds"], task["DurationMaxSeconds"] = duration * 4 // 5, duration * 3 // 2
+        if "Equipment" in fields and task.get("Type") == "Active":
+            task["Equipment"] = [list(EQUIPMENT)[(stream + index) % len(EQUIPMENT)]]
+        if triggers:
+            task["Trigger"] = triggers
+        return task
+
+    def stream(self, rng: random.Random, stream: int, triggered: dict) -> dict:
+        body = {}
+        if "Settings" in self.fields:
+            body["Settings"] = {"Title": f"Stream {stream}", "DisplayColumn": COLUMNS[stream % len(COLUMNS)]}
+        for index in range(self.tasks_per_stream):
+            body[f"Task_{index}"] = self.task(rng, stream, index, triggered.get(index, []))
+        return body
+
+    def recipe(self) -> dict:
+        """ The recipe as the dictionary WorkflowStream takes """
+        rng = random.Random(self.seed)
+        triggered = collections.defaultdict(dict)  # Stream index -> task index -> the Streams it triggers
+        for child, (stream, index) in self.parent.items():
+            triggered[stream].setdefault(index, []).append(f"Stream_{child}")
+        preflight = {"Description": f"{self.streams} Streams of {self.tasks_per_stream} tasks", "Steps": ["Check you have everything"]}
+        if "Equipment" in self.fields:
+            preflight["EssentialEquipment"] = [f"{item} : {count}" for item, count in EQUIPMENT.items()]
+        return {
+            "Identity": {"Name": self.name},
+            "GoStream": "Stream_0",
+            "PreFlight": preflight,
+            "PostFlight": {"Steps": ["Tidy up"]},
+            "Streams": {f"Stream_{stream}": self.stream(rng, stream, triggered[stream]) for stream in range(self.streams)},
+        }
+
+    def jsonc(self) -> str:
+        """ The recipe as JSONC text, with a comment on each Stream saying what triggers it """
+        recipe = self.recipe()
+        streams = recipe.pop("Streams")
+        depth = "any" if self.depth is None else self.depth
+        sections = [f"    {json.dumps(section)} : {_indent(json.dumps(value, indent=4), 4)}" for section, value in recipe.items()]
+        stream_texts = []
+        for stream, (name, body) in enumerate(streams.items()):
+            if stream in self.parent:
+                parent, index = self.parent[stream]
+                comment = f"triggered by Stream_{parent}/Task_{index}, {self.levels[stream]} deep"
+            else:
+                comment = "the GoStream"
+            stream_texts.append(f"        // {comment}\n        {json.dumps(name)} : {_indent(json.dumps(body, indent=4), 8)}")
+        sections.append('    "Streams" : {\n' + ",\n".join(stream_texts) + "\n    }")
+        # jsonc keeps comments as entries of the object they are in, so even the header goes inside the braces
+        return ("{\n"
+                f"    // Generated by RecipeGenerator.py: {self.streams} Streams x {self.tasks_per_stream} tasks, "
+                f"fanout {self.fanout}, depth {depth}, seed {self.seed}\n"
+                + ",\n".join(sections) + "\n}\n")
+
+    def write(self, filename: str):
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(self.jsonc())
+        logger.info(f"Wrote {self.number_of_tasks} tasks in {self.streams} Streams to {filename}")
+
+
+def _indent(text: str, spaces: int) -> str:
+    """ Indent all but the first line (which follows a key) """
+    return text.replace("\n", "\n" + " " * spaces)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes a synthetic recipe (JSONC) of any size and trigger shape")
+    parser.add_argument("filename", help="where to write the recipe; - for stdout")
+    parser.add_argument("--streams", type=int, default=10, help="number of Streams (default 10)")
+    parser.add_argument("--tasks", type=int, default=10, help="tasks per Stream (default 10)")
+    parser.add_argument("--fanout", type=int, default=2, help="most Streams one Stream triggers (default 2)")
+    parser.add_argument("--depth", type=int, default=None, help="most triggers between the GoStream and any Stream (default: as deep as needed)")
+    parser.add_argument("--fields", nargs="*", default=list(OPTIONAL_FIELDS), choices=OPTIONAL_FIELDS, metavar="FIELD",
+                        help=f"optional task fields to include (default all: {' '.join(OPTIONAL_FIELDS)}); give none for bare tasks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name", default="Synthetic recipe")
+    args = parser.parse_args()
+
+    try:
+        generator = RecipeGenerator(args.streams, args.tasks, args.fanout, args.depth, args.fields, args.seed, args.name)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.filename == "-":
+        sys.stdout.write(generator.jsonc())
+    else:
+        generator.write(args.filename)
+        print(f"Wrote {generator.number_of_tasks} tasks in {generator.streams} Streams, {max(generator.levels)} deep, to {args.filename}")
@@ -0,0 +1,224 @@
+import logging
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import time
+import typing
+
+from WorkflowStream import WorkflowStream, Helper, SHARED_TEXT
+from RecipeCache import RecipeCache, DEFAULT_CACHE_DIR, recipe_identity
+from RecipeCompiler import find_recipes
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Persistent, searchable index over a folder of recipes, kept in SQLite.
+One row per recipe holds the Identity fields, total and critical-path durations and stream/task counts;
+PreFlight EssentialEquipment/EssentialIngredients go into their own tables and the titles, descriptions
+and Steps into an FTS5 table, so questions like "needs a Toaster and finishes in under 10 minutes"
+are a single indexed query instead of parsing every file.
+update() is incremental: files whose mtime and size are unchanged are skipped without being read,
+and a file that was touched but has the same content hash only gets its mtime refreshed.
+
+    python3 RecipeLibrary.py update recipes/
+    python3 RecipeLibrary.py query --equipment Toaster --max-minutes 10 --text egg
+"""
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "recipe_library.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    path TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER,
+    sha256 TEXT,
+    identity_id TEXT,
+    name TEXT,
+    version TEXT,
+    author_id TEXT,
+    total_seconds INTEGER,
+    critical_path_seconds INTEGER,
+    stream_count INTEGER,
+    task_count INTEGER,
+    warning_count INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS recipes_critical_path ON recipes(critical_path_seconds);
+CREATE INDEX IF NOT EXISTS recipes_name ON recipes(name);
+CREATE TABLE IF NOT EXISTS equipment (path TEXT, item TEXT COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS equipment_item ON equipment(item, path);
+CREATE INDEX IF NOT EXISTS equipment_path ON equipment(path);
+CREATE TABLE IF NOT EXISTS ingredients (path TEXT, item TEXT COLLATE NOCASE, detail TEXT);
+CREATE INDEX IF NOT EXISTS ingredients_item ON ingredients(item, path);
+CREATE INDEX IF NOT EXISTS ingredients_path ON ingredients(path);
+CREATE VIRTUAL TABLE IF NOT EXISTS recipe_text USING fts5(path UNINDEXED, title, description, steps);
+"""
+
+
+def _file_hash(filename: str) -> str:
+    with open(filename, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _ingredient(entry: str) -> typing.Tuple[str, str]:
+    # PreFlight ingredients are written "Medium Eggs : 2"; index the item and keep the quantity as detail
+    item, _, detail = entry.partition(":")
+    return item.strip(), detail.strip()
+
+
+def critical_path_seconds(w: WorkflowStream) -> int:
+    """ How long the recipe takes from the GoStream; see WorkflowTiming """
+    return w.timing().makespan
+
+
+class RecipeLibrary:
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH, cache_dir: str = DEFAULT_CACHE_DIR):
+        if index_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self.connection = sqlite3.connect(index_path)
+        self.connection.executescript(SCHEMA)
+        self.cache = RecipeCache(cache_dir)
+
+    def close(self):
+        self.connection.close()
+
+    def update(self, directory: str) -> dict:
+        """ Brings the index up to date with the recipes under directory; returns counts of what changed """
+        counts = {"indexed": 0, "touched": 0, "unchanged": 0, "removed": 0}
+        known = {path: (mtime, size, sha256) for path, mtime, size, sha256 in
+                 self.connection.execute("SELECT path, mtime, size, sha256 FROM recipes")}
+        directory_prefix = os.path.join(os.path.abspath(directory), "")
+        found = set()
+        with self.connection:
+            for filename in find_recipes(directory):
+                path = os.path.abspath(filename)
+                found.add(path)
+                stat = os.stat(path)
+                previous = known.get(path)
+                if previous and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+                sha256 = _file_hash(path)
+                if previous and previous[2] == sha256:
+                    self.connection.execute("UPDATE recipes SET mtime = ?, size = ? WHERE path = ?", (stat.st_mtime, stat.st_size, path))
+                    counts["touched"] += 1
+                    continue
+                self._index_recipe(path, stat, sha256)
+                counts["indexed"] += 1
+            for path in known:
+                if path.startswith(directory_prefix) and path not in found:
+                    self._delete(path)
+                    counts["removed"] += 1
+        SHARED_TEXT.clear() # the recipes loaded to index them have been dropped; don't keep their shared text
+        return counts
+
+    def _delete(self, path: str):
+        for table in ("recipes", "equipment", "ingredients", "recipe_text"):
+            self.connection.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    def _index_recipe(self, path: str, stat: os.stat_result, sha256: str):
+        self._delete(path)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                w, warnings = self.cache.load(path)
+        except Exception as e:  # keep a row so the file isn't re-read until it changes
+            logger.warning(f"Unable to index recipe {path}: {e}")
+            self.connection.execute(
+                "INSERT INTO recipes (path, mtime, size, sha256, error) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, sha256, f"{type(e).__name__}: {e}"))
+            return
+
+        identity = recipe_identity(w.dictionary)
+        author_id = str(Helper._get_item_from_dict(w.dictionary, "Identity", "AuthorID", default=""))
+        titles, descriptions, steps = [w.name], [], []
+        total_seconds, task_count = 0, 0
+        for stream in w.stream_list:
+            titles.append(stream.title)
+            for task in stream:
+                task_count += 1
+                total_seconds += max(task.duration, 0)
+                titles.append(task.title)
+                if task.description:
+                    descriptions.append(task.description)
+                steps.extend(task.steps)
+        for checklist in (w.pre_checklist, w.post_checklist):
+            if checklist is not None:
+                descriptions.append(checklist.description)
+                steps.extend(Helper._get_strlist_from_dict(checklist.dictionary, "Steps", default=[]))
+
+        self.connection.execute(
+            "INSERT INTO recipes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+            (path, stat.st_mtime, stat.st_size, sha256, identity["ID"], identity["Name"] or w.name, identity["Version"],
+             author_id, total_seconds, critical_path_seconds(w), len(w.stream_list), task_count, len(warnings)))
+        if w.pre_checklist is not None:
+            equipment = Helper._get_strlist_from_dict(w.pre_checklist.dictionary, "EssentialEquipment", default=[])
+            self.connection.executemany("INSERT INTO equipment VALUES (?, ?)", [(path, item.strip()) for item in equipment])
+            ingredients = Helper._get_strlist_from_dict(w.pre_checklist.dictionary, "EssentialIngredients", default=[])
+            self.connection.executemany("INSERT INTO ingredients VALUES (?, ?, ?)", [(path, *_ingredient(entry)) for entry in ingredients])
+        self.connection.execute("INSERT INTO recipe_text VALUES (?, ?, ?, ?)",
+                                (path, "\n".join(titles), "\n".join(descriptions), "\n".join(steps)))
+
+    def find(self, equipment: typing.Iterable[str] = (), ingredients: typing.Iterable[str] = (),
+             max_seconds: typing.Optional[int] = None, text: typing.Optional[str] = None) -> list:
+        """
+        Recipes needing ALL of the given equipment/ingredients, finishing (critical path) within max_seconds
+        and matching the FTS5 text query. Returns rows as dicts, quickest first.
+        """
+        sql = "SELECT path, name, version, identity_id, critical_path_seconds, total_seconds, stream_count, task_count FROM recipes WHERE error IS NULL"
+        parameters = []
+        for item in equipment:
+            sql += " AND path IN (SELECT path FROM equipment WHERE item = ?)"
+            parameters.append(item)
+        for item in ingredients:
+            sql += " AND path IN (SELECT path FROM ingredients WHERE item = ?)"
+            parameters.append(item)
+        if max_seconds is not None:
+            sql += " AND critical_path_seconds <= ?"
+            parameters.append(max_seconds)
+        if text:
+            sql += " AND path IN (SELECT path FROM recipe_text WHERE recipe_text MATCH ?)"
+            parameters.append(text)
+        sql += " ORDER BY critical_path_seconds, name"
+        columns = ("path", "name", "version", "id", "critical_path_seconds", "total_seconds", "streams", "tasks")
+        return [dict(zip(columns, row)) for row in self.connection.execute(sql, parameters)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintains and queries a searchable index of a recipe library")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help=f"SQLite index file (default {DEFAULT_INDEX_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="index new/changed recipes in a folder and drop deleted ones")
+    update_parser.add_argument("directory")
+    query_parser = subparsers.add_parser("query", help="find recipes")
+    query_parser.add_argument("--equipment", action="append", default=[], help="required PreFlight EssentialEquipment (repeatable)")
+    query_parser.add_argument("--ingredient", action="append", default=[], help="required PreFlight EssentialIngredients item (repeatable)")
+    query_parser.add_argument("--max-minutes", type=float, help="only recipes that finish within this many minutes")
+    query_parser.add_argument("--text", help="full-text search over titles, descriptions and Steps (FTS5 syntax)")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    logging.getLogger("RecipeCache").setLevel(logging.ERROR)
+    library = RecipeLibrary(args.index)
+    start = time.perf_counter()
+    if args.command == "update":
+        counts = library.update(args.directory)
+        print(f"{counts} in {time.perf_counter() - start:.2f}s")
+    else:
+        max_seconds = int(args.max_minutes * 60) if args.max_minutes is not None else None
+        rows = library.find(args.equipment, args.ingredient, max_seconds, args.text)
+        for row in rows:
+            print(f"{row['critical_path_seconds'] // 60:4}m{row['critical_path_seconds'] % 60:02}s  {row['name']}  ({row['path']})")
+        print(f"{len(rows)} recipe(s) in {1000 * (time.perf_counter() - start):.1f}ms")
+    library.close()
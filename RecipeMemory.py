@@ -0,0 +1,155 @@
+import logging
+import argparse
+import contextlib
+import gc
+import io
+import sys
+import time
+import tracemalloc
+import typing
+
+from WorkflowStream import WorkflowStream, Task, SHARED_TEXT
+from RecipeCache import RecipeCache, DEFAULT_CACHE_DIR
+from RecipeCompiler import find_recipes
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Memory report for a library of recipes loaded into one process.
+Loads every recipe under a folder (through the compiled recipe cache), then walks the text held by the
+Tasks, Streams, Checklists and recipe dictionaries and reports
+- references: how many strings/string tuples the library refers to, and their bytes if each were its own copy
+- stored: the bytes of the distinct objects actually held (what interning/SharedText leaves)
+- distinct values: the bytes if every repeated value were stored exactly once
+plus the tracemalloc total for the whole load.
+
+    python3 RecipeMemory.py recipes/
+"""
+
+TASK_TEXT_SLOTS = tuple(slot for slot in Task.__slots__ if slot not in ("task_next", "task_previous", "trigger_stream_list", "live"))
+
+
+class TextCensus:
+    """ Counts every str/tuple reached, by reference, by object identity and by value """
+    def __init__(self):
+        self.references = 0
+        self.referenced_bytes = 0
+        self.stored = {}    # id -> size
+        self.values = {}    # value -> size
+        self._keep_alive = []  # ids are only unique while the objects live
+        self._walked = set()   # dictionaries/lists are walked once, however many Tasks/Streams refer to them
+
+    def add(self, item: typing.Any):
+        if isinstance(item, (dict, list)):
+            if id(item) in self._walked:
+                return
+            self._walked.add(id(item))
+            self._keep_alive.append(item)
+        if isinstance(item, dict):
+            for key, value in item.items():
+                self.add(key)
+                self.add(value)
+        elif isinstance(item, list):
+            for value in item:
+                self.add(value)
+        elif isinstance(item, (str, tuple)):
+            size = sys.getsizeof(item)
+            self.references += 1
+            self.referenced_bytes += size
+            if id(item) not in self.stored:
+                self.stored[id(item)] = size
+                self._keep_alive.append(item)
+            self.values.setdefault(item, size)
+            if isinstance(item, tuple):
+                for value in item:
+                    self.add(value)
+
+    def add_workflow(self, w: WorkflowStream):
+        self.add(w.dictionary)
+        for checklist in (w.pre_checklist, w.post_checklist):
+            if checklist is not None:
+                self.add(checklist.dictionary)
+                self.add(checklist.description)
+        for stream in w.stream_list:
+            self.add(stream.dictionary)
+            self.add(stream.title)
+            for task in stream:
+                self.add(task.dictionary)
+                for slot in TASK_TEXT_SLOTS:
+                    if slot != "dictionary":
+                        self.add(getattr(task, slot))
+
+    def report(self) -> dict:
+        return {
+            "references": self.references,
+            "referenced_bytes": self.referenced_bytes,
+            "stored_objects": len(self.stored),
+            "stored_bytes": sum(self.stored.values()),
+            "distinct_values": len(self.values),
+            "distinct_bytes": sum(self.values.values()),
+        }
+
+
+def library_memory_report(directory: str, cache_dir: str = DEFAULT_CACHE_DIR, use_cache: bool = True) -> dict:
+    recipes = find_recipes(directory)
+    cache = RecipeCache(cache_dir, enabled=use_cache)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    workflows, errors = [], 0
+    for filename in recipes:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                w, warnings = cache.load(filename)
+            workflows.append(w)
+        except Exception as e:  # report what did load
+            logger.warning(f"Unable to load {filename}: {e}")
+            errors += 1
+    seconds = time.perf_counter() - start
+    gc.collect()
+    traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    census = TextCensus()
+    for w in workflows:
+        census.add_workflow(w)
+    report = {
+        "directory": directory,
+        "recipes": len(workflows),
+        "errors": errors,
+        "streams": sum(len(w.stream_list) for w in workflows),
+        "tasks": sum(len(stream.task_list) for w in workflows for stream in w.stream_list),
+        "load_seconds": seconds,
+        "traced_bytes": traced_bytes,
+        "peak_bytes": peak_bytes,
+        "text": census.report(),
+        "shared": SHARED_TEXT.stats(),
+    }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Loads a folder of recipes into one process and reports how much memory their text takes")
+    parser.add_argument("directory", help="folder to search (recursively) for .jsonc/.json recipes")
+    parser.add_argument("--no-cache", action="store_true", help="parse every recipe instead of loading it from the compiled recipe cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"compiled recipe cache folder (default {DEFAULT_CACHE_DIR})")
+    args = parser.parse_args()
+
+    for name in ("WorkflowStream", "RecipeCache"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+    report = library_memory_report(args.directory, args.cache_dir, use_cache=not args.no_cache)
+    text = report["text"]
+    print(f"{report['recipes']} recipes ({report['errors']} failed), {report['streams']} streams, {report['tasks']} tasks "
+          f"loaded in {report['load_seconds']:.2f}s; {report['traced_bytes'] / 1e6:.2f}MB retained (peak {report['peak_bytes'] / 1e6:.2f}MB)")
+    print(f"  text references : {text['references']:9} {text['referenced_bytes'] / 1e6:9.2f}MB if every reference were its own copy")
+    print(f"  stored objects  : {text['stored_objects']:9} {text['stored_bytes'] / 1e6:9.2f}MB actually held")
+    print(f"  distinct values : {text['distinct_values']:9} {text['distinct_bytes'] / 1e6:9.2f}MB with each value stored once")
+    print(f"  shared tuples {report['shared']['shared_tuples']}, shared steps texts {report['shared']['shared_steps_texts']}")
@@ -0,0 +1,186 @@
+import logging
+import typing
+
+from WorkflowStream import WorkflowStream, Stream, Task, TaskState
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Hot reload of an edited recipe into a running workflow.
+The edited file is built into a fresh WorkflowStream, matched against the running one by stream and
+task name, and the differences are patched into the running Stream/Task objects in place - so anything
+holding a reference to them (a CountdownTimer's current_task) carries on, and the tasks' live state (the
+engine's TaskStates, by fullname) keeps its remaining_time and pause/extend/reduce counts.
+- task fields (titles, steps, durations, Green/Amber/Red, messages, ...) are copied across
+- triggers are relinked to the running Stream objects
+- tasks added/removed/reordered in a stream are relinked, unless the task a stream is currently on was removed
+- new streams are added; streams removed from the file are left alone (they may be running)
+"""
+
+# Task attributes that are copied from the edited recipe; (attribute, recipe key) for reporting
+TASK_FIELDS = (
+    ("title", "Title"),
+    ("description", "Description"),
+    ("steps", "Steps"),
+    ("type", "Type"),
+    ("stakes", "Stakes"),
+    ("Autoprogress", "Autoprogress"),
+    ("duration", "DurationSeconds"),
+    ("duration_min", "DurationMinSeconds"),
+    ("duration_max", "DurationMaxSeconds"),
+    ("StartMessage", "StartMessage"),
+    ("CheckEverySeconds", "CheckEverySeconds"),
+    ("CheckMessage", "CheckMessage"),
+    ("red", "Red"),
+    ("amber", "Amber"),
+    ("green", "Green"),
+    ("equipment", "Equipment"),
+    ("trigger_stream_namelist", "Trigger"),
+)
+STREAM_FIELDS = (("title", "Title"), ("countdown", "CountDown"))
+
+
+def diff_workflows(old_w: WorkflowStream, new_w: WorkflowStream) -> list:
+    """ Human readable list of what differs between the running workflow and the edited one """
+    changes = []
+    for new_stream in new_w.stream_list:
+        old_stream = old_w.stream_name_to_stream_reference_map.get(new_stream.name)
+        if old_stream is None:
+            changes.append(f"Stream '{new_stream.name}' added")
+            continue
+        for attribute, key in STREAM_FIELDS:
+            if getattr(old_stream, attribute) != getattr(new_stream, attribute):
+                changes.append(f"{new_stream.name}: {key} {getattr(old_stream, attribute)!r} -> {getattr(new_stream, attribute)!r}")
+        old_names = [task.name for task in old_stream]
+        new_names = [task.name for task in new_stream]
+        for task_name in new_names:
+            if task_name not in old_stream.task_name_map:
+                changes.append(f"{new_stream.name}/{task_name}: added")
+        for task_name in old_names:
+            if task_name not in new_stream.task_name_map:
+                changes.append(f"{new_stream.name}/{task_name}: removed")
+        if [name for name in old_names if name in new_stream.task_name_map] != [name for name in new_names if name in old_stream.task_name_map]:
+            changes.append(f"{new_stream.name}: tasks reordered")
+        for new_task in new_stream:
+            old_task = old_stream.task_name_map.get(new_task.name)
+            if old_task is None:
+                continue
+            for attribute, key in TASK_FIELDS:
+                if getattr(old_task, attribute) != getattr(new_task, attribute):
+                    changes.append(f"{new_task.fullname}: {key} {getattr(old_task, attribute)!r} -> {getattr(new_task, attribute)!r}")
+    for old_stream in old_w.stream_list:
+        if old_stream.name not in new_w.stream_name_to_stream_reference_map:
+            changes.append(f"Stream '{old_stream.name}' removed from the recipe (left running)")
+    return changes
+
+
+def apply_reload(old_w: WorkflowStream, new_w: WorkflowStream, current_tasks: typing.Iterable[Task] = (),
+                 states: typing.Optional[dict] = None) -> list:
+    """
+    Patches new_w into old_w in place. current_tasks are the tasks running streams are on; a stream whose
+    current task was removed keeps its old task list (but still gets field/trigger changes).
+    states are the running session's TaskStates (WorkflowEngine.states); the tasks reached so far pick up
+    their new durations and thresholds.
+    Returns the list of changes (as diff_workflows) plus any that couldn't be applied.
+    """
+    changes = diff_workflows(old_w, new_w)
+    current_tasks = set(id(task) for task in current_tasks)
+
+    # new streams join the running workflow first so triggers can be linked to them
+    for new_stream in new_w.stream_list:
+        if new_stream.name not in old_w.stream_name_to_stream_reference_map:
+            new_stream.stream_name_to_stream_reference_map = old_w.stream_name_to_stream_reference_map
+            old_w.stream_name_to_stream_reference_map[new_stream.name] = new_stream
+            old_w.stream_list.append(new_stream)
+            old_w.stream_name_list.append(new_stream.name)
+
+    for new_stream in new_w.stream_list:
+        old_stream = old_w.stream_name_to_stream_reference_map[new_stream.name]
+        if old_stream is new_stream:
+            patched_tasks = list(new_stream)
+        else:
+            for attribute, key in STREAM_FIELDS:
+                setattr(old_stream, attribute, getattr(new_stream, attribute))
+            old_stream.dictionary = new_stream.dictionary
+            patched_tasks = []
+            for new_task in new_stream:
+                old_task = old_stream.task_name_map.get(new_task.name)
+                if old_task is None:
+                    new_task.fullname = f"{old_stream.name}/{new_task.name}"
+                    patched_tasks.append(new_task)
+                    continue
+                _patch_task(old_task, new_task, (states or {}).get(old_task.fullname))
+                patched_tasks.append(old_task)
+            removed_current = [task for task in old_stream.task_list
+                               if id(task) in current_tasks and task.name not in new_stream.task_name_map]
+            if removed_current:
+                changes.append(f"{old_stream.name}: is on task '{removed_current[0].name}' which was removed; task list not changed until restart")
+            else:
+                _relink_stream(old_stream, patched_tasks)
+        for task in patched_tasks:
+            task.trigger_stream_list = [old_w.stream_name_to_stream_reference_map[name]
+                                        for name in dict.fromkeys(task.trigger_stream_namelist)
+                                        if name in old_w.stream_name_to_stream_reference_map]
+
+    old_w.dictionary = new_w.dictionary
+    for attribute in ("pre_checklist", "post_checklist"):
+        old_checklist, new_checklist = getattr(old_w, attribute), getattr(new_w, attribute)
+        if old_checklist is not None and new_checklist is not None:
+            old_checklist.dictionary = new_checklist.dictionary
+            old_checklist.description = new_checklist.description
+        elif old_checklist is None:
+            setattr(old_w, attribute, new_checklist)
+    old_w.build_warnings = new_w.build_warnings
+    old_w._analyse_trigger_graph()  # triggers may have changed; refresh topological_order and graph_warnings
+    old_w._task_table = None  # columnar view, timing and timeline are worked out again on next use
+    old_w._timing = None
+    old_w._timeline = None
+    for change in changes:
+        logger.info(f"Reload: {change}")
+    return changes
+
+
+def _patch_task(old_task: Task, new_task: Task, live: typing.Optional[TaskState] = None):
+    for attribute, key in TASK_FIELDS:
+        setattr(old_task, attribute, getattr(new_task, attribute))
+    old_task.dictionary = new_task.dictionary
+    if live is not None:
+        # keep remaining_time and the pause/extend/reduce counts; pick up the new plan and thresholds
+        live.duration = old_task.duration
+        live.red = old_task.red
+        live.amber = old_task.amber
+        live.green = old_task.green
+
+
+def _relink_stream(stream: Stream, tasks: list):
+    stream.task_list = tasks
+    stream.task_name_map = {task.name: task for task in tasks}
+    stream.task_first = tasks[0] if tasks else None
+    task_previous = None
+    for task in tasks:
+        task.task_previous = task_previous
+        task.task_next = None
+        if task_previous is not None:
+            task_previous.task_next = task
+        task_previous = task
+
+
+if __name__ == "__main__":
+    import sys
+    from RecipeCache import load_workflow
+
+    if len(sys.argv) != 3:
+        print("usage: python3 RecipeReload.py <running recipe> <edited recipe>")
+        sys.exit(1)
+    old_w, _ = load_workflow(sys.argv[1])
+    new_w, _ = load_workflow(sys.argv[2])
+    for change in diff_workflows(old_w, new_w):
+        print(change)
@@ -0,0 +1,248 @@
+import logging
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+import typing
+import uuid
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Crash-safe journal of a player session, so a crash or a reboot mid-recipe can be resumed (--resume).
+The journal is one JSON record per line, only ever appended to:
+- "session": the header - the recipe files, the tick, the finish-together plan, an id
+- "action": a button press (WorkflowEngine's action listeners) at a session time
+- "clock": how far the session clock had got - with each fsync, if it has moved on since the last record
+- "snapshot": the engine's whole state (WorkflowEngine.snapshot()) - every snapshot_seconds of session time
+The engine is deterministic, so the last snapshot plus the presses and clock after it give back exactly
+where every Stream was: the task, remaining time, pause/extend/reduce counts, which Streams had been
+triggered and which were held.
+Every line is flushed as it is written, so an application crash loses nothing; os.fsync, which is what
+survives a power cut, is batched to once every sync_seconds (and at every snapshot), so at most that
+much of the clock is lost. Nothing else needs a clock record: the engine is deterministic, so the ticks between
+two records are played back by advancing the clock to the later one. A truncated last line (the crash came
+mid-write) is ignored.
+The journal is never compacted, as it is also the recording SessionReplay plays and seeks through (by its
+snapshots); a long session is a longer journal, but not a slower resume.
+Resuming doesn't read the whole journal: each snapshot is also written to a sidecar file (journal + ".snapshot",
+replaced atomically) with the journal offset just after it, so resume reads the sidecar and the few
+records after that offset - the same time however long the session has been running. Without a usable
+sidecar it falls back to scanning the journal for the last snapshot.
+
+    python3 Workstream_Player.py recipes/recipe-simple.jsonc --journal session.jsonl
+    python3 Workstream_Player.py --resume session.jsonl
+    python3 SessionJournal.py session.jsonl          (what is in a journal)
+"""
+
+VERSION = 1
+SYNC_SECONDS = 5
+SNAPSHOT_SECONDS = 60
+
+
+def sidecar_filename(filename: str) -> str:
+    return filename + ".snapshot"
+
+
+class SessionJournal:
+    def __init__(self, filename: str, sync_seconds: int = SYNC_SECONDS, snapshot_seconds: int = SNAPSHOT_SECONDS):
+        self.filename = filename
+        self.sync_seconds = sync_seconds
+        self.snapshot_seconds = snapshot_seconds
+        self.file = None
+        self.engine = None
+        self.session_id = None
+        self.last_sync = 0          # wall clock (time.monotonic) of the last fsync
+        self.last_snapshot = 0      # session time of the last snapshot
+        self.last_time = None       # session time of the last record written
+
+    def start(self, engine, recipes: typing.List[str], serve_in: typing.Optional[int] = None, prompt: bool = False):
+        """ A new session: the header and a first snapshot (anything already in the file is replaced) """
+        self.session_id = uuid.uuid4().hex
+        self.file = open(self.filename, "w", encoding="utf-8")
+        self._write({"type": "session", "version": VERSION, "id": self.session_id, "recipes": list(recipes),
+                     "name": engine.w.name, "tick": engine.tick, "serve_in": serve_in, "prompt": prompt,
+                     "created": datetime.datetime.now().isoformat(timespec="seconds")})
+        self._attach(engine)
+
+    def carry_on(self, engine, header: dict):
+        """ Carry on journaling a resumed session (resume() has already rebuilt engine from this journal) """
+        self.session_id = header["id"]
+        with open(self.filename, "rb") as file:
+            partial = False
+            if file.seek(0, os.SEEK_END) > 0:
+                file.seek(-1, os.SEEK_END)
+                partial = file.read(1) != b"\n"
+        self.file = open(self.filename, "a", encoding="utf-8")
+        if partial: # end the record the crash cut short, so it doesn't swallow the next one
+            self.file.write("\n")
+        self._write({"type": "resumed", "time": engine.now, "at": datetime.datetime.now().isoformat(timespec="seconds")})
+        self._attach(engine)
+
+    def _attach(self, engine):
+        self.engine = engine
+        engine.subscribe_actions(self.record_action)
+        self.snapshot()
+
+    def _write(self, record: dict):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()   # in the OS now; survives the player crashing
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_sync = time.monotonic()
+
+    def record_action(self, now: int, action: str, stream_name: str, seconds: int):
+        record = {"type": "action", "time": now, "action": action, "stream": stream_name}
+        if seconds:
+            record["seconds"] = seconds
+        self._write(record)
+        self.last_time = now
+
+    def tick(self):
+        """ After the clock moves on: a snapshot when one is due; otherwise, when the fsync is due, a clock record and the fsync """
+        now = self.engine.now
+        if now - self.last_snapshot >= self.snapshot_seconds:
+            self.snapshot()
+            return
+        if time.monotonic() - self.last_sync >= self.sync_seconds:
+            if now != self.last_time:
+                self._write({"type": "clock", "time": now})
+                self.last_time = now
+            self.sync()
+
+    def snapshot(self):
+        now = self.engine.now
+        state = self.engine.snapshot()
+        self._write({"type": "snapshot", "time": now, "state": state})
+        self.last_time = now
+        self.last_snapshot = now
+        self.sync()
+        offset = self.file.tell()
+        # the sidecar points just past the snapshot; written to a temporary file and renamed over the old one
+        sidecar = sidecar_filename(self.filename)
+        folder = os.path.dirname(os.path.abspath(sidecar))
+        descriptor, temporary = tempfile.mkstemp(prefix=".snapshot_", dir=folder)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump({"id": self.session_id, "offset": offset, "time": now, "state": state}, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, sidecar)
+        except OSError as e:
+            logger.warning(f"Unable to write the journal snapshot {sidecar}; resume will scan the journal: {e}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.snapshot()
+        self.file.close()
+        self.file = None
+
+
+def _records(lines: typing.Iterable[bytes], filename: str) -> typing.Iterator[dict]:
+    for line in lines:
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            if line.endswith(b"\n"):
+                logger.warning(f"{filename}: skipping an unreadable journal record")
+            else:
+                logger.warning(f"{filename}: ignoring a partly written last record")
+
+
+def read_header(filename: str) -> dict:
+    with open(filename, "rb") as file:
+        header = json.loads(file.readline())
+    if header.get("type") != "session":
+        raise ValueError(f"{filename} is not a session journal")
+    if header.get("version") != VERSION:
+        raise ValueError(f"{filename} is a version {header.get('version')} journal; this player reads version {VERSION}")
+    return header
+
+
+def read_journal(filename: str) -> typing.Tuple[dict, typing.Optional[dict], list]:
+    """ (header, last snapshot state, the records after it) """
+    header = read_header(filename)
+    try:
+        with open(sidecar_filename(filename), "r", encoding="utf-8") as file:
+            sidecar = json.load(file)
+        if sidecar.get("id") == header["id"] and sidecar["offset"] <= os.path.getsize(filename):
+            with open(filename, "rb") as file:
+                file.seek(sidecar["offset"])
+                return header, sidecar["state"], list(_records(file, filename))
+        logger.warning(f"{sidecar_filename(filename)} is from another session; scanning the journal")
+    except (OSError, ValueError, KeyError) as e:
+        logger.info(f"No usable journal snapshot ({e}); scanning the journal")
+    state, after = None, []
+    with open(filename, "rb") as file:
+        file.readline()
+        for record in _records(file, filename):
+            if record.get("type") == "snapshot":
+                state, after = record["state"], []
+            else:
+                after.append(record)
+    return header, state, after
+
+
+def apply_record(engine, record: dict):
+    """ Move engine's clock on to a journal record's time and make its press, if it is one """
+    if record.get("type") not in ("action", "clock", "snapshot"):
+        return
+    if record["time"] > engine.now:
+        engine.advance(record["time"] - engine.now)
+    if record["type"] == "action":
+        try:
+            engine.act(record["action"], record["stream"], record.get("seconds", 0))
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Skipping journal action {record}: {e}")
+
+
+def replay_records(engine, records: typing.Iterable[dict]):
+    for record in records:
+        apply_record(engine, record)
+
+
+def resume(engine, filename: str) -> dict:
+    """ Rebuild engine (freshly made, on the journal's recipe) as it was when the journal stopped; returns the header """
+    header, state, records = read_journal(filename)
+    if state is None:
+        raise ValueError(f"{filename} has no snapshot to resume from")
+    engine.restore(state)
+    replay_records(engine, records)
+    logger.info(f"Resumed '{header['name']}' at {engine.now}s from {filename}")
+    return header
+
+
+if __name__ == "__main__":
+    from WorkflowTiming import _minutes
+
+    parser = argparse.ArgumentParser(description="Summarises a player session journal")
+    parser.add_argument("filename", help="journal written by Workstream_Player.py --journal")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    header, state, records = read_journal(args.filename)
+    seconds = time.perf_counter() - start
+    print(f"{header['name']} ({', '.join(header['recipes'])}), started {header['created']}")
+    if state is None:
+        print("  no snapshot")
+    else:
+        last = max([state["now"]] + [record["time"] for record in records if "time" in record])
+        print(f"  last snapshot at {_minutes(state['now'])}, journal reaches {_minutes(last)}; read in {1000 * seconds:.1f}ms")
+        for run in state["runs"]:
+            status = "done" if run["done"] else "held" if run["hold"] is not None else "running" if run["running"] else "paused/waiting"
+            print(f"  {run['stream']:30} {run['task']:30} {status}")
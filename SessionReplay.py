@@ -0,0 +1,136 @@
+import logging
+import argparse
+import bisect
+import json
+import time
+import typing
+
+from WorkflowEngine import WorkflowEngine
+from WorkflowTiming import FinishTogetherPlan
+from SessionJournal import read_header, apply_record
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Replaying a recorded session (a SessionJournal) at any speed, and jumping to any moment of it.
+A replay is the session's own WorkflowEngine run again from the journal: the presses are made at the
+times they were recorded, and the engine does the rest exactly as it did, so everything the session
+showed and said comes back - the player UI is driven by it just as it was live.
+Seeking uses the snapshots in the journal (one a minute) as the index: bisect for the last snapshot at or
+before the time, restore() it, and apply the few records between it and the time. A seek costs the
+same on a six hour recording as on a six minute one. Seeking forward within the current minute just
+carries on from where the replay is.
+The recording is read once, when it is opened.
+
+    python3 Workstream_Player.py --replay session.jsonl [--speed 10] [--seek 12:30]
+    python3 SessionReplay.py session.jsonl --at 12:30        (the state at that moment, without Qt)
+"""
+
+SPEEDS = (1, 10, 100)
+
+
+def parse_time(text: str) -> int:
+    """ Seconds from "90", "1:30" or "1:02:30" """
+    seconds = 0
+    for part in str(text).split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+class SessionRecording:
+    """ A journal loaded for replay: its records in order, and where the snapshots are """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.header = read_header(filename)
+        self.records = []
+        with open(filename, "rb") as file:
+            file.readline()
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue    # cut short by a crash
+                if "time" in record:
+                    self.records.append(record)
+        self.snapshot_positions = [position for position, record in enumerate(self.records) if record["type"] == "snapshot"]
+        self.snapshot_times = [self.records[position]["time"] for position in self.snapshot_positions]
+        if not self.snapshot_positions:
+            raise ValueError(f"{filename} has no snapshot to replay from")
+        self.start = self.snapshot_times[0]
+        self.end = max(record["time"] for record in self.records)
+
+    def plan(self, w) -> typing.Optional[FinishTogetherPlan]:
+        """ The session's finish-together plan, if it had one """
+        if self.header.get("serve_in") is None:
+            return None
+        return FinishTogetherPlan(w, self.header["serve_in"])
+
+
+class SessionReplay:
+    def __init__(self, engine: WorkflowEngine, recording: SessionRecording):
+        self.engine = engine
+        self.recording = recording
+        self.position = 0   # the next record to apply
+        engine.plan = recording.plan(engine.w)
+        engine.prompt = recording.header.get("prompt", False)
+
+    @property
+    def at_end(self) -> bool:
+        return self.engine.now >= self.recording.end
+
+    def seek(self, t: int):
+        """ Jump to session time t (restoring the snapshot before it, unless the replay can just carry on to it) """
+        recording = self.recording
+        t = min(max(t, recording.start), recording.end)
+        snapshot = recording.snapshot_positions[bisect.bisect_right(recording.snapshot_times, t) - 1]
+        if t < self.engine.now or self.position <= snapshot:
+            self.engine.restore(recording.records[snapshot]["state"])
+            self.position = snapshot + 1
+        self.play_to(t)
+
+    def play_to(self, t: int):
+        """ Carry the replay on to session time t """
+        records = self.recording.records
+        while self.position < len(records) and records[self.position]["time"] <= t:
+            apply_record(self.engine, records[self.position])
+            self.position += 1
+        if t > self.engine.now:
+            self.engine.advance(t - self.engine.now)
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+    from MealMerger import load_meal
+    from WorkflowTiming import _minutes
+
+    parser = argparse.ArgumentParser(description="Shows the state of a recorded session (a player --journal) at any moment")
+    parser.add_argument("filename", help="journal written by Workstream_Player.py --journal")
+    parser.add_argument("--at", default=None, help="session time, seconds or [h:]mm:ss (default: the end)")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    logging.getLogger("WorkflowEngine").setLevel(logging.WARNING)
+    start = time.perf_counter()
+    recording = SessionRecording(args.filename)
+    opened = time.perf_counter() - start
+    recipes = recording.header["recipes"]
+    w, warnings = load_meal(recipes) if len(recipes) > 1 else load_workflow(recipes[0])
+    engine = WorkflowEngine(w, tick=recording.header.get("tick", 1))
+    replay = SessionReplay(engine, recording)
+    at = parse_time(args.at) if args.at is not None else recording.end
+    start = time.perf_counter()
+    replay.seek(at)
+    sought = time.perf_counter() - start
+    print(f"{w.name}: {_minutes(recording.end)} recorded, {len(recording.snapshot_times)} snapshots; "
+          f"opened in {1000 * opened:.1f}ms, sought to {_minutes(engine.now)} in {1000 * sought:.1f}ms")
+    for name, run in engine.runs.items():
+        status = "done" if run.done else "held" if run.held else "running" if run.running else "paused/waiting"
+        print(f"  {name:30} {run.current_task.name:30} {status:14} {run.live.remaining_time:>6}s left")
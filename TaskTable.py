@@ -0,0 +1,154 @@
+import logging
+import typing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # only needed for the columnar view; the rest of the app runs without it
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Columnar (struct-of-arrays) view of every task in a built WorkflowStream.
+One NumPy array per field - duration, green, amber, red, CheckEverySeconds, autoprogress, stream index and
+next-task index - with tasks numbered stream by stream in task_next order. Timing questions over many
+running streams (colour bands, overruns, alerts, time remaining) then become single vectorized operations
+instead of a Python comparison per CountdownTimer.
+The "running" arrays passed in are parallel: current[i] is the task index a running stream is on and
+remaining[i] is that task's remaining_time.
+Get one with WorkflowStream.task_table().
+"""
+
+# colour band codes, in the order CountdownTimer.update_timer_colour checks them
+GREY, GREEN, AMBER, RED = 0, 1, 2, 3
+BAND_NAMES = ("grey", "green", "amber", "red")
+
+# alert codes, as WorkflowEngine raises them on a one-second tick (DUE/CHECK)
+NO_ALERT, CHECK_ALERT, OVERRUN_ALERT = 0, 1, 2
+
+
+class TaskTable:
+    def __init__(self, w):
+        if np is None:
+            raise ImportError("TaskTable needs numpy; pip install numpy")
+        self.tasks = []
+        self.stream_names = []
+        self.stream_first = []  # index of the first task of each stream (-1 if the stream is empty)
+        self.index_by_fullname = {}
+        durations, greens, ambers, reds, checks, autoprogress, streams = [], [], [], [], [], [], []
+        for stream_index, stream in enumerate(w.stream_list):
+            self.stream_names.append(stream.name)
+            first = len(self.tasks)
+            for task in stream:
+                self.index_by_fullname[task.fullname] = len(self.tasks)
+                self.tasks.append(task)
+                durations.append(task.duration)
+                greens.append(task.green)
+                ambers.append(task.amber)
+                reds.append(task.red)
+                checks.append(task.CheckEverySeconds)
+                autoprogress.append(task.Autoprogress)
+                streams.append(stream_index)
+            self.stream_first.append(first if len(self.tasks) > first else -1)
+
+        self.duration = np.array(durations, dtype=np.int64)
+        self.green = np.array(greens, dtype=np.int64)
+        self.amber = np.array(ambers, dtype=np.int64)
+        self.red = np.array(reds, dtype=np.int64)
+        self.check_every = np.array(checks, dtype=np.int64)
+        self.autoprogress = np.array(autoprogress, dtype=bool)
+        self.stream_index = np.array(streams, dtype=np.int32)
+        self.stream_first = np.array(self.stream_first, dtype=np.int32)
+        self.next_task = np.full(len(self.tasks), -1, dtype=np.int32)
+        for index, task in enumerate(self.tasks):
+            if task.task_next is not None:
+                self.next_task[index] = self.index_by_fullname[task.task_next.fullname]
+
+        # duration of everything after each task in its own stream; tasks are stored stream by stream,
+        # so this is a reversed cumulative sum restarted at each stream boundary
+        self.duration_after = np.zeros(len(self.tasks), dtype=np.int64)
+        for index in range(len(self.tasks) - 2, -1, -1):
+            if self.next_task[index] != -1:
+                self.duration_after[index] = self.duration[index + 1] + self.duration_after[index + 1]
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def index_of(self, task) -> int:
+        return self.index_by_fullname[task.fullname]
+
+    def colour_bands(self, current, remaining):
+        """ GREY/GREEN/AMBER/RED for each running stream, as update_timer_colour picks them """
+        current = np.asarray(current)
+        remaining = np.asarray(remaining)
+        return np.select(
+            [remaining <= self.red[current], remaining <= self.amber[current], remaining <= self.green[current]],
+            [RED, AMBER, GREEN],
+            default=GREY,
+        )
+
+    def overrunning(self, current, remaining):
+        """ True for each running stream whose current task has reached or passed its duration (an Autoprogress task moves on instead) """
+        return (np.asarray(remaining) <= 0) & ~self.autoprogress[np.asarray(current)]
+
+    def alerts(self, current, remaining):
+        """ The alert WorkflowEngine raises (DUE/CHECK, in _count) for each running stream at this remaining_time """
+        current = np.asarray(current)
+        remaining = np.asarray(remaining)
+        check_every = self.check_every[current]
+        has_check = check_every > 0
+        # guard the modulo; it's only used where has_check is True
+        on_check_interval = (remaining % np.where(has_check, check_every, 1)) == 0
+        check_alert = has_check & ((remaining == 0) | ((remaining < 0) & on_check_interval))
+        # an Autoprogress task moves on at zero instead of alerting
+        overrun_alert = ~has_check & (remaining == 0) & ~self.autoprogress[current]
+        return np.select([check_alert, overrun_alert], [CHECK_ALERT, OVERRUN_ALERT], default=NO_ALERT)
+
+    def autoprogress_due(self, current, remaining):
+        """ True for each running stream that should move on by itself (Autoprogress and time is up) """
+        return self.autoprogress[np.asarray(current)] & (np.asarray(remaining) <= 0)
+
+    def stream_remaining(self, current, remaining):
+        """ Seconds left in each running stream: what's left of the current task plus the tasks after it """
+        current = np.asarray(current)
+        return np.maximum(np.asarray(remaining), 0) + self.duration_after[current]
+
+    def total_remaining(self, current, remaining) -> int:
+        return int(self.stream_remaining(current, remaining).sum())
+
+    def stream_durations(self):
+        """ Planned duration of each stream (summed over its tasks), in stream_list order """
+        return np.bincount(self.stream_index, weights=self.duration, minlength=len(self.stream_names)).astype(np.int64)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from RecipeCache import load_workflow
+
+    file_name = sys.argv[1] if len(sys.argv) > 1 else "recipes/recipe-eggs-toast-and-soldiers.jsonc"
+    w, warnings = load_workflow(file_name)
+    table = w.task_table()
+    print(f"{len(table)} tasks in {len(table.stream_names)} streams; planned stream durations {dict(zip(table.stream_names, table.stream_durations().tolist()))}")
+    # everything running at once, 10 seconds into its first task
+    current = table.stream_first[table.stream_first >= 0]
+    remaining = table.duration[current] - 10
+    print("bands", [BAND_NAMES[band] for band in table.colour_bands(current, remaining)])
+    print("total remaining", table.total_remaining(current, remaining))
+
+    # a tick over many concurrent streams
+    running = np.random.default_rng(0).integers(0, len(table), size=100_000)
+    remaining = table.duration[running] - 60
+    start = time.perf_counter()
+    table.colour_bands(running, remaining)
+    table.alerts(running, remaining)
+    table.autoprogress_due(running, remaining)
+    print(f"bands+alerts+autoprogress for {len(running)} running streams in {1000 * (time.perf_counter() - start):.2f}ms")
@@ -0,0 +1,210 @@
+import logging
+import bisect
+import sys
+import typing
+from dataclasses import dataclass
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Planned timeline of a built workflow, indexed for "what is happening between t1 and t2".
+Every task is an interval [start, finish) of seconds from pressing Start - by default the critical path
+plan (WorkflowStream.timing()), or any schedule's start/finish (WorkflowScheduler) - and every alert the
+plan implies is a point in time:
+- START_MESSAGE when a task with a StartMessage starts
+- GREEN/AMBER/RED when the countdown reaches the task's threshold (or at the start, if it is longer than the task)
+- DUE when the task's time is up: its Check/overrun alert fires unless it is done by then (Autoprogress tasks move on)
+Tasks are kept in a centered interval tree: each node holds the intervals containing its center, sorted by
+start and by finish, with the intervals wholly before/after it below it on either side. A query only
+descends the nodes whose span meets [t1, t2), and stops scanning a node's lists at the first interval
+that misses, so it costs O(log n + k) for k answers. Zero-length tasks and alerts are points, in sorted
+arrays searched with bisect - also O(log n + k).
+Get one with WorkflowStream.timeline(); it is built once per built workflow.
+
+    python3 Timeline.py recipes/recipe-eggs-toast-and-soldiers.jsonc [t1 [t2]]     (times in seconds)
+"""
+
+START_MESSAGE, GREEN, AMBER, RED, DUE = "start message", "green", "amber", "red", "due"
+
+
+@dataclass(slots=True)
+class Alert:
+    time: int
+    kind: str
+    task: typing.Any    # Task
+
+
+class Timeline:
+    def __init__(self, w, start: typing.Optional[dict] = None, finish: typing.Optional[dict] = None):
+        if start is None:
+            timing = w.timing()
+            start, finish = timing.earliest_start, timing.earliest_finish
+        self.start = start      # task fullname -> seconds
+        self.finish = finish
+        self.tasks = []         # in stream_list order; the tree and arrays hold indices into it
+        alerts = []
+        for stream in w.stream_list:
+            for task in stream.task_list:
+                if task.fullname not in start:  # never runs in this plan
+                    continue
+                self.tasks.append(task)
+                task_start, task_finish = start[task.fullname], finish[task.fullname]
+                if task.StartMessage:
+                    alerts.append(Alert(task_start, START_MESSAGE, task))
+                for kind, threshold in ((GREEN, task.green), (AMBER, task.amber), (RED, task.red)):
+                    if threshold > 0:
+                        alerts.append(Alert(max(task_finish - threshold, task_start), kind, task))
+                alerts.append(Alert(task_finish, DUE, task))
+        alerts.sort(key=lambda alert: alert.time)
+        self.alerts = alerts
+        self.alert_times = [alert.time for alert in alerts]
+
+        starts = [start[task.fullname] for task in self.tasks]
+        finishes = [finish[task.fullname] for task in self.tasks]
+        self._starts, self._finishes = starts, finishes
+        self.starting = sorted(range(len(self.tasks)), key=starts.__getitem__)   # indices by start: "what's next"
+        self.starting_times = [starts[index] for index in self.starting]
+        instants = [index for index in self.starting if finishes[index] <= starts[index]]
+        self.instants = instants
+        self.instant_times = [starts[index] for index in instants]
+        # tree nodes: (center, indices by start, starts, indices by finish descending, finishes descending, left, right)
+        self._nodes = []
+        self._root = self._build([index for index in range(len(self.tasks)) if finishes[index] > starts[index]])
+
+    def _build(self, indices: list) -> int:
+        if not indices:
+            return -1
+        starts, finishes = self._starts, self._finishes
+        endpoints = sorted([starts[index] for index in indices] + [finishes[index] for index in indices])
+        # the lower median endpoint: both sides get at most half, and the node can never be empty with everything on one side
+        center = endpoints[(len(endpoints) - 1) // 2]
+        here, left, right = [], [], []
+        for index in indices:
+            if finishes[index] <= center:
+                left.append(index)
+            elif starts[index] > center:
+                right.append(index)
+            else:
+                here.append(index)
+        by_start = sorted(here, key=starts.__getitem__)
+        by_finish = sorted(here, key=finishes.__getitem__, reverse=True)
+        node = len(self._nodes)
+        self._nodes.append(None)
+        self._nodes[node] = (center, by_start, [starts[index] for index in by_start],
+                             by_finish, [finishes[index] for index in by_finish],
+                             self._build(left), self._build(right))
+        return node
+
+    def __len__(self):
+        return len(self.tasks)
+
+    @property
+    def makespan(self) -> int:
+        return max(self._finishes, default=0)
+
+    def tasks_between(self, t1: int, t2: int) -> list:
+        """ Tasks running at any time in [t1, t2) (zero-length ones if they happen in it), in no particular order """
+        found = []
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            if node < 0:
+                continue
+            center, by_start, starts, by_finish, finishes, left, right = self._nodes[node]
+            if t2 <= center:        # only the ones starting before t2 reach back into the range
+                for position, index in enumerate(by_start):
+                    if starts[position] >= t2:
+                        break
+                    found.append(index)
+                pending.append(left)
+            elif center < t1:       # only the ones finishing after t1 reach forward into it
+                for position, index in enumerate(by_finish):
+                    if finishes[position] <= t1:
+                        break
+                    found.append(index)
+                pending.append(right)
+            else:                   # the center is in the range, so everything here is too
+                found.extend(by_start)
+                pending.append(left)
+                pending.append(right)
+        found.extend(self.instants[bisect.bisect_left(self.instant_times, t1):bisect.bisect_left(self.instant_times, t2)])
+        return [self.tasks[index] for index in found]
+
+    def tasks_at(self, t: int) -> list:
+        """ Tasks running at time t (start <= t < finish) """
+        found = []
+        node = self._root
+        while node >= 0:
+            center, by_start, starts, by_finish, finishes, left, right = self._nodes[node]
+            if t < center:
+                for position, index in enumerate(by_start):
+                    if starts[position] > t:
+                        break
+                    found.append(index)
+                node = left
+            elif t > center:
+                for position, index in enumerate(by_finish):
+                    if finishes[position] <= t:
+                        break
+                    found.append(index)
+                node = right
+            else:
+                found.extend(by_start)
+                break
+        return [self.tasks[index] for index in found]
+
+    def alerts_between(self, t1: int, t2: int) -> list:
+        """ Alerts firing in [t1, t2), in time order """
+        return self.alerts[bisect.bisect_left(self.alert_times, t1):bisect.bisect_left(self.alert_times, t2)]
+
+    def next_tasks(self, t: int, count: int = 1) -> list:
+        """ The next count tasks to start at or after t, in start order """
+        position = bisect.bisect_left(self.starting_times, t)
+        return [self.tasks[index] for index in self.starting[position:position + count]]
+
+    def next_alerts(self, t: int, count: int = 1) -> list:
+        position = bisect.bisect_left(self.alert_times, t)
+        return self.alerts[position:position + count]
+
+    def alert_collisions(self, window: int = 0, kinds: typing.Iterable[str] = (START_MESSAGE, RED, DUE)) -> list:
+        """ Groups of alerts (of the given kinds) from different Streams that fire within window seconds of each other """
+        kinds = set(kinds)
+        groups, group = [], []
+        for alert in self.alerts:
+            if alert.kind not in kinds:
+                continue
+            if group and alert.time - group[0].time > window:
+                groups.append(group)
+                group = []
+            group.append(alert)
+        groups.append(group)
+        return [group for group in groups if len(set(alert.task.fullname.partition("/")[0] for alert in group)) > 1]
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+    from WorkflowTiming import _minutes
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    file_name = sys.argv[1] if len(sys.argv) > 1 else "recipes/recipe-eggs-toast-and-soldiers.jsonc"
+    w, warnings = load_workflow(file_name)
+    timeline = w.timeline()
+    t1 = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    t2 = int(sys.argv[3]) if len(sys.argv) > 3 else t1 + 60
+    print(f"{w.name}: {len(timeline)} tasks, {len(timeline.alerts)} alerts over {_minutes(timeline.makespan)}")
+    print(f"Running between {_minutes(t1)} and {_minutes(t2)}:")
+    for task in sorted(timeline.tasks_between(t1, t2), key=lambda task: timeline.start[task.fullname]):
+        print(f"  {_minutes(timeline.start[task.fullname]):>7} {_minutes(timeline.finish[task.fullname]):>7}  {task.fullname}")
+    print("Alerts:")
+    for alert in timeline.alerts_between(t1, t2):
+        print(f"  {_minutes(alert.time):>7}  {alert.kind:13} {alert.task.fullname}")
+    for group in timeline.alert_collisions(window=15):
+        print("Alerts within 15s of each other: " + ", ".join(f"{alert.task.fullname} ({alert.kind} at {_minutes(alert.time)})" for alert in group))
@@ -0,0 +1,404 @@
+import logging
+import typing
+from dataclasses import dataclass
+
+from WorkflowStream import TaskState, SHARED_TEXT
+from Timeline import START_MESSAGE, GREEN, AMBER, RED, DUE
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Running a workflow without Qt: the state machine the player's CountdownTimer used to be.
+A WorkflowEngine holds one StreamRun per Stream that has been started - which task it is on, whether it is
+counting down or held back by a finish-together plan - and the session clock (engine.now, in seconds).
+Everything that changes is an Event sent to the listeners (and kept in engine.trace if asked for):
+- the buttons are methods: start, pause, resume, extend, reduce, back, done
+- advance(dt) moves the clock on dt seconds (default: the tick). Alerts are found by what the countdown
+  crossed in that time, not by landing on an exact second, so any dt gives the same events, each at the
+  second it happened: Green/Amber/Red, DUE at zero (the CheckMessage, or "Overrun <Stream title>"), CHECK
+  every CheckEverySeconds after that. An Autoprogress task that reaches zero is done there and then, and
+  the rest of dt carries on with the next task - so a 0s Autoprogress task passes straight through
+- done() records TASK_DONE (with the seconds counted down on the task) and starts the Streams it triggers
+Button presses (not what the engine does by itself) also go to the action listeners, as (now, action,
+Stream name, seconds); act() applies one, so a session can be replayed from its presses and the clock.
+snapshot()/restore() save and rebuild the whole state (SessionJournal).
+The player's CountdownTimer is a view of one StreamRun: its buttons call the engine and it redraws on the
+events. With no Qt involved, a test, simulator or benchmark can run any number of sessions in one process:
+each engine keeps its own TaskState for every task it has reached (engine.states), so any number of engines
+can run the same built workflow, one after another or side by side.
+
+    engine = WorkflowEngine(w, tick=1)
+    engine.subscribe(print)
+    engine.open()               # the GoStream, waiting for Start
+    engine.done(engine.go)      # Start
+    engine.advance(60)
+"""
+
+# event kinds, as well as Timeline's START_MESSAGE, GREEN, AMBER, RED and DUE
+STREAM_STARTED, HELD, HOLD_OVER, STARTED = "stream started", "held", "hold over", "started"
+TASK_STARTED, TASK_DONE, AUTOPROGRESS, CHECK = "task started", "task done", "autoprogress", "check"
+PAUSED, RESUMED, EXTENDED, REDUCED, STREAM_DONE = "paused", "resumed", "extended", "reduced", "stream done"
+RESTORED = "restored"   # restore() replaced everything; the Streams are announced again after it
+
+# the buttons, as WorkflowEngine.act() takes them (and SessionJournal records them)
+ACTIONS = ("hold", "start", "pause", "resume", "extend", "reduce", "back", "done")
+
+EXTEND_SECONDS = 30     # the extend/reduce buttons
+BACK_FLOOR_SECONDS = 30  # going back to a task gives at least this long on it
+
+
+@dataclass(slots=True)
+class Event:
+    time: int
+    kind: str
+    stream: str         # Stream name ("" for RESTORED)
+    task: typing.Any    # Task (None for RESTORED)
+    message: str = ""   # what is said: START_MESSAGE, DUE, CHECK, HOLD_OVER
+    seconds: int = 0    # TASK_DONE: how long it took; HELD: the hold; EXTENDED/REDUCED: by how much
+
+
+def set_live_text(stream, task, live: TaskState):
+    #User feedback change - changed format of title box text - stream title
+    live.title_text = f"Stream: {stream.title}"
+    #User feedback change - put the task name in the second box instead of description
+    live.description_text = task.title
+    #User feedback change - put the description into the task box
+    live.steps_text = SHARED_TEXT.steps_text(task.description, task.steps) # shared between tasks with the same text
+
+
+class StreamRun:
+    """ A Stream that has been started (or is waiting for Start): where it has got to """
+    __slots__ = ("stream", "states", "current_task", "running", "done", "hold_remaining", "triggered_by")
+
+    def __init__(self, stream, states: dict, triggered_by=None):
+        self.stream = stream
+        self.states = states        # the engine's TaskStates, by task fullname
+        self.current_task = stream.task_first
+        self.running = False
+        self.done = False
+        self.hold_remaining = None  # seconds until the planned start while held back
+        self.triggered_by = triggered_by
+
+    @property
+    def live(self) -> TaskState:
+        return self.states[self.current_task.fullname]
+
+    @property
+    def held(self) -> bool:
+        return self.hold_remaining is not None
+
+    @property
+    def waiting(self) -> bool:
+        """ Not started yet - Done starts it """
+        return self.current_task.task_previous is None and not self.running and not self.done
+
+
+class WorkflowEngine:
+    def __init__(self, w, tick: int = 1, plan=None, prompt: bool = False, trace: bool = False):
+        self.w = w
+        self.tick = tick
+        self.plan = plan        # FinishTogetherPlan: triggered Streams are held until their planned start
+        self.prompt = prompt    # with a plan, wait for Start at the planned start instead of starting
+        self.now = 0
+        self.runs = {}          # Stream name -> StreamRun, in the order they started
+        self.states = {}        # task fullname -> TaskState, created the first time the task is reached and kept,
+                                # so going back to a task resumes where it was
+        self.listeners = []
+        self.action_listeners = []
+        self.trace = [] if trace else None
+
+    def subscribe(self, listener: typing.Callable[[Event], None]):
+        self.listeners.append(listener)
+
+    def subscribe_actions(self, listener: typing.Callable[[int, str, str, int], None]):
+        self.action_listeners.append(listener)
+
+    def _acted(self, action: str, run: StreamRun, seconds: int = 0):
+        for listener in list(self.action_listeners):
+            listener(self.now, action, run.stream.name, seconds)
+
+    def act(self, action: str, stream_name: str, seconds: int = 0):
+        """ Press a button by name, as recorded by an action listener """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}'")
+        run = self.runs[stream_name]
+        if action in ("hold", "extend", "reduce"):
+            getattr(self, action)(run, seconds)
+        else:
+            getattr(self, action)(run)
+
+    def _emit(self, kind: str, run: typing.Optional[StreamRun], message: str = "", seconds: int = 0, time: typing.Optional[int] = None):
+        event = Event(self.now if time is None else time, kind, run.stream.name if run is not None else "",
+                      run.current_task if run is not None else None, message, seconds)
+        if self.trace is not None:
+            self.trace.append(event)
+        for listener in list(self.listeners):
+            listener(event)
+
+    @property
+    def go(self) -> typing.Optional[StreamRun]:
+        return self.runs.get(self.w.go_stream.name)
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.runs) and all(run.done for run in self.runs.values())
+
+    def open(self) -> StreamRun:
+        """ The GoStream, waiting for Start """
+        return self.start_stream(self.w.go_stream, auto_start=False)
+
+    def start_stream(self, stream, triggered_by=None, auto_start: bool = True) -> StreamRun:
+        if stream.name in self.runs:
+            raise ValueError(f"An instance with stream_name '{stream.name}' has already been triggered/in register!")
+        stream.ensure_resolved() # no-op unless the workflow was built lazily and this stream hasn't been reached yet
+        run = StreamRun(stream, self.states, triggered_by)
+        self.runs[stream.name] = run
+        self._prepare(run)
+        hold = self.plan.hold_seconds(stream.name, self.now) if self.plan is not None and auto_start else 0
+        run.running = auto_start and hold <= 0
+        self._emit(STREAM_STARTED, run)
+        self._announce(run)
+        if hold > 0:
+            self._hold(run, hold)
+        return run
+
+    def _prepare(self, run: StreamRun):
+        task = run.current_task
+        live = self.states.get(task.fullname)
+        if live is not None: # resume state if it has been started before
+            #User feedback change -  we "floor" the timer at 30 seconds if the user goes back
+            if live.remaining_time < BACK_FLOOR_SECONDS and task.duration > BACK_FLOOR_SECONDS:
+                live.remaining_time = BACK_FLOOR_SECONDS
+        else:
+            live = self.states[task.fullname] = TaskState(duration=task.duration, remaining_time=task.duration,
+                                                          red=task.red, amber=task.amber, green=task.green)
+            set_live_text(run.stream, task, live)
+
+    def _announce(self, run: StreamRun):
+        self._emit(TASK_STARTED, run)
+        if run.current_task.StartMessage != "":
+            logger.info(f"{run.current_task.title}:  Starting task; generating alert: {run.current_task.StartMessage}")
+            self._emit(START_MESSAGE, run, message=run.current_task.StartMessage)
+
+    # the buttons
+
+    def hold(self, run: StreamRun, seconds: int):
+        """ Finish-together plan - wait before starting so this stream finishes with the others """
+        self._acted("hold", run, seconds)
+        self._hold(run, seconds)
+
+    def _hold(self, run: StreamRun, seconds: int):
+        run.running = False
+        run.hold_remaining = seconds
+        self._emit(HELD, run, seconds=seconds)
+
+    def start(self, run: StreamRun):
+        self._acted("start", run)
+        self._start(run)
+
+    def _start(self, run: StreamRun):
+        run.hold_remaining = None # started before its planned start, if held
+        run.running = True
+        logger.info(f"{run.stream.name}: kick off timing - first task triggered")
+        self._emit(STARTED, run)
+
+    def pause(self, run: StreamRun):
+        self._acted("pause", run)
+        if not run.running:
+            return
+        run.running = False
+        run.live.pause_count += 1
+        self._emit(PAUSED, run)
+
+    def resume(self, run: StreamRun):
+        self._acted("resume", run)
+        if run.running or run.done:
+            return
+        run.hold_remaining = None
+        run.running = True
+        self._emit(RESUMED, run)
+
+    def extend(self, run: StreamRun, seconds: int = EXTEND_SECONDS):
+        self._acted("extend", run, seconds)
+        run.live.extend_count += 1
+        run.live.remaining_time += seconds
+        self._emit(EXTENDED, run, seconds=seconds)
+
+    def reduce(self, run: StreamRun, seconds: int = EXTEND_SECONDS):
+        self._acted("reduce", run, seconds)
+        run.live.reduce_count += 1
+        run.live.remaining_time -= seconds
+        self._emit(REDUCED, run, seconds=seconds)
+
+    def back(self, run: StreamRun):
+        self._acted("back", run)
+        if run.current_task.task_previous is None:
+            return
+        run.current_task = run.current_task.task_previous
+        run.done = False
+        logger.info(f"Resetting; current_task is now {run.current_task.fullname}")
+        self._prepare(run)
+        self._announce(run)
+
+    def done(self, run: StreamRun):
+        self._acted("done", run)
+        self._done(run)
+
+    def _done(self, run: StreamRun):
+        if run.done:
+            return
+        if run.waiting:
+            self._start(run)
+            return
+        task = run.current_task
+        self._emit(TASK_DONE, run, seconds=run.live.elapsed)
+        for stream in task.trigger_stream_list:
+            try:
+                logger.info(f"Attempting to trigger stream {stream.name} from task {task.fullname}!")
+                self.start_stream(stream, triggered_by=task)
+                logger.info(f"Success: done trigger stream {stream.name} from task {task.fullname}!")
+            except Exception as e:
+                logger.exception(f"Failed to trigger stream {stream.name} from task {task.fullname} {e}!")
+        if task.task_next is not None:
+            run.current_task = task.task_next
+            run.running = True # Done while paused restarts the timer
+            logger.info(f"Resetting; current_task is now {run.current_task.fullname}")
+            self._prepare(run)
+            self._announce(run)
+        else:
+            run.running = False
+            run.done = True
+            logger.info(f"Done triggered on {task.name} - no following task so stream {run.stream.name} is complete")
+            self._emit(STREAM_DONE, run)
+
+    # saving and rebuilding the state
+
+    def task(self, fullname: str):
+        stream_name, _, task_name = fullname.partition("/")
+        stream = self.w.stream_name_to_stream_reference_map[stream_name]
+        stream.ensure_resolved()
+        return stream.task_name_map[task_name]
+
+    def snapshot(self) -> dict:
+        """ Everything needed to carry on from here, as plain JSON-able values """
+        tasks = {fullname: [live.remaining_time, live.extend_count, live.reduce_count, live.pause_count, live.elapsed]
+                 for fullname, live in self.states.items()}
+        return {
+            "now": self.now,
+            "runs": [{"stream": name, "task": run.current_task.name, "running": run.running, "done": run.done,
+                      "hold": run.hold_remaining, "triggered_by": run.triggered_by.fullname if run.triggered_by is not None else None}
+                     for name, run in self.runs.items()],
+            "tasks": tasks,
+        }
+
+    def restore(self, state: dict):
+        """ Carry on from a snapshot(), replacing any state the engine has; the Streams are announced as they were """
+        self.runs = {}
+        self.states = {}
+        self.now = state["now"]
+        self._emit(RESTORED, None)
+        for fullname, (remaining, extends, reduces, pauses, elapsed) in state["tasks"].items():
+            task = self.task(fullname)
+            live = self.states[fullname] = TaskState(duration=task.duration, remaining_time=remaining, red=task.red, amber=task.amber,
+                                                     green=task.green, extend_count=extends, reduce_count=reduces,
+                                                     pause_count=pauses, elapsed=elapsed)
+            set_live_text(self.w.stream_name_to_stream_reference_map[fullname.partition("/")[0]], task, live)
+        for saved in state["runs"]:
+            stream = self.w.stream_name_to_stream_reference_map[saved["stream"]]
+            run = StreamRun(stream, self.states, self.task(saved["triggered_by"]) if saved["triggered_by"] else None)
+            run.current_task = self.task(f"{stream.name}/{saved['task']}")
+            run.running, run.done, run.hold_remaining = saved["running"], saved["done"], saved["hold"]
+            self.runs[stream.name] = run
+            self._emit(STREAM_STARTED, run)
+            if run.held:
+                self._emit(HELD, run, seconds=run.hold_remaining)
+            elif run.done:
+                self._emit(STREAM_DONE, run)
+
+    # the clock
+
+    def advance(self, dt: typing.Optional[int] = None):
+        """ Move the clock on dt seconds (default: one tick) """
+        end = self.now + (self.tick if dt is None else dt)
+        while True:
+            self._fire_due()
+            if self.now >= end:
+                break
+            # up to the next thing that changes a Stream's task
+            step = end - self.now
+            change = self.next_change()
+            if change is not None:
+                step = min(step, change)
+            crossed = []
+            for run in list(self.runs.values()):
+                self._count(run, step, crossed)
+            crossed.sort(key=lambda item: item[0])
+            for time, kind, run, message in crossed:
+                self._emit(kind, run, message=message, time=time)
+            self.now += step
+
+    def next_change(self) -> typing.Optional[int]:
+        """ Seconds until the engine moves a Stream on by itself (an Autoprogress task or a hold reaching zero), or None """
+        change = None
+        for run in self.runs.values():
+            if run.held:
+                seconds = run.hold_remaining
+            elif run.running and run.current_task.Autoprogress:
+                seconds = run.live.remaining_time
+            else:
+                continue
+            change = seconds if change is None else min(change, seconds)
+        return change
+
+    def _fire_due(self):
+        fired = True
+        while fired:
+            fired = False
+            for run in list(self.runs.values()):
+                if run.held and run.hold_remaining <= 0:
+                    run.hold_remaining = None
+                    logger.info(f"{run.stream.name}: planned start reached")
+                    self._emit(HOLD_OVER, run, message=f"Start {run.stream.title} now")
+                    if not self.prompt:
+                        self._start(run)
+                    fired = True
+                elif run.running and run.current_task.Autoprogress and run.live.remaining_time <= 0:
+                    logger.info(f"{run.current_task.title}:  Timer expired; moving to next task")
+                    self._emit(AUTOPROGRESS, run)
+                    self._done(run)
+                    fired = True
+
+    def _count(self, run: StreamRun, step: int, crossed: list):
+        """ Count run down by step seconds; adds (time, kind, run, message) for every alert it crosses """
+        if run.held:
+            run.hold_remaining -= step
+            return
+        if not run.running:
+            return
+        task, live = run.current_task, run.live
+        before = live.remaining_time
+        after = before - step
+        live.remaining_time = after
+        live.elapsed += step
+        for kind, threshold in ((GREEN, live.green), (AMBER, live.amber), (RED, live.red)):
+            if threshold > 0 and before > threshold >= after:
+                crossed.append((self.now + before - threshold, kind, run, ""))
+        if task.Autoprogress: # moves on at zero instead
+            return
+        if before > 0 >= after:
+            message = task.CheckMessage if task.CheckEverySeconds > 0 else f"Overrun {run.stream.title}" #User feedback change -  ensure there is a message for all overrunning tasks
+            crossed.append((self.now + before, DUE, run, message))
+        if task.CheckEverySeconds > 0:
+            every = task.CheckEverySeconds
+            repeat = -(-min(before, 0) // every + 1) * every # the first multiple below zero not yet passed
+            while repeat >= after:
+                crossed.append((self.now + before - repeat, CHECK, run, task.CheckMessage))
+                repeat -= every
@@ -0,0 +1,490 @@
+import logging
+import argparse
+import heapq
+import json
+import sys
+import typing
+from dataclasses import dataclass, field
+
+from WorkflowTiming import _minutes
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Scheduling a workflow around the cook and the kitchen equipment.
+An "Active" task needs the operator's hands for its whole duration; a "Background" task runs unattended.
+A task can also list the Equipment it occupies while it runs (e.g. "Equipment" : ["Stove", "SmallPan"]);
+the PreFlight EssentialEquipment/OptionalEquipment says what the kitchen has - one of each, or
+"Stove : 4" for four of them.
+The critical path analysis (WorkflowStream.timing()) assumes every task starts as soon as it can, so two
+Streams can ask for the operator, or the same pan, at once - the cook falls behind and every Stream waiting
+on them slips.
+- active_conflicts() finds the times the unconstrained plan needs more of a resource than there is
+- list_schedule() serializes them: whenever a resource is free, the ready task that ranks first goes next;
+  tasks needing nothing never wait. Within a Stream tasks stay in order and a triggered Stream starts when
+  its triggering task is done, as in WorkflowTiming. Equipment a task hands straight on to the next task in
+  its Stream (the pan the eggs go on boiling in) is kept, not freed for another Stream in between.
+- ResourceSchedule runs the list schedule with several priority rules and keeps the best, alongside a lower
+  bound no schedule can beat and a report of which resource held things up (the bottleneck)
+- OperatorSchedule is the same with just the operator: least slack (earliest latest-start) first
+- CookAssignment (below) shares the Streams out between several cooks
+The player shows the conflicts, and how much longer the cook and equipment make the recipe, before it starts.
+
+    python3 WorkflowScheduler.py recipes/recipe-eggs-toast-and-soldiers.jsonc [--json] [--cooks 2 [--assign]] [--no-equipment]
+"""
+
+OPERATOR = "Operator"
+
+
+def operator_needs(task) -> tuple:
+    """ Resources a task holds while it runs: the operator, for Active tasks """
+    return (OPERATOR,) if task.type == "Active" else ()
+
+
+def equipment_capacity(w) -> dict:
+    """ Equipment name -> how many the kitchen has, from the PreFlight equipment lists ("Stove : 4" -> 4) """
+    capacity = {}
+    if w.pre_checklist is None or not isinstance(w.pre_checklist.dictionary, dict):
+        return capacity
+    for key in ("EssentialEquipment", "OptionalEquipment"):
+        entries = w.pre_checklist.dictionary.get(key) or []
+        if isinstance(entries, str):
+            entries = [entries]
+        for entry in entries:
+            name, _, count = str(entry).partition(":")
+            try:
+                capacity[name.strip()] = max(int(count), 1)
+            except ValueError:
+                capacity[name.strip()] = 1
+    return capacity
+
+
+@dataclass
+class Conflict:
+    resource: str
+    start: int
+    finish: int
+    tasks: list = field(default_factory=list)   # task fullnames, in the order they start
+    capacity: int = 1
+
+    def describe(self) -> str:
+        names = ", ".join(f"'{name}'" for name in self.tasks)
+        both = "both" if len(self.tasks) == 2 else "all"
+        there_are = f" (there are {self.capacity})" if self.capacity > 1 else ""
+        return f"{names} {both} need the {self.resource}{there_are} between {_minutes(self.start)} and {_minutes(self.finish)}"
+
+
+def active_conflicts(w, needs: typing.Callable = operator_needs, capacity: typing.Optional[dict] = None) -> list:
+    """ Times when the unconstrained (critical path) plan has more tasks holding a resource than there are of it """
+    timing = w.timing()
+    capacity = capacity or {}
+    intervals = {}  # resource -> [(start, finish, fullname)]
+    for stream in w.stream_list:
+        for task in stream.task_list:
+            start = timing.earliest_start.get(task.fullname)
+            if start is None or timing.earliest_finish[task.fullname] <= start:
+                continue
+            for resource in needs(task):
+                intervals.setdefault(resource, []).append((start, timing.earliest_finish[task.fullname], task.fullname))
+
+    conflicts = []
+    for resource, spans in intervals.items():
+        available = capacity.get(resource, 1)
+        # sweep: a task finishing at t doesn't overlap one starting at t, so ends (0) sort before starts (1)
+        events = sorted([(start, 1, name) for start, _, name in spans] + [(finish, 0, name) for _, finish, name in spans])
+        holding = {}
+        conflict = None
+        for time_now, starting, name in events:
+            if starting:
+                holding[name] = time_now
+                if conflict is not None:
+                    conflict.tasks.append(name)
+                elif len(holding) > available:
+                    conflict = Conflict(resource, time_now, time_now, list(holding), available)
+            else:
+                del holding[name]
+                if conflict is not None and len(holding) <= available:
+                    conflict.finish = time_now
+                    conflicts.append(conflict)
+                    conflict = None
+    conflicts.sort(key=lambda conflict: (conflict.start, conflict.resource))
+    return conflicts
+
+
+def list_schedule(w, needs: typing.Callable, priority: typing.Callable,
+                  capacity: typing.Optional[dict] = None) -> typing.Tuple[dict, dict, dict]:
+    """
+    Non-delay list schedule: whenever tasks are ready, they start in priority order (lowest first) if all the
+    resources they need are free; a resource not in capacity has one. Equipment a task lists that the next task
+    in its Stream needs too is kept for that task rather than freed. Returns (start, finish) by task fullname,
+    and resource -> seconds ready tasks spent waiting for it.
+    """
+    timing = w.timing()
+    capacity = capacity or {}
+    starts = {}  # task fullname -> Streams its Done starts (as in the critical path analysis)
+    for name, task in timing.started_by.items():
+        if task is not None:
+            starts.setdefault(task.fullname, []).append(w.stream_name_to_stream_reference_map[name])
+
+    start, finish, blocked = {}, {}, {}
+    ready = [w.go_stream.task_first] if w.go_stream.task_first is not None else []
+    running = []    # heap of (finish, sequence, task)
+    in_use = {}     # resource -> how many are held
+    kept = {}       # task fullname -> equipment the task before it in its Stream held on for it
+    sequence = 0
+    time_now = 0
+    while ready or running:
+        waiting = []    # (task, the resources it is waiting for)
+        for task in sorted(ready, key=priority):
+            resources = needs(task)
+            held = kept.get(task.fullname, ())
+            short = [resource for resource in resources
+                     if resource not in held and in_use.get(resource, 0) >= capacity.get(resource, 1)]
+            if short:
+                waiting.append((task, short))
+                continue
+            for resource in resources:
+                if resource not in held:
+                    in_use[resource] = in_use.get(resource, 0) + 1
+            start[task.fullname] = time_now
+            finish[task.fullname] = time_now + max(task.duration, 0)
+            heapq.heappush(running, (finish[task.fullname], sequence, task))
+            sequence += 1
+        ready = [task for task, _ in waiting]
+        if not running:  # nothing left to free a resource
+            break
+        time_next = running[0][0]
+        for _, short in waiting:
+            for resource in short:
+                blocked[resource] = blocked.get(resource, 0) + time_next - time_now
+        time_now = time_next
+        while running and running[0][0] == time_now:
+            _, _, task = heapq.heappop(running)
+            handed_on = ()
+            if task.task_next is not None: # the operator/cook is free between tasks; the equipment stays put
+                handed_on = tuple(resource for resource in needs(task) if resource in task.equipment and resource in needs(task.task_next))
+                if handed_on:
+                    kept[task.task_next.fullname] = handed_on
+            for resource in needs(task):
+                if resource not in handed_on:
+                    in_use[resource] -= 1
+            if task.task_next is not None:
+                ready.append(task.task_next)
+            for stream in starts.get(task.fullname, ()):
+                if stream.task_first is not None:
+                    ready.append(stream.task_first)
+    return start, finish, blocked
+
+
+def priority_rules(w) -> dict:
+    """ Rule name -> priority key for list_schedule (lowest first); ties fall back to least slack, then name """
+    timing = w.timing()
+    work_left = {}  # task fullname -> seconds of its Stream left, from the start of the task
+    for stream in w.stream_list:
+        left = 0
+        for task in reversed(stream.task_list):
+            left += max(task.duration, 0)
+            work_left[task.fullname] = left
+
+    def tie(task):
+        return timing.latest_start[task.fullname], task.fullname
+    return {
+        "least slack": lambda task: (timing.latest_start[task.fullname], timing.earliest_start[task.fullname], task.fullname),
+        "earliest start": lambda task: (timing.earliest_start[task.fullname],) + tie(task),
+        "most work left": lambda task: (-work_left[task.fullname],) + tie(task),
+        "longest task": lambda task: (-max(task.duration, 0),) + tie(task),
+        "shortest task": lambda task: (max(task.duration, 0),) + tie(task),
+    }
+
+
+class ResourceSchedule:
+    def __init__(self, w, operators: int = 1, equipment: bool = True, rules: typing.Optional[typing.Iterable[str]] = None):
+        timing = w.timing()
+        self.workflow_name = w.name
+        self.operators = operators
+        self.equipment = equipment
+        self.unconstrained_makespan = timing.makespan
+        self.warnings_found = []
+        self.capacity = equipment_capacity(w) if equipment else {}
+        if operators > 0:
+            self.capacity[OPERATOR] = operators
+        needs = self._needs
+        for stream in w.stream_list:
+            for task in stream.task_list:
+                for resource in needs(task):
+                    if resource not in self.capacity:
+                        warning = f"Task '{task.fullname}' uses '{resource}' which isn't in the PreFlight equipment; assuming there is one"
+                        logger.warning(warning)
+                        self.warnings_found.append(warning)
+                        self.capacity[resource] = 1
+        self.conflicts = active_conflicts(w, needs, self.capacity)
+
+        # every rule is cheap, so try them all and keep the best; the first listed wins a tie
+        all_rules = priority_rules(w)
+        self.rule_makespans = {}
+        best = None
+        for rule in (rules or all_rules):
+            start, finish, blocked = list_schedule(w, needs, all_rules[rule], self.capacity)
+            makespan = max(finish.values(), default=0)
+            self.rule_makespans[rule] = makespan
+            if best is None or makespan < best[0]:
+                best = (makespan, rule, start, finish, blocked)
+        self.makespan, self.rule, self.start, self.finish, self.blocked = best
+
+        self.tasks = []     # scheduled Tasks, in start order
+        self.waits = {}     # task fullname -> seconds later than the unconstrained plan
+        self.busy = {}      # resource -> seconds held, summed over tasks (only the resources tasks use)
+        for stream in w.stream_list:
+            for task in stream.task_list:
+                if task.fullname not in self.start:
+                    continue
+                self.tasks.append(task)
+                for resource in needs(task):
+                    self.busy[resource] = self.busy.get(resource, 0) + max(task.duration, 0)
+                delay = self.start[task.fullname] - timing.earliest_start[task.fullname]
+                if delay > 0:
+                    self.waits[task.fullname] = delay
+        self.tasks.sort(key=lambda task: (self.start[task.fullname], self.finish[task.fullname]))
+        # neither the precedence constraints nor any one resource, kept fully busy, can be beaten
+        self.lower_bound = max([self.unconstrained_makespan] +
+                               [-(-busy // self.capacity[resource]) for resource, busy in self.busy.items()])
+
+    def _needs(self, task) -> tuple:
+        resources = task.equipment if self.equipment else ()
+        if self.operators > 0 and task.type == "Active":
+            resources = (OPERATOR,) + tuple(resources)
+        return tuple(dict.fromkeys(resources))
+
+    @property
+    def delay(self) -> int:
+        return self.makespan - self.unconstrained_makespan
+
+    @property
+    def bottlenecks(self) -> list:
+        """ Resources, the one that held tasks up longest (then the busiest) first """
+        usage = []
+        for resource, busy in self.busy.items():
+            usage.append({"resource": resource, "capacity": self.capacity[resource], "busy": busy,
+                          "utilisation": busy / (self.capacity[resource] * self.makespan) if self.makespan else 0,
+                          "blocked": self.blocked.get(resource, 0)})
+        usage.sort(key=lambda entry: (-entry["blocked"], -entry["utilisation"], entry["resource"]))
+        return usage
+
+    def _constraint(self) -> str:
+        parts = []
+        if self.operators > 0:
+            parts.append("one cook" if self.operators == 1 else f"{self.operators} cooks")
+        if self.equipment:
+            parts.append("the equipment")
+        return " and ".join(parts) or "no constraints"
+
+    def warnings(self) -> list:
+        """ What the operator should know before starting """
+        warnings = self.warnings_found + [conflict.describe() for conflict in self.conflicts]
+        if self.delay > 0:
+            warnings.append(f"With {self._constraint()} '{self.workflow_name}' takes {_minutes(self.makespan)} rather than {_minutes(self.unconstrained_makespan)}")
+            bottleneck = self.bottlenecks[0]
+            if bottleneck["blocked"] > 0:
+                warnings.append(f"The {bottleneck['resource']} is the bottleneck: tasks wait {_minutes(bottleneck['blocked'])} for it")
+        return warnings
+
+    def report(self) -> dict:
+        return {
+            "workflow": self.workflow_name,
+            "makespan": self.makespan,
+            "rule": self.rule,
+            "rule_makespans": self.rule_makespans,
+            "unconstrained_makespan": self.unconstrained_makespan,
+            "lower_bound": self.lower_bound,
+            "resources": self.bottlenecks,
+            "conflicts": [{"resource": conflict.resource, "start": conflict.start, "finish": conflict.finish, "tasks": conflict.tasks}
+                          for conflict in self.conflicts],
+            "tasks": {task.fullname: {"start": self.start[task.fullname], "finish": self.finish[task.fullname],
+                                      "wait": self.waits.get(task.fullname, 0)}
+                      for task in self.tasks},
+        }
+
+
+class OperatorSchedule(ResourceSchedule):
+    """ Just the operator: Active tasks in least-slack order """
+    def __init__(self, w):
+        super().__init__(w, operators=1, equipment=False, rules=("least slack",))
+
+    @property
+    def operator_order(self) -> list:
+        """ Active tasks, in the order the operator does them """
+        return [task for task in self.tasks if task.type == "Active"]
+
+    @property
+    def active_seconds(self) -> int:
+        return self.busy.get(OPERATOR, 0)
+
+    def report(self) -> dict:
+        report = super().report()
+        report["operator_order"] = [task.fullname for task in self.operator_order]
+        report["active_seconds"] = self.active_seconds
+        return report
+
+
+"""
+Several cooks, each looking after whole Streams.
+CookAssignment gives every Stream to one cook - nobody picks up a Stream half way through - and schedules
+the Active tasks with each cook as a unit-capacity resource (plus the shared equipment), as list_schedule
+does for one. Streams are handed out largest hands-on time first, each to the cook that gives the earliest
+finish so far (then the least loaded); then single Streams are moved between cooks while that finishes
+sooner or evens out the load. Streams with no Active tasks don't need a cook; they go to the least loaded.
+The player's --cooks N shows one lane per cook.
+"""
+class CookAssignment:
+    def __init__(self, w, cooks: int, equipment: bool = True, passes: int = 3):
+        timing = w.timing()
+        self.workflow_name = w.name
+        self.cooks = [f"Cook {number}" for number in range(1, max(cooks, 1) + 1)]
+        self.unconstrained_makespan = timing.makespan
+        capacity = equipment_capacity(w) if equipment else {}
+        capacity.update({cook: 1 for cook in self.cooks})
+        priority = priority_rules(w)["least slack"]
+        streams = [stream for stream in w.stream_list if stream.name in timing.stream_start]
+        self.active_seconds = {stream.name: sum(max(task.duration, 0) for task in stream.task_list if task.type == "Active")
+                               for stream in streams}
+        self.cook_of = {}   # Stream name -> cook
+
+        def needs(task) -> tuple:
+            resources = tuple(task.equipment) if equipment else ()
+            cook = self.cook_of.get(timing.stream_of_task[task.fullname])
+            if cook is not None and task.type == "Active":
+                resources = (cook,) + resources
+            return tuple(dict.fromkeys(resources))
+
+        def evaluate() -> typing.Tuple[int, int]:
+            _, finish, _ = list_schedule(w, needs, priority, capacity)
+            return max(finish.values(), default=0), max(self.loads().values())
+
+        # greedy: biggest hands-on Streams first, each to the cook that finishes everything soonest
+        hands_on = sorted((stream for stream in streams if self.active_seconds[stream.name] > 0),
+                          key=lambda stream: (-self.active_seconds[stream.name], timing.stream_start[stream.name]))
+        for stream in hands_on:
+            best = None
+            for cook in self.cooks:
+                self.cook_of[stream.name] = cook
+                makespan, _ = evaluate()
+                score = (makespan, self.loads()[cook], self.cooks.index(cook))
+                if best is None or score < best[0]:
+                    best = (score, cook)
+            self.cook_of[stream.name] = best[1]
+
+        # then move single Streams while it helps
+        current = evaluate()
+        for _ in range(passes):
+            improved = False
+            for stream in hands_on:
+                home = self.cook_of[stream.name]
+                for cook in self.cooks:
+                    if cook == home:
+                        continue
+                    self.cook_of[stream.name] = cook
+                    candidate = evaluate()
+                    if candidate < current:
+                        current, home, improved = candidate, cook, True
+                self.cook_of[stream.name] = home
+            if not improved:
+                break
+
+        for stream in streams:  # hands-off Streams need nobody; give them to whoever has least to do
+            if stream.name not in self.cook_of:
+                loads = self.loads()
+                self.cook_of[stream.name] = min(self.cooks, key=lambda cook: (loads[cook], self.cooks.index(cook)))
+        self.start, self.finish, self.blocked = list_schedule(w, needs, priority, capacity)
+        self.makespan = max(self.finish.values(), default=0)
+        self.waits = {fullname: start - timing.earliest_start[fullname]
+                      for fullname, start in self.start.items() if start > timing.earliest_start[fullname]}
+        # neither the precedence constraints nor the cooks, kept fully busy, can be beaten
+        self.lower_bound = max(self.unconstrained_makespan, -(-sum(self.active_seconds.values()) // len(self.cooks)))
+
+    def loads(self) -> dict:
+        """ Cook -> seconds of Active tasks in the Streams given to them """
+        loads = {cook: 0 for cook in self.cooks}
+        for name, cook in self.cook_of.items():
+            loads[cook] += self.active_seconds[name]
+        return loads
+
+    def streams_of(self, cook: str) -> list:
+        return [name for name, assigned in self.cook_of.items() if assigned == cook]
+
+    def warnings(self) -> list:
+        warnings = []
+        if self.makespan > self.unconstrained_makespan:
+            warnings.append(f"With {len(self.cooks)} cooks '{self.workflow_name}' takes {_minutes(self.makespan)} rather than {_minutes(self.unconstrained_makespan)}")
+        for cook, blocked in self.blocked.items():
+            if cook in self.cooks and blocked > 0:
+                warnings.append(f"{cook} has more than one Stream needing them at once: tasks wait {_minutes(blocked)} in all")
+        return warnings
+
+    def report(self) -> dict:
+        loads = self.loads()
+        return {
+            "workflow": self.workflow_name,
+            "makespan": self.makespan,
+            "unconstrained_makespan": self.unconstrained_makespan,
+            "lower_bound": self.lower_bound,
+            "cooks": {cook: {"streams": self.streams_of(cook), "active_seconds": loads[cook], "waited": self.blocked.get(cook, 0)}
+                      for cook in self.cooks},
+            "tasks": {fullname: {"start": start, "finish": self.finish[fullname], "wait": self.waits.get(fullname, 0)}
+                      for fullname, start in sorted(self.start.items(), key=lambda item: item[1])},
+        }
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+
+    parser = argparse.ArgumentParser(description="Schedules a recipe around the cook and the equipment: finds the tasks that need the same thing at once and orders them to finish as soon as possible")
+    parser.add_argument("filename", help="recipe/workflow in json/jsonc format")
+    parser.add_argument("--json", action="store_true", help="print the schedule as JSON")
+    parser.add_argument("--cooks", type=int, default=1, help="number of cooks sharing the Active tasks (0 = don't limit them)")
+    parser.add_argument("--no-equipment", action="store_true", help="ignore the Equipment tasks use")
+    parser.add_argument("--assign", action="store_true", help="give each stream to one of the cooks, balancing their load")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    w, warnings = load_workflow(args.filename)
+    if args.assign:
+        assignment = CookAssignment(w, args.cooks, equipment=not args.no_equipment)
+        if args.json:
+            print(json.dumps(assignment.report(), indent=2))
+            sys.exit(0)
+        print(f"{w.name}: {_minutes(assignment.makespan)} with {len(assignment.cooks)} cook(s), "
+              f"{_minutes(assignment.unconstrained_makespan)} unconstrained; no assignment can beat {_minutes(assignment.lower_bound)}")
+        loads = assignment.loads()
+        for cook in assignment.cooks:
+            print(f"  {cook}: {_minutes(loads[cook])} hands-on - {', '.join(assignment.streams_of(cook)) or 'nothing'}")
+        for warning in assignment.warnings():
+            print(f"  {warning}")
+        sys.exit(0)
+    schedule = ResourceSchedule(w, operators=args.cooks, equipment=not args.no_equipment)
+    if args.json:
+        print(json.dumps(schedule.report(), indent=2))
+        sys.exit(0)
+    print(f"{w.name}: {_minutes(schedule.makespan)} with {schedule._constraint()} ({schedule.rule} first), "
+          f"{_minutes(schedule.unconstrained_makespan)} unconstrained; no schedule can beat {_minutes(schedule.lower_bound)}")
+    print("  " + ", ".join(f"{rule}: {_minutes(makespan)}" for rule, makespan in schedule.rule_makespans.items()))
+    for warning in schedule.warnings_found:
+        print(f"  warning: {warning}")
+    for conflict in schedule.conflicts:
+        print(f"  conflict: {conflict.describe()}")
+    print(f"{'resource':16} {'have':>5} {'busy':>7} {'used':>5} {'waited':>7}")
+    for entry in schedule.bottlenecks:
+        print(f"{entry['resource']:16} {entry['capacity']:>5} {_minutes(entry['busy']):>7} "
+              f"{entry['utilisation']:>5.0%} {_minutes(entry['blocked']):>7}")
+    print(f"{'start':>7} {'finish':>7} {'wait':>7}  task")
+    for task in schedule.tasks:
+        uses = ", ".join(schedule._needs(task))
+        print(f"{_minutes(schedule.start[task.fullname]):>7} {_minutes(schedule.finish[task.fullname]):>7} "
+              f"{_minutes(schedule.waits.get(task.fullname, 0)):>7}  {task.fullname}" + (f"  [{uses}]" if uses else ""))
@@ -0,0 +1,197 @@
+import logging
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+import typing
+
+from WorkflowEngine import WorkflowEngine, Event, TASK_STARTED, STARTED, HOLD_OVER
+from WorkflowTiming import FinishTogetherPlan, _minutes
+from MonteCarlo import duration_range, load_history
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+A whole recipe session on a virtual clock: WorkflowEngine driven by simulated Done presses.
+Nothing ticks. The next thing that can happen is either a Done press (scheduled when a task starts) or the
+engine moving a Stream on by itself (an Autoprogress task or a finish-together hold reaching zero -
+WorkflowEngine.next_change()), so the clock jumps straight there with engine.advance(); the alerts on the
+way are found by what the countdowns crossed and stamped with the second they happened. A session of any
+length takes milliseconds.
+How long the cook takes before pressing Done on a task (from the moment it starts):
+- a script, {task fullname: seconds} - for reproducing a session
+- otherwise recorded history (MonteCarlo.load_history), picked at random
+- otherwise "planned" - exactly DurationSeconds - or "sample" - triangular over the task's range
+  (DurationMinSeconds/DurationMaxSeconds, or MonteCarlo's default spread for its type)
+plus a reaction time (exponential, reaction seconds on average) for noticing the alert. Autoprogress tasks
+move on by themselves. With a finish-together plan and prompt, Start is pressed a reaction time after the prompt.
+The result is the engine's full event trace: task starts and Done presses, Start/Check/overrun messages,
+Green/Amber/Red, Streams triggered and held.
+
+    python3 WorkflowSimulator.py recipes/recipe-simple.jsonc [--mode sample --seed 1 --reaction 10] [--script script.json] [--json trace.json]
+"""
+
+DEFAULT_LIMIT = 24 * 60 * 60  # a session that is still going after a day is stuck
+
+
+class SimulationResult:
+    def __init__(self, engine: WorkflowEngine, stuck: bool, wall_seconds: float):
+        self.trace = engine.trace
+        self.finished = engine.finished
+        self.stuck = stuck
+        self.makespan = engine.now
+        self.wall_seconds = wall_seconds
+        self.unfinished = [name for name, run in engine.runs.items() if not run.done]
+
+    def events(self, *kinds: str) -> list:
+        return [event for event in self.trace if not kinds or event.kind in kinds]
+
+    def report(self) -> dict:
+        return {
+            "finished": self.finished,
+            "stuck": self.stuck,
+            "makespan": self.makespan,
+            "unfinished": self.unfinished,
+            "trace": [{"time": event.time, "kind": event.kind, "stream": event.stream,
+                       "task": event.task.fullname if event.task is not None else None,
+                       "message": event.message, "seconds": event.seconds} for event in self.trace],
+        }
+
+
+class WorkflowSimulator:
+    def __init__(self, w, mode: str = "planned", script: typing.Optional[dict] = None, history: typing.Optional[dict] = None,
+                 reaction: float = 0, seed: typing.Optional[int] = None, plan: typing.Optional[FinishTogetherPlan] = None,
+                 prompt: bool = False, limit: int = DEFAULT_LIMIT):
+        if mode not in ("planned", "sample"):
+            raise ValueError(f"Unknown simulation mode '{mode}'; use 'planned' or 'sample'")
+        self.w = w
+        self.mode = mode
+        self.script = script or {}
+        self.history = history or {}
+        self.reaction = reaction
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.plan = plan
+        self.prompt = prompt
+        self.limit = limit
+
+    def done_after(self, task) -> int:
+        """ Seconds from a task starting to Done being pressed """
+        if task.fullname in self.script:
+            seconds = self.script[task.fullname]
+        elif self.history.get(task.fullname):
+            seconds = self.rng.choice(self.history[task.fullname])
+        elif self.mode == "sample":
+            low, high = duration_range(task)
+            seconds = self.rng.triangular(low, high, min(max(task.duration, low), high))
+        else:
+            seconds = task.duration
+        return max(int(round(seconds + self._reaction())), 0)
+
+    def _reaction(self) -> float:
+        return self.rng.expovariate(1 / self.reaction) if self.reaction > 0 else 0
+
+    def run(self) -> SimulationResult:
+        """ One session; each run starts afresh (its own engine and task state, the rng back at seed) """
+        wall_start = time.perf_counter()
+        self.rng = random.Random(self.seed)
+        engine = WorkflowEngine(self.w, plan=self.plan, prompt=self.prompt, trace=True)
+        presses = []    # heap of (time, order, stream name, task) - the task it was meant for, in case it has moved on
+        order = 0
+
+        def schedule(event: Event):
+            nonlocal order
+            run = engine.runs.get(event.stream)
+            if event.kind in (TASK_STARTED, STARTED) and run.running and not run.current_task.Autoprogress:
+                at = event.time + self.done_after(run.current_task)
+            elif event.kind == HOLD_OVER and self.prompt:
+                at = event.time + int(round(self._reaction()))
+            else:
+                return
+            heapq.heappush(presses, (at, order, event.stream, run.current_task))
+            order += 1
+
+        engine.subscribe(schedule)
+        go = engine.open()
+        if self.plan is not None:
+            hold = self.plan.hold_seconds(self.w.go_stream.name, 0)
+            if hold > 0:
+                engine.hold(go, hold)
+        if not go.held:
+            engine.done(go) # Start
+        stuck = False
+        while not engine.finished:
+            target = presses[0][0] if presses else None
+            change = engine.next_change()
+            if change is not None and (target is None or engine.now + change < target):
+                target = engine.now + change
+            if target is None:
+                stuck = True    # nothing left that will move on: a Stream waiting for a Start nobody presses
+                break
+            if target > self.limit:
+                stuck = True
+                break
+            engine.advance(target - engine.now)
+            while presses and presses[0][0] <= engine.now:
+                _, _, stream_name, task = heapq.heappop(presses)
+                run = engine.runs[stream_name]
+                if run.current_task is task and not run.done and (run.running or run.waiting):
+                    engine.done(run)
+        if stuck:
+            logger.warning(f"Simulation of '{self.w.name}' stopped at {_minutes(engine.now)} with streams unfinished: "
+                           + ", ".join(name for name, run in engine.runs.items() if not run.done))
+        return SimulationResult(engine, stuck, time.perf_counter() - wall_start)
+
+
+def format_event(event: Event) -> str:
+    task = event.task.fullname if event.task is not None else event.stream
+    detail = event.message or (f"{_minutes(event.seconds)}" if event.seconds else "")
+    return f"{_minutes(event.time):>8}  {event.kind:14} {task:40} {detail}"
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+
+    parser = argparse.ArgumentParser(description="Runs a whole recipe session on a virtual clock, with simulated Done presses, and prints the event trace")
+    parser.add_argument("filename", help="recipe/workflow in json/jsonc format")
+    parser.add_argument("--mode", choices=("planned", "sample"), default="planned",
+                        help="planned: Done when each task's time is up; sample: random durations over each task's range")
+    parser.add_argument("--script", help="JSON {task fullname: seconds until Done is pressed}")
+    parser.add_argument("--history", help="recorded task durations (the player's --history file) to pick from")
+    parser.add_argument("--reaction", type=float, default=0, help="average seconds to notice and press Done (default 0)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--finish-together", action="store_true", help="hold streams back to their planned start so they finish together")
+    parser.add_argument("--prompt-start", action="store_true", help="with --finish-together, the held streams wait to be started")
+    parser.add_argument("--json", help="write the trace to this file as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    logging.getLogger("WorkflowEngine").setLevel(logging.WARNING)
+    w, warnings = load_workflow(args.filename)
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as file:
+            script = json.load(file)
+    history = load_history(args.history, w.name) if args.history else None
+    plan = FinishTogetherPlan(w) if args.finish_together else None
+    result = WorkflowSimulator(w, args.mode, script, history, args.reaction, args.seed, plan, args.prompt_start).run()
+    for event in result.trace:
+        print(format_event(event))
+    state = "finished" if result.finished else "stuck"
+    print(f"{w.name}: {state} at {_minutes(result.makespan)} (planned {_minutes(w.timing().makespan)}); "
+          f"{len(result.trace)} events simulated in {1000 * result.wall_seconds:.1f}ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(result.report(), file, indent=2)
+        print(f"Wrote {args.json}")
+    sys.exit(0 if result.finished else 1)
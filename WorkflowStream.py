@@ -2,6 +2,7 @@ import logging
 import jsonc, json
 import sys
 import typing
+from dataclasses import dataclass
 
 # pip install jsoncparser 
 # source venv/bin/activate
@@ -159,13 +160,204 @@ class Helper:
     
 
 
-# Live ##########################################################################################  
-# A simple way to create additional keys or slots within a class
-# In init, a class creates an instance of Live, and then it can get or assign variables to it.
+# SHARED TEXT ##########################################################################################  
 
-class Live:
+"""
+Recipe text repeats a lot - "Turn off burner", "Water OK?", the same Steps list in many streams and recipes.
+SharedText hands back one canonical object per distinct value, so every Task (in every recipe loaded in
+the process) refers to the same object rather than its own copy:
+- strings are interned with sys.intern
+- string lists (Steps, Trigger) become tuples, deduplicated by value; being immutable they are safe to share
+- the player's formatted steps text is memoized on (description, steps)
+The FieldDecoder uses SHARED_TEXT as it decodes; RecipeCache interns the parsed dictionary itself.
+Its tables only grow, so whatever loads recipe after recipe clear()s them when it is done with the ones it
+loaded - RecipeLibrary.update() once it has indexed a folder, the player before a hot reload. Anything already
+handed out stays valid; later loads just stop sharing with it.
+"""
+class SharedText:
     def __init__(self):
-        pass  # No predefined attributes; no restrictions (not using __slots__)
+        self.tuples = {}
+        self.steps_texts = {}
+
+    @staticmethod
+    def text(value: str) -> str:
+        return sys.intern(value) if type(value) is str else value
+
+    def strings(self, values: typing.Iterable[str]) -> tuple:
+        key = tuple(sys.intern(value) for value in values)
+        return self.tuples.setdefault(key, key)
+
+    def steps_text(self, description: typing.Optional[str], steps: tuple) -> str:
+        """ Description then a bullet list of the Steps, as shown in the player's task box """
+        key = (description, steps)
+        text = self.steps_texts.get(key)
+        if text is None:
+            text = description + "\n\n" if description else ""
+            text += "\n".join(f"• {step}" for step in steps) # Bullet list 
+            self.steps_texts[key] = text
+        return text
+
+    def clear(self):
+        self.tuples.clear()
+        self.steps_texts.clear()
+
+    def stats(self) -> dict:
+        return {"shared_tuples": len(self.tuples), "shared_steps_texts": len(self.steps_texts)}
+
+
+SHARED_TEXT = SharedText()
+
+
+# FIELD DECODER ##########################################################################################  
+
+"""
+Task, Stream "Settings" and Checklist fields are described once in a table of Field entries.
+A FieldDecoder checks the key names and picks the coercion for each field when it is created (once, at import),
+then decode() applies the whole table to a dictionary in one pass - rather than a separate Helper lookup per field.
+Values of the expected type are assigned as-is; anything else is coerced with a warning, as Helper does.
+A missing or null value gets the default.
+Strings come back interned and string lists as shared tuples (see SHARED TEXT above).
+"""
+class Field(typing.NamedTuple):
+    attribute: str  # attribute set on the Task/Stream/Checklist
+    key: str        # key in the json dictionary
+    kind: str       # "str", "int", "bool" or "strlist"
+    default: typing.Any = None
+
+
+class FieldDecoder:
+    EXPECTED_TYPES = {"str": str, "int": int, "bool": bool, "strlist": list}
+
+    def __init__(self, owner: str, fields: list):
+        self.owner = owner
+        compiled = []
+        for field in fields:
+            if not Helper._is_name_OK(field.key):
+                raise ValueError(f"Invalid key '{field.key}' in {owner} field table; {Helper.NAME_RULES}")
+            if field.kind not in self.EXPECTED_TYPES:
+                raise ValueError(f"Unknown kind '{field.kind}' for {owner} field '{field.key}'")
+            coerce = getattr(self, f"_to_{field.kind}")
+            compiled.append((field.attribute, field.key, self.EXPECTED_TYPES[field.kind], coerce, field.default))
+        self.fields = tuple(compiled)
+
+    def decode(self, target: typing.Any, dictionary: dict, context: str = ""):
+        if not isinstance(dictionary, dict):
+            if dictionary is not None:
+                logger.warning(f"{context or self.owner}: expected a dictionary but found {type(dictionary)}; using defaults")
+            dictionary = {}
+        get = dictionary.get
+        intern, strings = sys.intern, SHARED_TEXT.strings
+        for attribute, key, expected_type, coerce, default in self.fields:
+            value = get(key)
+            if value is None:
+                value = default  # defaults are immutable (str/int/bool/tuple) so can be shared as-is
+            elif type(value) is not expected_type:
+                value = coerce(value, default, f"{context} {key}")
+            elif expected_type is list:
+                value = self._to_strlist(value, default, f"{context} {key}")
+            if expected_type is str and value is not None:
+                value = intern(value)
+            elif expected_type is list:
+                value = strings(value)
+            setattr(target, attribute, value)
+
+    @staticmethod
+    def _to_str(value, default, location):
+        if isinstance(value, str):
+            return value
+        logger.warning(f"{location}: expected str but found {value} / {type(value)}; converting to string")
+        return str(value)
+
+    @staticmethod
+    def _to_int(value, default, location):
+        if isinstance(value, int):  # includes bool, as Helper does
+            return value
+        try:
+            converted = int(value)
+        except (TypeError, ValueError):
+            logger.warning(f"{location}: unable to convert {value} to int; using default {default}")
+            return default
+        logger.warning(f"{location}: expected int but found {value} / {type(value)}; converted to {converted}")
+        return converted
+
+    @staticmethod
+    def _to_bool(value, default, location):
+        if isinstance(value, bool):
+            return value
+        logger.warning(f"{location}: expected bool but found {value} / {type(value)}; converting to bool")
+        if isinstance(value, str):
+            return value.strip().upper() not in ("FALSE", "0", "")
+        return bool(value)
+
+    @staticmethod
+    def _to_strlist(value, default, location):
+        if isinstance(value, str):
+            logger.warning(f"{location}: expected list but found str; converting to list")
+            return [value]
+        if not isinstance(value, (list, tuple, jsonc.JSONCList)):
+            logger.warning(f"{location}: expected list but found {value} / {type(value)}; using default")
+            return default
+        item_list = []
+        for entry in value:
+            if not isinstance(entry, str):
+                logger.warning(f"{location}: expected list entry to be string; converting {entry} to string")
+                entry = str(entry)
+            item_list.append(entry)
+        return item_list
+
+
+TASK_DECODER = FieldDecoder("Task", [
+    Field("title", "Title", "str", ""),
+    Field("description", "Description", "str", ""),
+    #User feedback - changed the default value 
+    Field("steps", "Steps", "strlist", ("No action needed here!",)),
+    Field("type", "Type", "str", "Background"),
+    Field("stakes", "Stakes", "str", "Low"),
+    Field("Autoprogress", "Autoprogress", "bool", False),
+    Field("duration", "DurationSeconds", "int", 0),
+    Field("duration_min", "DurationMinSeconds", "int", 0),  # optional range of real durations, 0 = not given (see MonteCarlo.py)
+    Field("duration_max", "DurationMaxSeconds", "int", 0),
+    Field("StartMessage", "StartMessage", "str", ""),
+    Field("CheckEverySeconds", "CheckEverySeconds", "int", 0),
+    Field("CheckMessage", "CheckMessage", "str", ""),
+    Field("red", "Red", "int", 0),
+    Field("amber", "Amber", "int", 0),
+    Field("green", "Green", "int", 0),
+    Field("equipment", "Equipment", "strlist", ()),  # PreFlight equipment the task occupies while it runs
+    Field("trigger_stream_namelist", "Trigger", "strlist", ()),
+])
+
+STREAM_SETTINGS_DECODER = FieldDecoder("Stream Settings", [
+    Field("title", "Title", "str", None),  # None -> the Stream's name
+    Field("column", "DisplayColumn", "str", None),
+    Field("countdown", "CountDown", "bool", True),
+])
+
+CHECKLIST_DECODER = FieldDecoder("Checklist", [
+    Field("description", "Description", "str", None),  # None -> "This is the <name>"
+])
+
+
+# TASK STATE ##########################################################################################  
+# Runtime state of a task while a recipe is being run; created by WorkflowEngine the first time a task is
+# reached and kept in engine.states (by task fullname) so going back to the task resumes where it was.
+# (Replaces the old attribute-bag Live class; slots keep it small when many sessions are resident)
+
+@dataclass(slots=True)
+class TaskState:
+    duration: int
+    remaining_time: int
+    red: int = 0
+    amber: int = 0
+    green: int = 0
+    title_text: str = ""
+    description_text: str = ""
+    steps_text: str = ""
+    bg_colour: str = "DarkGrey"
+    extend_count: int = 0
+    reduce_count: int = 0
+    pause_count: int = 0
+    elapsed: int = 0    # seconds counted down on this task so far (WorkflowEngine)
 
 
 
@@ -173,6 +365,11 @@ class Live:
 
 
 class Task:
+    __slots__ = ("dictionary", "name", "fullname", "task_next", "task_previous",
+                 "title", "description", "steps", "type", "stakes", "Autoprogress", "duration", "duration_min", "duration_max", "StartMessage",
+                 "CheckEverySeconds", "CheckMessage", "red", "amber", "green", "equipment",
+                 "trigger_stream_namelist", "trigger_stream_list")
+
     def __init__(self, name : str, dictionary : dict, parent_name : str =""):
         if not Helper._is_name_OK(name):
             logger.error(f"Invalid name for Task: {name}")
@@ -184,57 +381,22 @@ class Task:
         self.fullname = str(parent_name) + "/" + name if parent_name != "" else name #for debugging/logging
         self.task_next = None
         self.task_previous = None
-        self.title = Helper._get_str_from_dict(
-            self.dictionary, level1="Title", default=""
-        )
+        TASK_DECODER.decode(self, self.dictionary, context=f"Task '{self.fullname}'")
         if self.title == "":    
             self.title = self.name.replace("_", " ")
 
-        self.description = Helper._get_str_from_dict(
-            self.dictionary, level1="Description", default=""
-        )
-        #User feedback - changed the default value 
-        self.steps = Helper._get_strlist_from_dict(
-            self.dictionary, level1="Steps", default=["No action needed here!"]
-        )
-        self.type = Helper._get_str_from_dict(
-            self.dictionary, level1="Type", default="Background"
-        )   
         if self.type not in ['Active', 'Background']:
             logger.warning(
                 f"Task '{self.name}' has invalid type '{self.type}'; forcing to Background"
             )
             self.type = "Background"
 
-        self.stakes = Helper._get_str_from_dict(
-            self.dictionary, level1="Stakes", default="Low"
-        )   
         if self.stakes not in ['Low', 'Medium', 'High' ]:
             logger.warning(
                 f"Task '{self.name}' has invalid stakes '{self.stakes}'; forcing to Low"
             )
             self.stakes = "Low"
 
-        self.Autoprogress = Helper._get_bool_from_dict(
-            self.dictionary, level1="Autoprogress", default=False
-        )   
-
-        self.duration = Helper._get_int_from_dict(
-            self.dictionary, level1="DurationSeconds", default=0
-        )   
-
-        self.StartMessage = Helper._get_str_from_dict(
-            self.dictionary, level1="StartMessage", default=""
-        )   
-
-        self.CheckEverySeconds = Helper._get_int_from_dict(
-            self.dictionary, level1="CheckEverySeconds", default=0
-        )   
-
-        self.CheckMessage = Helper._get_str_from_dict(
-            self.dictionary, level1="CheckMessage", default=""
-        )   
-
         if self.CheckEverySeconds <= 0 and self.CheckMessage != "":
             self.CheckEverySeconds = 60
             logger.warning(
@@ -252,22 +414,30 @@ class Task:
             logger.warning(
                 f"Task '{self.name}' has CheckEverySeconds of {self.CheckEverySeconds} AND Autoprogress set; forcing Autoprogress to '{self.Autoprogress}'"
             )
-   
-
-        self.red = Helper._get_int_from_dict(
-            self.dictionary, level1="Red", default=0
-        )   
-        self.amber = Helper._get_int_from_dict(
-            self.dictionary, level1="Amber", default=0
-        )   
-        self.green = Helper._get_int_from_dict(
-            self.dictionary, level1="Green", default=0
-        )   
-        self.trigger_stream_namelist = Helper._get_strlist_from_dict(
-            self.dictionary, level1="Trigger", default=[]
-        )
+
+        if self.duration_min > self.duration or (self.duration_max and self.duration_max < self.duration):
+            logger.warning(
+                f"Task '{self.name}' has DurationMinSeconds/DurationMaxSeconds of {self.duration_min}/{self.duration_max} not either side of DurationSeconds {self.duration}; ignoring them"
+            )
+            self.duration_min = self.duration_max = 0
         self.trigger_stream_list = []
 
+    def __getstate__(self):
+        # The task_next/task_previous chain is left out so pickling a long Stream doesn't recurse
+        # once per task; Stream.__setstate__ relinks the chain from its task_list
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot not in ("task_next", "task_previous")}
+
+    def __setstate__(self, state):
+        self.task_next = None
+        self.task_previous = None
+        # unpickled text is only shared within the one pickle; share it with the rest of the process again
+        for slot, value in state.items():
+            if type(value) is str:
+                value = sys.intern(value)
+            elif type(value) is tuple:
+                value = SHARED_TEXT.strings(value)
+            setattr(self, slot, value)
+
     def _link_triggered_stream(
         self, triggered_stream
     ):  # this is called by Workflow since only Workflow knows about other Streams
@@ -290,6 +460,8 @@ class Task:
 # CHECKLIST #############################################################################
 
 class Checklist:
+    __slots__ = ("dictionary", "name", "title", "description")
+
     def __init__(self, name, dictionary):
         if not Helper._is_name_OK(name):
             logger.error(f"Invalid name for Checklist: {name}")
@@ -299,12 +471,18 @@ class Checklist:
         self.dictionary = dictionary
         self.name = name
         self.title = name
-        self.description = Helper._get_str_from_dict(self.dictionary, "Description", default= f"This is the {name} ")
+        CHECKLIST_DECODER.decode(self, self.dictionary, context=f"Checklist '{name}'")
+        if self.description is None:
+            self.description = f"This is the {name} "
 
 # STREAM #############################################################################
 
 
 class Stream:
+    __slots__ = ("dictionary", "name", "task_list", "task_first", "task_name_map", "resolved_tasks",
+                 "trigger_stream_name_map", "resolved_triggered_streams", "stream_name_to_stream_reference_map",
+                 "keep_dictionaries", "title", "column", "countdown", "build_warnings")
+
     def __init__(self, name, dictionary):
         if not Helper._is_name_OK(name):
             logger.error(f"Invalid name for Stream: {name}")
@@ -314,27 +492,26 @@ class Stream:
         self.dictionary = dictionary
         self.name = name
         self.task_list = []
+        self.task_first = None
         self.task_name_map = {} #needed to check task names are unique within the stream and to enable x-stream linking
         self.resolved_tasks = False
         self.trigger_stream_name_map = {}
         self.resolved_triggered_streams = False
-        self.title = Helper._get_str_from_dict(
-            self.dictionary, level1="Settings", level2="Title", default=self.name
-        )
-        self.column = Helper._get_str_from_dict(
-            self.dictionary, level1="Settings", level2="DisplayColumn", default=None
-        )
-        self.countdown = Helper._get_str_from_dict(
-            self.dictionary, level1="Settings", level2="CountDown", default=True
-        )
+        self.stream_name_to_stream_reference_map = None #set by WorkflowStream.build so the Stream can resolve itself on demand (lazy build)
+        self.keep_dictionaries = True #set by WorkflowStream.build; False drops the raw json once tasks are decoded
+        STREAM_SETTINGS_DECODER.decode(self, Helper._get_item_from_dict(self.dictionary, "Settings", default={}), context=f"Stream '{name}' Settings")
+        if self.title is None:
+            self.title = self.name
         self.build_warnings=[] #if we have any issues, a higher level UI can report to user 
 
     def __iter__(self):
         """Allows enumeration by iterating over task_list."""
+        self.ensure_resolved()
         return iter(self.task_list)
 
     def __getitem__(self, index):
         """Allows indexing by forwarding to task_list[index]."""
+        self.ensure_resolved()
         return self.task_list[index]
     
     def __str__(self):
@@ -343,8 +520,23 @@ class Stream:
     def __repr__(self):
         return f'Stream("{self.dictionary}")'
 
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        task_previous = None
+        for task in self.task_list:
+            task.task_previous = task_previous
+            if task_previous is not None:
+                task_previous.task_next = task
+            task_previous = task
+
 
     def resolve_tasks(self)->list: 
+        if self.resolved_tasks:  # only want to do this once
+            return self.build_warnings
         first=True
         for task_name in self.dictionary: 
             logger.info(
@@ -374,8 +566,31 @@ class Stream:
                     task_previous.task_next = task
                     task_previous = task
                 logger.info(f"Stream {self.name} added task with label {task_name}")
+        self.resolved_tasks = True
         return self.build_warnings
 
+    # In a lazy build only the GoStream is resolved up front; any other Stream resolves its tasks and
+    # trigger links the first time something reaches it (a trigger, the visualiser, validate_all)
+    def ensure_resolved(self) -> list:
+        warnings = []
+        if not self.resolved_tasks:
+            warnings.extend(self.resolve_tasks())
+        if self.stream_name_to_stream_reference_map is not None and not self.resolved_triggered_streams:
+            trigger_warnings = self.resolve_triggered_streams(self.stream_name_to_stream_reference_map)
+            self.build_warnings.extend(trigger_warnings)
+            warnings.extend(trigger_warnings)
+        if not self.keep_dictionaries:
+            self.drop_dictionaries()
+        return warnings
+
+    # Once tasks are decoded the raw json is only needed for display/inspection; dropping it saves memory
+    def drop_dictionaries(self):
+        if not self.resolved_tasks:
+            return
+        self.dictionary = None
+        for task in self.task_list:
+            task.dictionary = None
+
         
     # check any tasks in this stream trigger any other streams and link them to the Stream reference
     #returns list of build errors rather than an exception
@@ -415,39 +630,24 @@ class Stream:
         self.resolved_triggered_streams = True
         return warnings
 
-    def iterator_visualiser(self,row, chain_set=set()):
+    def iterator_visualiser(self, row):
         #yield type_string = "Stream/Task", name, column=(Middle/Left/Right),row=0, reference
-        #yield "Stream", self.go_stream.name, self.go_stream.column, 0, self.go_stream
-        in_row = row
-        warning=f"display; Stream/self.name {self.name} row:'{row}' chain_set:{chain_set}"
-        logger.info(warning)
-        if self.name in chain_set:
-            warning=f"Workflow is not a DAG; we have cycled back to Stream '{self.name} via {chain_set}"
-            logger.error(warning)
-            return
-        chain_set.add(self.name)
+        # this Stream's tasks from row down, then for each Stream it triggers an arrow and its header, each
+        # trigger three rows below the one before (the triggered Stream's tasks start on the row after its
+        # header); WorkflowStream.iterator_visualiser() walks the triggered Streams in topological order
+        self.ensure_resolved()
+        for offset, task in enumerate(self.task_list):
+            yield "Task", task.name, self.column, row + offset, task
         for task in self.task_list:
-            yield "Task", task.name, self.column, row, task
-            row += 1
-        #yield type_string = "Stream/Task", name, column=(Middle/Left/Right),row=0, reference
-        #yield "Stream", self.go_stream.name, self.go_stream.column, 0, self.go_stream
-
-        row = in_row  #arrow starts at the triggering task's row and goes to the triggered stream's column
-        for task in self.task_list:         
             for triggered_stream in task.trigger_stream_list:
-                print(f"yielding trigger itself {task.name} to {triggered_stream.name}")
                 yield "Trigger", f"{self.name}/{task.name}->{triggered_stream.name}", triggered_stream.column, row, triggered_stream
-                row += 1
-                print(f"yielding triggered stream {triggered_stream.name}")
-                yield "Stream", triggered_stream.name, triggered_stream.column, row, triggered_stream
-                row += 1
-                for yielded_type_string, yielded_name, yielded_column, yielded_row, yielded_reference in triggered_stream.iterator_visualiser( row, chain_set):
-                    yield yielded_type_string, yielded_name, yielded_column, yielded_row, yielded_reference
-                row += 1
+                yield "Stream", triggered_stream.name, triggered_stream.column, row + 1, triggered_stream
+                row += 3
 
 
 
     def iterator(self):
+        self.ensure_resolved()
         column=1
         yield "Stream", self.name, self
         for task in self.task_list:
@@ -457,9 +657,10 @@ class Stream:
 
 
     def iter_names(self, recurse=False):
+        self.ensure_resolved()
         task = self.task_first
         while task:
-            if task.trigger_stream_namelist != []:
+            if task.trigger_stream_namelist:
                 for triggered_stream_name in task.trigger_stream_namelist:
                     yield "Stream", triggered_stream_name
                 '''for triggered_stream in task.trigger_stream_list:
@@ -468,32 +669,17 @@ class Stream:
             task=task.task_next
 
 
-    def display(self, chain="", chain_set=set() ):
-        warning=f"display; Stream/self.name {self.name} chain:'{chain}' chain_set:{chain_set}"
-        logger.info(warning)
-        if self.name in chain_set:
-            warning=f"Workflow is not a DAG; we have cycled back to Stream '{self.name} via {chain_set}"
-            logger.error(warning)
-            return
-        chain_set.add(self.name)
-        in_chain = chain
-        chain = f"{in_chain}[Stream:{self.name}]"
-        task = self.task_first
-        while task:
-            chain = f"{chain} -> {task.name}"
-            task = task.task_next
-        print(chain)
-        # walk the list again, recursing into any triggered_streams; TODO should check chain to see if already recursed into this Stream
-        chain = f"{in_chain}[Stream:{self.name}]"
-        task = self.task_first
-        while task:
-            chain = f"{chain} -> {task.name}"
-            if task.trigger_stream_list != []:
-                for triggered_stream in task.trigger_stream_list:
-                    print(f"displaying triggered stream {triggered_stream.name}")
-                    chain2 = f"{chain} -> "
-                    triggered_stream.display(chain = chain2, chain_set= chain_set)
-            task = task.task_next
+    def display(self, chain="") -> dict:
+        # prints this Stream's tasks as a chain carrying on from chain; returns the chain each Stream it
+        # triggers carries on from (WorkflowStream.display() prints those in topological order)
+        self.ensure_resolved()
+        names = [f"{chain}[Stream:{self.name}]"] + [task.name for task in self.task_list]
+        print(" -> ".join(names))
+        triggered = {}
+        for position, task in enumerate(self.task_list, start=1):
+            for triggered_stream in task.trigger_stream_list:
+                triggered.setdefault(triggered_stream.name, " -> ".join(names[:position + 1]) + " -> ")
+        return triggered
 
 
 # WORKFLOW_STREAM #############################################################################
@@ -508,6 +694,15 @@ class WorkflowStream:
             self.dictionary, "GoStream", default=None
         )
         self.invoked_name = name
+        self.build_warnings = []
+        self.lazy = False
+        self.keep_dictionaries = True
+        self._task_table = None
+        self._timing = None
+        self._timeline = None
+        self.topological_order = [] # Streams in trigger order once built; see _analyse_trigger_graph
+        self.graph_issues = {"cycles": [], "unreachable": [], "multiply_triggered": {}}
+        self.graph_warnings = []
         self.name = Helper._get_str_from_dict(
             self.dictionary, "Identity", "Name", default=self.invoked_name
         )
@@ -554,7 +749,9 @@ class WorkflowStream:
     # Build goes through and links everything up
     # This is where "compile errors" will be found and should be reported to user
     # We want to avoid init failing with the first weird issue found, since this stops the whole workflow
-    def build(self):  
+    # lazy=True only resolves the GoStream now; the rest resolve when first reached, or all at once via validate_all()
+    # keep_dictionaries=False drops the raw json of each Stream/Task once it is decoded (to save memory)
+    def build(self, lazy: bool = False, keep_dictionaries: bool = True):  
         if self.state != "Init":
             logger.warning(
                 f"build() called on Workflow '{self.name}'when workflow not in Init state; state is ;{self.state}"
@@ -563,6 +760,21 @@ class WorkflowStream:
         warnings=[]
         work_stream_warnings=set()
         self._build_columns()
+        for stream in self.stream_list:
+            stream.stream_name_to_stream_reference_map = self.stream_name_to_stream_reference_map
+            stream.keep_dictionaries = keep_dictionaries
+        self.lazy = lazy
+        self.keep_dictionaries = keep_dictionaries
+        if lazy:
+            w = self.go_stream.ensure_resolved()
+            if w != []:
+                warnings.append(w)
+                work_stream_warnings.add(self.go_stream.name)
+            self.state = "Built"
+            if work_stream_warnings:
+                warnings.insert (0, f"Errors in Streams {work_stream_warnings}")
+            self.build_warnings = warnings
+            return warnings
         for stream in self.stream_list:
             w = stream.resolve_tasks() 
             if w != []:
@@ -580,8 +792,83 @@ class WorkflowStream:
         self.state = "Built"
         if work_stream_warnings:
             warnings.insert (0, f"Errors in Streams {work_stream_warnings}")
+        self.build_warnings = warnings #kept so a cached/compiled workflow can still report them
+        self._analyse_trigger_graph()
+        if not keep_dictionaries:
+            self._drop_dictionaries()
+        return warnings
+
+    # For a workflow built with its dictionaries (one from the cache, say): drops the raw json of every resolved
+    # Stream/Task now, and of any Stream a lazy build resolves later
+    def drop_dictionaries(self):
+        if self.state != "Built":
+            logger.warning(f"drop_dictionaries() called on Workflow '{self.name}' when workflow not in Built state; state is ;{self.state}")
+            return
+        self.keep_dictionaries = False
+        for stream in self.stream_list:
+            stream.keep_dictionaries = False
+            stream.drop_dictionaries()
+        if not self.lazy:
+            self._drop_dictionaries()
+
+    def _drop_dictionaries(self):
+        for stream in self.stream_list:
+            stream.drop_dictionaries()
+        # the top level still refers to every Stream/Task dictionary; keep only the small sections
+        self.dictionary = {section: value for section, value in self.dictionary.items() if section != "Streams"}
+
+    # Resolves every Stream (only does real work after a lazy build) and returns all the build warnings
+    def validate_all(self) -> list:
+        if self.state != "Built":
+            logger.warning(
+                f"validate_all() called on Workflow '{self.name}' when workflow not in Built state; state is ;{self.state}"
+            )
+            return []
+        if not self.lazy:
+            return self.build_warnings
+        warnings=[]
+        work_stream_warnings=set()
+        for stream in self.stream_list:
+            stream.ensure_resolved()
+            if stream.build_warnings != []:
+                warnings.append(stream.build_warnings)
+                work_stream_warnings.add(stream.name)
+        if work_stream_warnings:
+            warnings.insert (0, f"Errors in Streams {work_stream_warnings}")
+        self.lazy = False
+        self.build_warnings = warnings
+        self._analyse_trigger_graph()
+        if not self.keep_dictionaries:
+            self._drop_dictionaries()
         return warnings
 
+    # Columnar (NumPy) view of every task, for vectorized timing calculations; see TaskTable.py
+    def task_table(self):
+        if self.state != "Built":
+            raise ValueError(f"task_table() needs a built Workflow; state is {self.state}")
+        if self._task_table is None:
+            from TaskTable import TaskTable  # numpy is optional; only needed if the columnar view is used
+            self._task_table = TaskTable(self)
+        return self._task_table
+
+    # Earliest/latest start of every task, makespan, critical path and Stream slack; see WorkflowTiming.py
+    def timing(self):
+        if self.state != "Built":
+            raise ValueError(f"timing() needs a built Workflow; state is {self.state}")
+        if self._timing is None:
+            if self.lazy:
+                self.validate_all()  # every Stream has to be resolved to be timed
+            from WorkflowTiming import TimingAnalysis
+            self._timing = TimingAnalysis(self)
+        return self._timing
+
+    # Planned timeline indexed for "which tasks run / alerts fire between t1 and t2"; see Timeline.py
+    def timeline(self):
+        if self._timeline is None:
+            from Timeline import Timeline
+            self._timeline = Timeline(self)  # timing() checks the workflow is built
+        return self._timeline
+
     def display(self):
         if self.state != "Built":
             logger.warning(
@@ -590,7 +877,10 @@ class WorkflowStream:
             return
         print(f"\n---------\nWorkstream '{self.name:}'")
         print("[PreFlight]")
-        self.go_stream.display()
+        chains = {self.go_stream.name: ""}
+        for stream in self._reached_streams(chains):
+            for name, chain in stream.display(chains[stream.name]).items():
+                chains.setdefault(name, chain)  # a Stream triggered twice (build() warns) is shown from its first trigger
         print("[PostFlight]")
 
     def iterator_visualiser(self):
@@ -607,17 +897,37 @@ class WorkflowStream:
         yield "Stream", self.go_stream.name, self.go_stream.column, row, self.go_stream
         #yield "Task", self.go_stream.name, self.go_stream.column, 5, self.go_stream
       
-        for type_string, name, column, row, reference in self.go_stream.iterator_visualiser(row=2):
-            logger.debug( f"viz: yielding workflow, name:{name} column:{column} row:{row}")
-            yield type_string, name, column, row, reference
-            if row>max_row:
-                max_row = row
+        rows = {self.go_stream.name: 2}
+        for stream in self._reached_streams(rows):
+            for type_string, name, column, row, reference in stream.iterator_visualiser(rows[stream.name]):
+                if type_string == "Stream":
+                    rows.setdefault(name, row + 1)  # a Stream triggered twice (build() warns) is shown from its first trigger
+                yield type_string, name, column, row, reference
+                if row>max_row:
+                    max_row = row
         if self.post_checklist:
             max_row += 1
             logger.debug( f"viz: yielding PrePostStream: {self.post_checklist.name}")
             yield "PrePostStream", "Postflight Checklist", "Left", max_row, self.post_checklist
 
 
+    def _reached_streams(self, reached: dict):
+        # the Streams in topological order (build() has checked the trigger graph, so no cycle checks here),
+        # each once, skipping any not in reached (filled in by the caller as it goes) - never triggered.
+        # Inside a cycle (build() warns) a Stream can come before the one triggering it, so the order is
+        # walked again while that reaches more; an acyclic workflow takes one walk
+        if self.lazy:
+            self.validate_all()  # every Stream has to be resolved to be ordered
+        walked = set()
+        while len(walked) < len(reached):
+            before = len(walked)
+            for stream in self.topological_order:
+                if stream.name in reached and stream.name not in walked:
+                    walked.add(stream.name)
+                    yield stream
+            if len(walked) == before:
+                return
+
     def iterator(self):
         #yield type_string=""
         for type_string, name, reference in self.go_stream.iterator():
@@ -694,9 +1004,136 @@ class WorkflowStream:
 
         return failed
 
+    """
+    Trigger graph checks, run once at the end of build() (or validate_all() after a lazy build).
+    The Streams are the nodes and each task's trigger links are the edges. One iterative (Tarjan) depth-first
+    pass, O(streams + triggers), finds the strongly connected components: they come out in reverse
+    topological order, and any component with more than one Stream (or a Stream that triggers itself) is a
+    cycle. A breadth-first walk from the GoStream finds the unreachable Streams, and counting the triggers
+    into each Stream finds the ones that would be started twice (the player refuses to run a Stream twice).
+    Results are kept on the workflow: topological_order (GoStream first), graph_issues and graph_warnings.
+    """
+    def _analyse_trigger_graph(self):
+        streams = self.stream_list
+        index_of = {id(stream): index for index, stream in enumerate(streams)}
+        successors = []
+        triggered_by = {}
+        for stream in streams:
+            stream_successors = []
+            for task in stream.task_list:
+                for triggered_stream in task.trigger_stream_list:
+                    stream_successors.append(index_of[id(triggered_stream)])
+                    triggered_by.setdefault(triggered_stream.name, []).append(task.fullname)
+            successors.append(stream_successors)
+        go_index = index_of[id(self.go_stream)]
+
+        # iterative Tarjan; each work item is (node, position in its successor list)
+        count = len(streams)
+        order, low = [-1] * count, [0] * count
+        on_stack, stack, components = [False] * count, [], []
+        visited = 0
+        # components come out in reverse topological order, so start from the GoStream last to get it first
+        for root in [index for index in reversed(range(count)) if index != go_index] + [go_index]:
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work[-1]
+                if order[node] == -1:
+                    order[node] = low[node] = visited
+                    visited += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                if position < len(successors[node]):
+                    work[-1] = (node, position + 1)
+                    successor = successors[node][position]
+                    if order[successor] == -1:
+                        work.append((successor, 0))
+                    elif on_stack[successor]:
+                        low[node] = min(low[node], order[successor])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+
+        self.topological_order = [streams[member] for component in reversed(components) for member in component]
+        cycles = []
+        for component in reversed(components):
+            if len(component) > 1 or component[0] in successors[component[0]]:
+                cycles.append([streams[member].name for member in self._cycle_path(component, successors)])
+
+        reachable = [False] * count
+        reachable[go_index] = True
+        pending = [go_index]
+        while pending:
+            for successor in successors[pending.pop()]:
+                if not reachable[successor]:
+                    reachable[successor] = True
+                    pending.append(successor)
+        unreachable = [streams[index].name for index in range(count) if not reachable[index]]
+
+        # the GoStream is already started by the user, so any trigger into it is a second start
+        multiply_triggered = {name: tasks for name, tasks in triggered_by.items()
+                              if len(tasks) > 1 or name == self.go_stream.name}
+
+        self.graph_issues = {"cycles": cycles, "unreachable": unreachable, "multiply_triggered": multiply_triggered}
+        warnings = []
+        for cycle in cycles:
+            warnings.append(f"Streams trigger each other in a cycle: {' -> '.join(cycle)}")
+        for name in unreachable:
+            warnings.append(f"Stream '{name}' is never triggered from GoStream '{self.go_stream.name}'")
+        for name, tasks in multiply_triggered.items():
+            if name == self.go_stream.name:
+                warnings.append(f"GoStream '{name}' is also triggered by {tasks}")
+            else:
+                warnings.append(f"Stream '{name}' is triggered more than once, by {tasks}")
+        for warning in warnings:
+            logger.warning(warning)
+        self.graph_warnings = warnings
+
+    @staticmethod
+    def _cycle_path(component: list, successors: list) -> list:
+        # breadth-first from the first member back to itself, staying inside the component
+        start = component[0]
+        members = set(component)
+        parent = {}
+        pending = [start]
+        while pending:
+            node = pending.pop(0)
+            for successor in successors[node]:
+                if successor == start:
+                    path = [start]
+                    while node != start:
+                        path.append(node)
+                        node = parent[node]
+                    path.append(start)
+                    path[1:-1] = reversed(path[1:-1])
+                    return path
+                if successor in members and successor not in parent:
+                    parent[successor] = node
+                    pending.append(successor)
+        return component
+
+    # Trigger graph issues (cycles, unreachable and multiply-triggered Streams) found when the workflow was built
     def check_workflow_for_issues(self)->list:
-        return []
-        # TODO check all streams are visited
+        if self.state != "Built":
+            logger.warning(
+                f"check_workflow_for_issues() called on Workflow '{self.name}' when workflow not in Built state; state is ;{self.state}"
+            )
+            return []
+        if self.lazy:
+            self.validate_all()
+        return list(self.graph_warnings)
 
 
 
@@ -0,0 +1,320 @@
+import logging
+import argparse
+import json
+import sys
+import typing
+from dataclasses import dataclass
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+console_handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_handler.setFormatter(formatter)
+logger.addHandler(console_handler)
+
+
+"""
+Critical path analysis of a built workflow, from DurationSeconds alone.
+Within a Stream the tasks run back to back (task_next); a triggered Stream starts when its triggering task
+is done. A forward pass over the Streams in topological order (WorkflowStream.topological_order) gives the
+earliest start/finish of every task and the makespan (when the last task finishes); a backward pass from
+the makespan gives the latest start/finish that doesn't delay it. Slack is latest start - earliest start;
+the critical path is the chain of zero-slack tasks that ends last.
+- Times are seconds from pressing Start on the GoStream; negative durations count as 0
+- A Stream triggered more than once starts at its earliest trigger (the player refuses a second start)
+- Streams that are never triggered (unreachable) have no times
+Get one with WorkflowStream.timing(); it is worked out once per built workflow.
+
+    python3 WorkflowTiming.py recipes/recipe-eggs-toast-and-soldiers.jsonc [--json] [--serve-in 25]
+"""
+
+
+class TimingAnalysis:
+    def __init__(self, w):
+        self.workflow_name = w.name
+        self.stream_of_task = {}        # task fullname -> Stream name
+        self.started_by = {}            # Stream name -> the Task whose Done starts it (None for the GoStream)
+        self.earliest_start = {}        # task fullname -> seconds
+        self.earliest_finish = {}
+        self.latest_start = {}
+        self.latest_finish = {}
+        self.stream_start = {}          # Stream name -> seconds
+        self.stream_finish = {}
+        self.stream_latest_start = {}
+        self.stream_slack = {}
+        self._forward_pass(w)
+        self._backward_pass(w)
+        self.critical_path = self._trace_critical_path(w)
+
+    def _forward_pass(self, w):
+        self.stream_start[w.go_stream.name] = 0
+        self.started_by[w.go_stream.name] = None
+        done = set()
+        for stream in w.topological_order:
+            done.add(stream.name)
+            time_now = self.stream_start.get(stream.name)
+            if time_now is None:  # never triggered
+                continue
+            task = stream.task_first
+            while task is not None:
+                self.stream_of_task[task.fullname] = stream.name
+                self.earliest_start[task.fullname] = time_now
+                time_now += max(task.duration, 0)
+                self.earliest_finish[task.fullname] = time_now
+                for triggered_stream in task.trigger_stream_list:
+                    if triggered_stream.name in done:  # the GoStream, or a cycle back to a Stream already timed
+                        continue
+                    if triggered_stream.name not in self.stream_start or time_now < self.stream_start[triggered_stream.name]:
+                        self.stream_start[triggered_stream.name] = time_now
+                        self.started_by[triggered_stream.name] = task
+                task = task.task_next
+            self.stream_finish[stream.name] = time_now
+        self.makespan = max(self.stream_finish.values(), default=0)
+
+    def _backward_pass(self, w):
+        self.latest_start, self.latest_finish, self.stream_latest_start = self.latest_times(w, self.makespan)
+        for name, start in self.stream_start.items():
+            # delaying a Stream's start delays all of its tasks, and the first task has the least slack
+            self.stream_slack[name] = self.stream_latest_start[name] - start
+
+    def latest_times(self, w, horizon: int) -> typing.Tuple[dict, dict, dict]:
+        """ Latest start/finish of every task, and latest start of every Stream, for everything to be done by horizon """
+        latest_start, latest_finish, stream_latest_start = {}, {}, {}
+        for stream in reversed(w.topological_order):
+            if stream.name not in self.stream_start:
+                continue
+            latest = horizon
+            for task in reversed(stream.task_list):
+                finish = latest
+                for triggered_stream in task.trigger_stream_list:
+                    if self.started_by.get(triggered_stream.name) is task:
+                        finish = min(finish, stream_latest_start.get(triggered_stream.name, horizon))
+                latest_finish[task.fullname] = finish
+                latest = finish - max(task.duration, 0)
+                latest_start[task.fullname] = latest
+            stream_latest_start[stream.name] = latest
+        return latest_start, latest_finish, stream_latest_start
+
+    def _trace_critical_path(self, w) -> list:
+        last = None
+        for stream in w.topological_order:
+            for task in stream.task_list:
+                if self.earliest_finish.get(task.fullname) == self.makespan and self.slack(task) == 0:
+                    last = task
+        path = []
+        task = last
+        while task is not None:
+            path.append(task)
+            task = task.task_previous if task.task_previous is not None else self.started_by.get(self.stream_of_task[task.fullname])
+        path.reverse()
+        return path
+
+    def slack(self, task) -> int:
+        fullname = task if isinstance(task, str) else task.fullname
+        return self.latest_start[fullname] - self.earliest_start[fullname]
+
+    def report(self) -> dict:
+        return {
+            "workflow": self.workflow_name,
+            "makespan": self.makespan,
+            "critical_path": [task.fullname for task in self.critical_path],
+            "streams": {name: {"start": start, "finish": self.stream_finish[name],
+                               "latest_start": self.stream_latest_start[name], "slack": self.stream_slack[name],
+                               "started_by": self.started_by[name].fullname if self.started_by[name] else None}
+                        for name, start in self.stream_start.items()},
+            "tasks": {fullname: {"earliest_start": start, "earliest_finish": self.earliest_finish[fullname],
+                                 "latest_start": self.latest_start[fullname], "latest_finish": self.latest_finish[fullname],
+                                 "slack": self.slack(fullname)}
+                      for fullname, start in self.earliest_start.items()},
+        }
+
+
+"""
+Finish-together planning.
+Normally a triggered Stream starts the moment its triggering task is done, so side dishes are often ready
+(and going cold) long before the main one. FinishTogetherPlan works backwards from a serve time instead:
+every Stream gets the latest start that still has it - and everything it triggers - done by then, so the
+Streams with nothing after them all finish at the serve time.
+Times are seconds from when the plan is made (the player makes it when it opens). A serve time earlier
+than the makespan can't be met; the plan then serves at the makespan and says so in warnings.
+The player's --finish-together/--serve-in/--serve-at modes hold each Stream until its planned start.
+"""
+class FinishTogetherPlan:
+    def __init__(self, w, serve_in: typing.Optional[int] = None):
+        timing = w.timing()
+        self.warnings = []
+        if serve_in is None:
+            serve_in = timing.makespan
+        elif serve_in < timing.makespan:
+            warning = f"'{w.name}' takes {_minutes(timing.makespan)} so can't be served in {_minutes(serve_in)}; planning to serve at {_minutes(timing.makespan)}"
+            logger.warning(warning)
+            self.warnings.append(warning)
+            serve_in = timing.makespan
+        self.serve_in = serve_in
+        _, _, stream_latest_start = timing.latest_times(w, serve_in)
+        self.planned_start = stream_latest_start   # Stream name -> seconds from now
+        self.planned_finish = {}
+        for stream in w.stream_list:
+            if stream.name in self.planned_start:
+                self.planned_finish[stream.name] = self.planned_start[stream.name] + sum(max(task.duration, 0) for task in stream.task_list)
+
+    def hold_seconds(self, stream_name: str, elapsed: int) -> int:
+        """ How much longer a Stream should wait before starting, elapsed seconds after the plan was made """
+        if stream_name not in self.planned_start:
+            return 0
+        return max(self.planned_start[stream_name] - elapsed, 0)
+
+
+"""
+Projected finish (ETA) of every Stream while a recipe is running, kept up to date incrementally.
+Every Stream is in one of three states:
+- running: on a task which finishes at `anchor` (session seconds), or, while paused, in `remaining` seconds
+- pending: not started yet; it finishes `offset` seconds after the current task of the running Stream
+  (its `root`) that will eventually trigger it, so its ETA follows that Stream's anchor
+- finished
+So extend/reduce/pause/resume only move one anchor - O(1) - and every pending Stream hanging off it moves
+with it without being touched. Moving to another task (done/back/start) re-derives the offsets of just
+that Stream's pending successors in the trigger DAG, never the whole workflow. ETAs are read in O(1).
+An overrunning task is projected to finish "now", so its ETA slips as the overrun grows.
+"""
+@dataclass(slots=True)
+class RunningStream:
+    current: typing.Any         # Task
+    anchor: int = 0             # session time the current task finishes, while counting down
+    remaining: int = 0          # seconds left on the current task, while paused
+    counting: bool = False
+
+
+class ProjectedFinish:
+    def __init__(self, w, now: int = 0):
+        timing = w.timing()
+        self.finish_in_stream = {}      # task fullname -> seconds from its Stream's start to its finish
+        self.stream_duration = {}
+        self.starts = {}                # task fullname -> Streams its Done starts
+        for stream in w.stream_list:
+            if stream.name not in timing.stream_start:
+                continue
+            elapsed = 0
+            for task in stream.task_list:
+                elapsed += max(task.duration, 0)
+                self.finish_in_stream[task.fullname] = elapsed
+            self.stream_duration[stream.name] = elapsed
+        for name, task in timing.started_by.items():
+            if task is not None:
+                self.starts.setdefault(task.fullname, []).append(w.stream_name_to_stream_reference_map[name])
+        self.running = {}
+        self.root = {}      # pending Stream name -> running Stream name
+        self.offset = {}    # pending Stream name -> seconds after its root's current task finishes
+        self.finished = {}  # Stream name -> session time it finished
+        go_stream = w.go_stream
+        if go_stream.task_first is not None:  # waiting for Start; projected as if started now
+            self.set_task(go_stream.name, go_stream.task_first, go_stream.task_first.duration, now, counting=False)
+
+    # structural changes: re-derive the offsets of this Stream's pending successors
+    def set_task(self, stream_name: str, task, remaining: int, now: int, counting: bool = True):
+        """ Stream is (now) on task with remaining seconds left, counting down or not """
+        state = self.running.get(stream_name)
+        if state is None:
+            state = self.running[stream_name] = RunningStream(task)
+            self.root.pop(stream_name, None)
+            self.offset.pop(stream_name, None)
+        state.current = task
+        state.counting = counting
+        state.anchor = now + remaining
+        state.remaining = remaining
+        self._update_successors(stream_name)
+
+    def stream_done(self, stream_name: str, now: int):
+        self.running.pop(stream_name, None)
+        self.finished[stream_name] = now
+
+    # O(1) changes: only the anchor moves
+    def adjust(self, stream_name: str, seconds: int):
+        """ extend (+) or reduce (-) the current task """
+        state = self.running.get(stream_name)
+        if state is not None:
+            state.anchor += seconds
+            state.remaining += seconds
+
+    def pause(self, stream_name: str, now: int):
+        state = self.running.get(stream_name)
+        if state is not None and state.counting:
+            state.remaining = state.anchor - now
+            state.counting = False
+
+    def resume(self, stream_name: str, now: int):
+        state = self.running.get(stream_name)
+        if state is not None and not state.counting:
+            state.anchor = now + state.remaining
+            state.counting = True
+
+    def _current_finish(self, state: RunningStream, now: int) -> int:
+        if state.counting:
+            return max(state.anchor, now)
+        return now + max(state.remaining, 0)
+
+    def stream_eta(self, stream_name: str, now: int) -> typing.Optional[int]:
+        """ Session time the Stream is projected to finish (None if it will never run) """
+        state = self.running.get(stream_name)
+        if state is not None:
+            return self._current_finish(state, now) + self.stream_duration[stream_name] - self.finish_in_stream[state.current.fullname]
+        root = self.root.get(stream_name)
+        if root is not None:
+            return self._current_finish(self.running[root], now) + self.offset[stream_name]
+        return self.finished.get(stream_name)
+
+    def workflow_eta(self, now: int) -> int:
+        etas = [self.stream_eta(name, now) for name in self.stream_duration]
+        return max((eta for eta in etas if eta is not None), default=now)
+
+    def _update_successors(self, root_name: str):
+        state = self.running[root_name]
+        base = self.finish_in_stream[state.current.fullname]
+        # (task to start from, seconds after the root's current task finishes that its Stream started)
+        pending = [(state.current, -base)]
+        while pending:
+            task, stream_start = pending.pop()
+            while task is not None:
+                for stream in self.starts.get(task.fullname, ()):
+                    if stream.name in self.running or stream.name in self.finished:
+                        continue
+                    start = stream_start + self.finish_in_stream[task.fullname]
+                    self.root[stream.name] = root_name
+                    self.offset[stream.name] = start + self.stream_duration[stream.name]
+                    pending.append((stream.task_first, start))
+                task = task.task_next
+
+
+def _minutes(seconds: int) -> str:
+    sign = "-" if seconds < 0 else ""
+    return f"{sign}{abs(seconds) // 60}:{abs(seconds) % 60:02}"
+
+
+if __name__ == "__main__":
+    from RecipeCache import load_workflow
+
+    parser = argparse.ArgumentParser(description="Works out how long a recipe takes: earliest/latest start of every task, the critical path and each Stream's slack")
+    parser.add_argument("filename", help="recipe/workflow in json/jsonc format")
+    parser.add_argument("--json", action="store_true", help="print the full analysis as JSON")
+    parser.add_argument("--serve-in", type=float, help="also plan each Stream's latest start so everything finishes together this many minutes from now")
+    args = parser.parse_args()
+
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    w, warnings = load_workflow(args.filename)
+    timing = w.timing()
+    if args.json:
+        print(json.dumps(timing.report(), indent=2))
+        sys.exit(0)
+    print(f"{w.name}: makespan {_minutes(timing.makespan)}")
+    print(f"{'Stream':24} {'start':>7} {'finish':>7} {'latest':>7} {'slack':>7}")
+    for name, start in timing.stream_start.items():
+        print(f"{name:24} {_minutes(start):>7} {_minutes(timing.stream_finish[name]):>7} "
+              f"{_minutes(timing.stream_latest_start[name]):>7} {_minutes(timing.stream_slack[name]):>7}")
+    print("Critical path: " + " -> ".join(task.fullname for task in timing.critical_path))
+    if args.serve_in is not None:
+        plan = FinishTogetherPlan(w, int(args.serve_in * 60))
+        print(f"To serve in {_minutes(plan.serve_in)}:")
+        for name, start in sorted(plan.planned_start.items(), key=lambda item: item[1]):
+            print(f"  start {name:24} at {_minutes(start):>7}  (finishes {_minutes(plan.planned_finish[name])})")
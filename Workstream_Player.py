@@ -1,17 +1,19 @@
 import sys, platform
 from PyQt6.QtCore import QTimer, Qt, QSettings, QSize
-from PyQt6.QtWidgets import QApplication, QMessageBox, QMainWindow, QMenuBar, QWidget, QLabel, QVBoxLayout, QPushButton, QFrame, QTextEdit, QHBoxLayout, QStatusBar
+from PyQt6.QtWidgets import QApplication, QMessageBox, QMainWindow, QMenuBar, QWidget, QLabel, QVBoxLayout, QPushButton, QFrame, QTextEdit, QHBoxLayout, QStatusBar, QSlider
 from PyQt6.QtGui import QFont, QTextFormat, QTextBlockFormat, QTextCursor, QFontMetrics, QFontDatabase, QIcon
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import QUrl, QThread, pyqtSignal, QObject
+from PyQt6.QtCore import QUrl, QThread, pyqtSignal, QObject, QFileSystemWatcher
 from config import Config
 
 import time
+import datetime
 import logging
 import jsonc, json
 import sys
 import typing
 import tempfile
+import os
 
 import argparse
 
@@ -23,7 +25,17 @@ except ImportError:
 
 from Speaker import Speaker
 
-from WorkflowStream import WorkflowStream, Checklist, Stream, Task, Live, Helper
+from WorkflowStream import WorkflowStream, Checklist, Stream, Task, TaskState, Helper, SHARED_TEXT
+from RecipeCache import load_workflow
+from RecipeReload import apply_reload
+from WorkflowTiming import FinishTogetherPlan, ProjectedFinish
+from WorkflowScheduler import ResourceSchedule, CookAssignment
+from MealMerger import load_meal
+from WorkflowEngine import WorkflowEngine, StreamRun, Event, set_live_text
+from SessionJournal import SessionJournal, read_header, resume
+from SessionReplay import SessionRecording, SessionReplay, SPEEDS, parse_time
+from WorkflowEngine import STREAM_STARTED, HELD, HOLD_OVER, STARTED, TASK_STARTED, TASK_DONE, AUTOPROGRESS, CHECK, PAUSED, RESUMED, EXTENDED, REDUCED, STREAM_DONE, RESTORED
+from Timeline import START_MESSAGE, GREEN, AMBER, RED, DUE
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
@@ -48,7 +60,8 @@ class CountdownTimer(QWidget):
     """
     _instances = {}  # Shared registry of instances; ensure cyclic behaviour cannot occur
 
-    def __new__(cls, stream : Stream, *args, **kwargs):
+    def __new__(cls, run : StreamRun, *args, **kwargs):
+        stream = run.stream
         name = str(stream.name)
         if name.lower().endswith("checklist"):
             logger.warning(f"__new__ in CountdownTimer invoked on a checklist {name}")
@@ -63,61 +76,92 @@ class CountdownTimer(QWidget):
         return instance
 
 
-    def __init__(self, stream: Stream, parent_layout: QHBoxLayout, auto_start : bool, parent_instance ): 
+    def __init__(self, run: StreamRun, parent_layout: QHBoxLayout, parent_instance ): 
         super().__init__()   #-> QWidget
 
         self.speaker = parent_instance.speaker
         self.parent_instance = parent_instance 
+        self.engine = parent_instance.engine # the stream's state lives in the engine; this is a view of it
         self._parent_layout = parent_layout #parent_layout to be able add a stream triggered by a task in this stream
-        self.stream = stream
-        self.current_task = stream.task_first
+        self.run = run
+        self.stream = run.stream
         self.init_UI()
-        self.reset_state_jumped_task()
-        self.tick = app.settings.value("local_tick")
-        if auto_start:     # Timer is started automatically if the stream is triggered by another stream/task
-            self.start_timer() 
-        else:
-            self.timer_running = False  # User has to start the timer on first task in GO stream
+        if run.running:     # Timer is started automatically if the stream is triggered by another stream/task
+            self.show_running()
         self.reset_UI()
-        self.triggered_Instances=[]
-        self.triggered_names=[]
+        self.sync_projection()
 
+    @property
+    def current_task(self) -> Task:
+        return self.run.current_task
 
+    @property
+    def live(self) -> TaskState:
+        return self.run.live
 
-    def reset_state_jumped_task(self):
-        #resume state if it has been started before
-        if "live" in self.current_task.__dict__:
-            self.live = self.current_task.live
-            #User feedback change -  we "floor" the timer at 30 seconds if the user goes back
-            if self.live.remaining_time < 30 and self.current_task.duration > 30:
-                self.live.remaining_time = 30
-        else:
-            self.current_task.live = Live()
-            self.live = self.current_task.live
-            self.live.bg_colour = self.BG_COLOUR
-            self.live.duration = self.current_task.duration  
-            self.live.remaining_time = self.live.duration  # Initialize remaining time with the total time
-            self.live.extend_count = 0  # Initialize extend count
-            self.live.reduce_count = 0  # Initialize count
-            self.live.pause_count = 0  # Initialize count
-            self.live.red = self.current_task.red
-            self.live.amber = self.current_task.amber
-            self.live.green = self.current_task.green
-            #User feedback change - changed format of title box text - stream title
-            self.live.title_text = f"Stream: {self.stream.title}"
-            #User feedback change - put the task name in the second box instead of description
-            self.live.description_text = self.current_task.title
-            if self.current_task.description is not None and self.current_task.description != "":
-                self.live.steps_text = self.current_task.description + "\n\n" 
-            else:
-                self.live.steps_text = ""
-            self.live.steps_text += "\n".join(f"• {step}" for step in self.current_task.steps) # Bullet list 
-            #User feedback change - put the description into the task box
-        if self.current_task.StartMessage != "":
-            logger.info(f"{self.current_task.title}:  Starting task; generating alert: {self.current_task.StartMessage}")
-            self.speaker.speak(self.current_task.StartMessage)
-            self.status_label.setText(f"**** {self.current_task.StartMessage} *****")
-    
+    @property
+    def timer_running(self) -> bool:
+        return self.run.running
+
+    def on_event(self, event : Event):
+        """ Redraw (and speak) for something that happened to this stream in the engine """
+        if event.kind == TASK_STARTED:
+            self.reset_UI()
+            self.sync_projection()
+        elif event.kind in (START_MESSAGE, DUE, CHECK):
+            logger.info(f"{event.task.title}: generating alert: {event.message}")
+            self.status_label.setText(f"**** {event.message} *****")
+            self.speak(event.message)
+        elif event.kind in (GREEN, AMBER, RED):
+            self.update_timer_colour()
+        elif event.kind == AUTOPROGRESS and not self.parent_instance.quiet:
+            self.speaker.fun_alert2()
+        elif event.kind == STARTED:
+            self.done_button.setText(" Done")  # Change the button text after the first press
+            self.show_running()
+            self.reset_UI()
+            self.sync_projection()
+        elif event.kind == RESUMED:
+            self.show_running()
+            if self.parent_instance.projection is not None:
+                self.parent_instance.projection.resume(self.stream.name, self.parent_instance.session_elapsed)
+        elif event.kind == PAUSED:
+            self.status_label.setText(f" **** PAUSED *****")  
+            self.update_button_states()
+            if self.parent_instance.projection is not None: # ETA now slips with every second paused
+                self.parent_instance.projection.pause(self.stream.name, self.parent_instance.session_elapsed)
+        elif event.kind in (EXTENDED, REDUCED):
+            if self.parent_instance.projection is not None:
+                self.parent_instance.projection.adjust(self.stream.name, event.seconds if event.kind == EXTENDED else -event.seconds)
+            self.update_status_label()
+            self.update_timer_display(force_update = True)  # Force update the timer display
+            self.update_eta()
+        elif event.kind == HELD:
+            self.show_hold(event.seconds)
+        elif event.kind == HOLD_OVER:
+            self.speak(event.message)
+            if self.engine.prompt:
+                self.status_label.setText(f"**** {event.message} *****")
+        elif event.kind == STREAM_DONE:
+            if self.parent_instance.projection is not None:
+                self.parent_instance.projection.stream_done(self.stream.name, self.parent_instance.session_elapsed)
+                self.eta_label.setText("")
+            self.update_button_states()
+            self.update_timer_colour(grey=True)
+            self.status_label.setText("*** Stream complete ***")
+
+    def refresh_after_reload(self):
+        """ The recipe was edited and patched in place (RecipeReload); redraw without restarting the task or speaking """
+        for task in self.stream.task_list:
+            live = self.engine.states.get(task.fullname)
+            if live is not None:
+                set_live_text(self.stream, task, live)
+        self.title_label.setText(self.live.title_text)
+        self.description_label.setText(self.live.description_text)
+        self.steps_label.setPlainText(self.live.steps_text)
+        self.update_status_label()
+        self.update_button_states()
+        self.update_background_colour()
 
     def reset_UI(self):
         self.title_label.setText(self.live.title_text)
@@ -127,10 +171,6 @@ class CountdownTimer(QWidget):
         self.update_timer_display()  # Initialize the label with the formatted time
         self.update_button_states()
         self.update_background_colour()
-        if self.current_task.StartMessage != "":
-            logger.info(f"{self.current_task.title}:  Starting task; generating alert: {self.current_task.StartMessage}")
-            self.speaker.speak(self.current_task.StartMessage)
-            self.status_label.setText(f"**** {self.current_task.StartMessage} *****")
     
     def update_bg_colour_widget(self,widget : QWidget, old_col : str, new_col : str):
         old_style = widget.styleSheet()
@@ -190,10 +230,6 @@ class CountdownTimer(QWidget):
 
         self.text_box_frame.setLayout(text_box_layout)
 
-        # Create Timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_timer)
-
         # Create a QFrame (box) for the timer
         self.timer_box = QFrame(self)
         self.timer_box.setStyleSheet(f"border: 2px solid black; border-radius: 10px; padding: 10px; background-color: {Config.TIMER_BG_COLORS['default']};")
@@ -215,6 +251,13 @@ class CountdownTimer(QWidget):
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.status_label)
 
+        # Projected finish of this stream (ETA)
+        self.eta_label = QLabel(self)
+        self.eta_label.setText("")
+        self.eta_label.setStyleSheet("color: white;")
+        self.eta_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.layout.addWidget(self.eta_label)
+
         # Buttons: Pause/Resume
         self.pause_button = QPushButton(self)
         self.pause_button.setIcon(Config.ICON_PAUSE)
@@ -298,46 +341,13 @@ class CountdownTimer(QWidget):
         # Finalize Layout
         self.setLayout(self.layout)
 
-    def overrun_alert(self):
-        logger.info(f"{self.current_task.title}:  Timer overrun; generating alert: {self.current_task.CheckMessage}")
-        self.status_label.setText(f"**** {self.current_task.CheckMessage} *****")
-        self.speaker.speak(self.current_task.CheckMessage)
-
-    #User feedback change -  ensure there is a message for all overrunning tasks
-    def overrun_alert_no_msg(self):
-        msg = f"Overrun {self.stream.title}"
-        logger.info(f"Overrun on task with no specific message:{msg}")
-        self.status_label.setText(f"**** {msg} *****")
-        self.speaker.speak(msg)
-
-
-
-
     def update_timer(self):
-        self.live.remaining_time -= self.tick # Decrease the timer by tick seconds
-        if self.current_task.Autoprogress:
-            # Check if the timer has reached zero
-            if self.live.remaining_time <= 0:
-                logger.info(f"{self.current_task.title}:  Timer expired; moving to next task")
-                self.speaker.fun_alert2()
-                self.pressed_done_next_task()
-                return
-
-        if self.live.remaining_time == 0 and self.current_task.CheckEverySeconds > 0:
-            self.overrun_alert()
-        elif self.live.remaining_time < 0 and self.current_task.CheckEverySeconds > 0 and self.live.remaining_time % self.current_task.CheckEverySeconds == 0:
-            self.overrun_alert()
-        elif self.live.remaining_time == 0:
-            self.overrun_alert_no_msg()
-
-        # Update the timer label text
+        """ Every tick while counting down (the engine has already moved the clock) """
         self.update_timer_display()
-
+        self.update_eta()
         # Change background color based on remaining time
         self.update_timer_colour()
 
-
-
     def update_timer_display(self, force_update : bool = False):
         #User feedback change -  show 5 second updates 
         # 10 -> 10; 9->10; 6 -> 10; 5 -> 5; 4 -> 5
@@ -435,7 +445,8 @@ class CountdownTimer(QWidget):
                 self.reduce_button.setDisabled(True)
                 #self.update_button_colors()
                 #User feedback change -  play happy sound on last task
-                self.parent_instance.speaker.fun_alert()
+                if not self.parent_instance.quiet:
+                    self.parent_instance.speaker.fun_alert()
                 #User feedback change -  open checklist automatically on last task
                 self.parent_instance.open_post_checklist()
         else:
@@ -452,7 +463,7 @@ class CountdownTimer(QWidget):
         """Update the button colors based on their enabled/disabled state."""
         
         # Done Button Color
-        if self.done_button.text() == " Start Recipe!":  # Check if it's in the initial state TODO make less hacky
+        if self.done_button.text() in (" Start Recipe!", " Start Stream"):  # Check if it's in the initial state TODO make less hacky
             self.done_button.setStyleSheet("background-color: lightgreen; color: black;")
         elif self.done_button.isEnabled():
             self.done_button.setStyleSheet("background-color: lightgrey; color: black;")
@@ -497,90 +508,67 @@ class CountdownTimer(QWidget):
 
     def pressed_back(self):
         logger.info("Back task triggered!")
-        if self.current_task.task_previous is not None:
-            self.current_task = self.current_task.task_previous
-            logger.info(  f"Resetting; current_task is now {self.current_task.fullname}")
-            if not self.timer_running:
-                logger.info("Back  button pressed whilst timer paused; NOT restarting timer")
-                #self.start_timer()
-
-            self.reset_state_jumped_task()
-            self.reset_UI()
-
+        self.engine.back(self.run)
 
     def pressed_done_next_task(self):
         logger.info("Next task triggered!")
-        if self.current_task.task_previous is None and not self.timer_running:  # Very beginning
-            self.start_timer()
-            logger.info("Kick off timing - first task triggered")
-            self.done_button.setText(" Done")  # Change the button text after the first press
-            self.reset_UI()
-            return
-
-        if self.current_task.trigger_stream_list:
-            for s in self.current_task.trigger_stream_list:
-                try:
-                    logger.info(f"Attempting to trigger stream {s.name} from task {self.current_task.fullname}!")
-                    new_obj = self.__class__(s, self._parent_layout, auto_start=True, parent_instance=self.parent_instance)
-                    self.triggered_Instances.append(new_obj)
-                    self._parent_layout.addWidget(new_obj)
-                    logger.info(f"Success: done trigger stream {s.name} from task {self.current_task.fullname}!")
-                except ValueError as e:
-                    logger.exception(f"Failed to trigger stream {s.name} from task {self.current_task.fullname} {e}!")
-                except Exception as e:
-                    logger.exception(f"Failed to trigger stream {s.name} from task {self.current_task.fullname} {e}!")
-
-        if self.current_task.task_next is not None:
-            self.current_task = self.current_task.task_next
-            logger.info(f"Resetting; current_task is now {self.current_task.fullname}")
-            if not self.timer_running:
-                logger.info("Done_Next button pressed whilst timer paused; restarting timer")
-                self.start_timer()
-
-            self.reset_state_jumped_task()
-            self.reset_UI()
-        else:  # Final task is done for this stream
-            self.timer.stop()
-            self.timer_running = False
-            logger.error(f"Done triggered on {self.current_task.name} - no following task so timer stopped!")
-            self.update_button_states()
-            self.update_timer_colour(grey=True)
-            self.status_label.setText("*** Stream complete ***")
+        self.engine.done(self.run)
+
+    def show_hold(self, seconds : int):
+        """ Finish-together plan - held back so this stream finishes with the others """
+        self.sync_projection() # projected to start after the hold
+        self.done_button.setText(" Start Stream")
+        self.done_button.setToolTip("Start now, or wait for the planned start")
+        self.update_hold()
+        self.update_button_colors()
 
+    def update_hold(self):
+        hold = self.run.hold_remaining
+        self.status_label.setText(f"Planned start in {hold // 60}:{hold % 60:02}")
 
-           
-        
     def pressed_resume(self):
         logger.info("Resume button pressed; starting/restarting timer")
-        self.start_timer()
+        self.engine.resume(self.run)
 
-    def start_timer(self):
-        self.timer.start(1000)  # Start the timer with an interval of 1 second (but counting down every 5 seconds)
-        self.timer_running = True
+    def show_running(self):
         self.resume_button.setIcon(Config.ICON_RESUME) 
         self.update_button_states()
         self.update_status_label()
 
     def pressed_pause(self):
-        self.timer.stop()
-        self.timer_running = False #TODO - maybe have this a function that checks state of self.timer directly?
-        self.status_label.setText(f" **** PAUSED *****")  
-        self.update_button_states()
-        self.live.pause_count += 1
+        self.engine.pause(self.run)
 
     def pressed_extend(self):
-        self.live.extend_count += 1
-        self.live.remaining_time += 30  # Add 30 seconds to the timer
-        self.update_status_label()
-        self.update_timer_display(force_update = True)  # Force update the timer display
+        self.engine.extend(self.run)
 
     def pressed_reduce(self):
-        self.live.reduce_count += 1
-        self.live.remaining_time -= 30  # Add 30 seconds to the timer
-        self.update_status_label()
-        self.update_timer_display(force_update = True)  # Force update the timer display
+        self.engine.reduce(self.run)
 
 
+    def speak(self, message : str):
+        if not self.parent_instance.quiet: # a replay seeking, or faster than 1x
+            self.speaker.speak(message)
+
+    def sync_projection(self):
+        """ This stream moved to another task (or started); re-project it and the streams it will trigger """
+        if self.parent_instance.projection is None or self.run.done: # a finished stream stays in projection.finished
+            return
+        if self.run.held: # projected to start after the hold
+            self.parent_instance.projection.set_task(self.stream.name, self.current_task, self.live.remaining_time + self.run.hold_remaining,
+                                                     self.parent_instance.session_elapsed, counting=True)
+        else:
+            self.parent_instance.projection.set_task(self.stream.name, self.current_task, self.live.remaining_time,
+                                                     self.parent_instance.session_elapsed, counting=self.timer_running)
+        self.update_eta()
+
+    def update_eta(self):
+        if self.parent_instance.projection is None:
+            return
+        now = self.parent_instance.session_elapsed
+        eta = self.parent_instance.projection.stream_eta(self.stream.name, now)
+        if eta is not None and self.stream.name not in self.parent_instance.projection.finished:
+            self.eta_label.setText(f"Stream finishes in {(eta - now) // 60}:{(eta - now) % 60:02}")
+
     def update_status_label(self):
         pause_plural="s" if self.live.pause_count != 1 else ""
         pause_msg=f"Paused {self.live.pause_count} time{pause_plural}" if self.live.pause_count>0 else ""
@@ -730,7 +718,7 @@ class ChecklistExecution (QWidget):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, w : WorkflowStream):
+    def __init__(self, w : WorkflowStream, tick : int = 1, open_session : bool = True):
         super().__init__()
 
         #init speaker
@@ -738,6 +726,19 @@ class MainWindow(QMainWindow):
         self.init_speaker()
 
         self.w = w
+        self.plan = None # FinishTogetherPlan when running in finish-together mode
+        self.assignment = None # CookAssignment when the streams are shared out between several cooks
+        self.cook_lanes = {}   # cook -> the layout their streams are shown in
+        self.history_filename = None # --history; how long each task really took is appended here
+        self.journal = None # --journal/--resume; SessionJournal of the presses and state, to resume after a crash
+        self.replay = None  # --replay; SessionReplay of a journal, driving the engine instead of the session clock
+        self.quiet = False  # nothing is spoken (a replay seeking, or faster than 1x)
+        # the running streams and the session clock (seconds since the player opened, in ticks), headless;
+        # the stream widgets are views of it, created as it starts streams
+        self.engine = WorkflowEngine(w, tick=tick)
+        self.engine.subscribe(self.on_engine_event)
+        # projected finish of every stream; the projection needs every stream resolved, so it is skipped for a lazy start
+        self.projection = None if w.lazy else ProjectedFinish(w, now=0)
         self.setWindowTitle(w.name)
         self.setGeometry(100, 100, 1200, 500)
 
@@ -767,9 +768,9 @@ class MainWindow(QMainWindow):
         # Create the "Pre-flight" timer immediately
         self.open_pre_checklist()
 
-        # Create the "Go" timer immediately
-        self.timer1 = CountdownTimer(w.go_stream, self.timer_layout, auto_start = False, parent_instance=self)
-        self.timer_layout.addWidget(self.timer1)
+        # Create the "Go" timer immediately (as self.timer1), unless the session is to be resumed from a journal
+        if open_session:
+            self.engine.open()
 
         # Add the layout to the main layout
         self.main_layout.addLayout(self.timer_layout)
@@ -788,6 +789,10 @@ class MainWindow(QMainWindow):
         self.status_right = QLabel("Ready")
         self.status.addPermanentWidget(self.status_left) # always shown; cannot get pushed off
         self.status.addWidget(self.status_right)   # can be pushed off by other widgets in some situations
+        self.session_timer = QTimer(self)
+        self.session_timer.timeout.connect(self.update_session_clock)
+        self.session_timer.start(1000)
+        self.update_session_clock(advance = False)
 
         #Now UI is setup
         self.setLayout(self.main_layout)
@@ -798,6 +803,251 @@ class MainWindow(QMainWindow):
         # Start a timer to add a menu item dynamically after 30 seconds 
         #QTimer.singleShot(3000, self.add_dynamic_menu_items)
 
+    def start_plan(self, plan : FinishTogetherPlan, prompt : bool = False, hold_go : bool = True):
+        """ Finish-together mode - each stream waits for its planned start, then starts itself (or prompts if prompt) """
+        self.plan = plan
+        self.engine.plan = plan
+        self.engine.prompt = prompt
+        self.update_session_clock(advance = False)
+        hold = plan.hold_seconds(self.w.go_stream.name, self.session_elapsed)
+        if hold > 0 and hold_go:
+            self.engine.hold(self.engine.go, hold)
+
+    def start_header_plan(self, header : dict):
+        """ The finish-together plan a journal was recorded with, if any (needed while its presses are replayed) """
+        if header.get("serve_in") is not None:
+            self.start_plan(FinishTogetherPlan(self.w, header["serve_in"]), prompt=header.get("prompt", False), hold_go=False)
+
+    def resume_session(self, filename : str):
+        """ Rebuild the streams (and their widgets) as the journal last recorded them, and carry on journaling """
+        header = read_header(filename)
+        self.start_header_plan(header)
+        # the records after the last snapshot are played through the engine again; they already happened, so
+        # nothing is spoken and no task is added to --history a second time
+        quiet, history_filename = self.quiet, self.history_filename
+        self.quiet, self.history_filename = True, None
+        try:
+            resume(self.engine, filename)
+        finally:
+            self.quiet, self.history_filename = quiet, history_filename
+        if self.engine.go is None: # nothing had happened yet
+            self.engine.open()
+        self.journal = SessionJournal(filename)
+        self.journal.carry_on(self.engine, header)
+        self.update_session_clock(advance = False)
+        self.status_right.setText(f"Resumed at {self.session_elapsed // 60}:{self.session_elapsed % 60:02}")
+
+    def start_replay(self, filename : str, speed : int = 1, seek : int = 0):
+        """ Play back a journal: the engine is driven by the recorded presses, on a replay clock that can run faster and seek """
+        recording = SessionRecording(filename)
+        self.start_header_plan(recording.header)
+        self.replay = SessionReplay(self.engine, recording)
+        self.session_timer.stop()   # the replay clock moves the engine instead
+        self.replay_speed = speed
+        self.replay_playing = True
+        self.replay_carry = 0       # tenths of a replay second not yet played (the clock ticks ten times a second)
+
+        bar = QHBoxLayout()
+        self.replay_play_button = QPushButton("Pause", self)
+        self.replay_play_button.clicked.connect(self.toggle_replay)
+        bar.addWidget(self.replay_play_button)
+        self.replay_speed_buttons = {}
+        for choice in SPEEDS:
+            button = QPushButton(f"{choice}x", self)
+            button.setCheckable(True)
+            button.clicked.connect(lambda checked, choice=choice: self.set_replay_speed(choice))
+            bar.addWidget(button)
+            self.replay_speed_buttons[choice] = button
+        self.replay_slider = QSlider(Qt.Orientation.Horizontal, self)
+        self.replay_slider.setRange(recording.start, recording.end)
+        self.replay_slider.setTracking(False)  # seek when the slider is let go, not on every pixel of a drag
+        self.replay_slider.valueChanged.connect(self.seek_replay)
+        bar.addWidget(self.replay_slider, stretch=1)
+        self.replay_label = QLabel(self)
+        bar.addWidget(self.replay_label)
+        self.main_layout.insertLayout(1, bar)   # under the menu bar
+
+        self.seek_replay(seek)
+        self.set_replay_speed(speed)
+        self.replay_timer = QTimer(self)
+        self.replay_timer.timeout.connect(self.update_replay_clock)
+        self.replay_timer.start(100)
+
+    def set_replay_speed(self, speed : int):
+        self.replay_speed = speed
+        self.quiet = speed > 1
+        for choice, button in self.replay_speed_buttons.items():
+            button.setChecked(choice == speed)
+
+    def toggle_replay(self):
+        if self.replay.at_end and not self.replay_playing: # play again from the start
+            self.seek_replay(self.replay.recording.start)
+        self.replay_playing = not self.replay_playing
+        self.replay_play_button.setText("Pause" if self.replay_playing else "Play")
+
+    def seek_replay(self, t : int):
+        self.quiet = True
+        self.replay.seek(t)
+        self.quiet = self.replay_speed > 1
+        self.replay_carry = 0
+        self.show_replay_position()
+
+    def update_replay_clock(self):
+        if not self.replay_playing:
+            return
+        if self.replay.at_end:
+            self.toggle_replay()
+            return
+        # a speed of 1x is the pace the session was recorded at (its tick)
+        self.replay_carry += self.replay_speed * self.engine.tick
+        step, self.replay_carry = divmod(self.replay_carry, 10)
+        if step == 0:
+            return
+        self.replay.play_to(min(self.session_elapsed + step, self.replay.recording.end))
+        self.show_replay_position()
+
+    def show_replay_position(self):
+        self.update_session_clock(advance = False)
+        self.replay_slider.blockSignals(True)  # moved by the replay, not a seek
+        self.replay_slider.setValue(self.session_elapsed)
+        self.replay_slider.blockSignals(False)
+        end = self.replay.recording.end
+        self.replay_label.setText(f"{self.session_elapsed // 60}:{self.session_elapsed % 60:02} / {end // 60}:{end % 60:02}")
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def start_journal(self, filename : str, recipes : list):
+        self.journal = SessionJournal(filename)
+        self.journal.start(self.engine, recipes, serve_in=self.plan.serve_in if self.plan is not None else None, prompt=self.engine.prompt)
+
+    def assign_cooks(self, assignment : CookAssignment):
+        """ Several cooks - one lane per cook, and each stream is shown in its cook's lane """
+        self.assignment = assignment
+        loads = assignment.loads()
+        for cook in assignment.cooks:
+            lane = QVBoxLayout()
+            header = QLabel(f"{cook}  ({loads[cook] // 60}:{loads[cook] % 60:02} hands-on)")
+            header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            lane.addWidget(header)
+            self.timer_layout.addLayout(lane)
+            self.cook_lanes[cook] = lane
+        for timer in CountdownTimer._instances.values(): # the GoStream (and any resumed streams)
+            self.timer_layout.removeWidget(timer)
+            self.add_stream_widget(timer)
+
+    def add_stream_widget(self, timer : CountdownTimer):
+        lane = None
+        if self.assignment is not None:
+            lane = self.cook_lanes.get(self.assignment.cook_of.get(timer.stream.name))
+        if lane is None: # one cook, or a stream added by a reload
+            lane = self.timer_layout
+        lane.addWidget(timer)
+
+    def record_task(self, task : Task, live : TaskState):
+        """ --history - append how long a task really took (JSON lines), for MonteCarlo.py """
+        if self.history_filename is None:
+            return
+        record = {"recipe": self.w.name, "task": task.fullname, "planned": task.duration, "seconds": live.elapsed,
+                  "extend": live.extend_count, "reduce": live.reduce_count, "at": datetime.datetime.now().isoformat(timespec="seconds")}
+        try:
+            with open(self.history_filename, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning(f"Unable to record task history in {self.history_filename}: {e}")
+
+    @property
+    def session_elapsed(self) -> int:
+        return self.engine.now
+
+    def on_engine_event(self, event : Event):
+        if event.kind == RESTORED: # a replay seek; the streams are announced again, as they were then
+            for timer in CountdownTimer._instances.values():
+                timer.setParent(None)
+                timer.deleteLater()
+            CountdownTimer._instances.clear()
+            if self.projection is not None:
+                self.projection = ProjectedFinish(self.w, now=self.session_elapsed)
+            return
+        if event.kind == STREAM_STARTED:
+            timer = CountdownTimer(self.engine.runs[event.stream], self.timer_layout, parent_instance=self)
+            if event.stream == self.w.go_stream.name:
+                self.timer1 = timer
+            if self.replay is not None: # watching, not cooking; a press would take the engine off the recording
+                timer.setEnabled(False)
+            self.add_stream_widget(timer)
+            return
+        if event.kind == TASK_DONE:
+            self.record_task(event.task, self.engine.states[event.task.fullname])
+        timer = CountdownTimer._instances.get(event.stream)
+        if timer is not None:
+            timer.on_event(event)
+
+    def update_session_clock(self, advance : bool = True):
+        if advance:
+            self.engine.advance()
+            if self.journal is not None:
+                self.journal.tick()
+        if self.plan is not None:
+            to_serve = self.plan.serve_in - self.session_elapsed
+            if to_serve >= 0:
+                self.status_left.setText(f"Serve in {to_serve // 60}:{to_serve % 60:02}")
+            else:
+                self.status_left.setText(f"Serve overdue by {-to_serve // 60}:{-to_serve % 60:02}")
+        elif self.projection is not None:
+            to_finish = self.projection.workflow_eta(self.session_elapsed) - self.session_elapsed
+            self.status_left.setText(f"All done in {to_finish // 60}:{to_finish % 60:02}")
+        for timer in list(CountdownTimer._instances.values()):
+            if timer.run.held:
+                timer.update_hold()
+            elif timer.timer_running:
+                timer.update_timer()
+            else: # a paused stream's ETA slips
+                timer.update_eta()
+
+    def watch_recipe(self, filename : str, use_cache : bool = True):
+        """ Hot reload - when the recipe file is saved, patch the edits into the running streams """
+        self.watched_filename = filename
+        self.watch_use_cache = use_cache
+        self.watcher = QFileSystemWatcher([filename], self)
+        self.watcher.fileChanged.connect(self.recipe_file_changed)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True) # editors often write a file in several goes; reload once it settles
+        self.reload_timer.setInterval(300)
+        self.reload_timer.timeout.connect(self.reload_recipe)
+        logger.info(f"Watching {filename} for changes")
+
+    def recipe_file_changed(self, path : str):
+        self.reload_timer.start()
+
+    def reload_recipe(self):
+        # editors that save by writing a new file and renaming it over the old one drop it from the watcher
+        if self.watched_filename not in self.watcher.files():
+            self.watcher.addPath(self.watched_filename)
+        SHARED_TEXT.clear() # the running recipe's text is replaced by the reloaded one's; don't keep both shared
+        try:
+            new_w, warnings = load_workflow(self.watched_filename, use_cache=self.watch_use_cache)
+        except (OSError, ValueError) as e: # JSONDecodeError is a ValueError; keep running what we have
+            logger.error(f"Unable to reload {self.watched_filename}; keeping the running recipe: {e}")
+            self.status_right.setText(f"Reload failed: {e}")
+            return
+        running = [timer for timer in CountdownTimer._instances.values() if isinstance(timer, CountdownTimer)]
+        changes = apply_reload(self.w, new_w, current_tasks=[run.current_task for run in self.engine.runs.values()],
+                               states=self.engine.states)
+        if self.projection is not None: # durations and triggers may have changed; finished streams stay finished
+            finished = self.projection.finished
+            self.projection = ProjectedFinish(self.w, now=self.session_elapsed)
+            self.projection.finished.update(finished)
+        for timer in running:
+            timer.refresh_after_reload()
+            timer.sync_projection()
+        for checklist in list(ChecklistExecution._checklist_instances.values()):
+            checklist.refresh()
+        self.status_right.setText(f"Reloaded {os.path.basename(self.watched_filename)}: {len(changes)} change(s)")
+        if warnings:
+            logger.warning(f"Reloaded recipe has warnings: {warnings}")
+
     def toggle_fullscreen(self):
         if self.isFullScreen():
             self.showNormal()  # Exit fullscreen mode
@@ -923,10 +1173,44 @@ if __name__ == '__main__':
             epilog="Note: Qt-specific arguments like '--style' and '-platform' can be used (advanced usage only).")
 
     # Define arguments
-    parser.add_argument("filename", help="recipe/workflow in json/jsonc format (required)")
+    parser.add_argument("filename", nargs="*", help="recipe/workflow in json/jsonc format (required unless resuming); give several to cook them together as one meal")
     parser.add_argument("-t", "--tick", type=int, help="Number of seconds to 'tick off' the remaining time every real second (optional)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse and rebuild the recipe instead of using the compiled recipe cache (optional)")
+    parser.add_argument("--lazy", action="store_true", help="Only resolve the GoStream up front; other streams are resolved when first reached (optional, for very large recipes)")
+    parser.add_argument("--watch", action="store_true", help="Reload the recipe into the running streams whenever the file is saved (optional, for recipe authors)")
+    parser.add_argument("--finish-together", action="store_true", help="Hold each stream back so all streams finish at the same moment, as soon as possible (optional)")
+    parser.add_argument("--serve-in", type=float, help="As --finish-together, serving this many minutes after the player opens (optional)")
+    parser.add_argument("--serve-at", help="As --finish-together, serving at this time of day, HH:MM (optional)")
+    parser.add_argument("--cooks", type=int, default=1, help="Share the streams out between this many cooks, each with their own lane (optional)")
+    parser.add_argument("--history", help="Append how long each task really took to this file, for MonteCarlo.py (optional)")
+    parser.add_argument("--journal", help="Keep a crash-safe journal of the session in this file, to --resume from (optional)")
+    parser.add_argument("--resume", help="Carry on the session in this journal where it stopped, and keep journaling to it (optional)")
+    parser.add_argument("--replay", help="Play back the session recorded in this journal; seek with the slider (optional)")
+    parser.add_argument("--speed", type=int, choices=SPEEDS, default=1, help="With --replay, the playback speed (optional)")
+    parser.add_argument("--seek", default="0", help="With --replay, start playing from this session time, [h:]mm:ss (optional)")
+    parser.add_argument("--prompt-start", action="store_true", help="With a finish-together mode, prompt at each planned start instead of starting the stream automatically (optional)")
 
     args = parser.parse_args()
+    recorded = args.resume or args.replay   # the session's recipes and tick come from its journal
+    if args.resume and args.replay:
+        parser.error("--resume and --replay can't be used together")
+    serve_at_time = None
+    if args.serve_at:
+        try:
+            serve_at_time = datetime.time.fromisoformat(args.serve_at)
+        except ValueError:
+            parser.error("--serve-at must be HH:MM")
+    if recorded:
+        try:
+            header = read_header(recorded)
+        except (OSError, ValueError) as e:
+            critical_error(f"Unable to open the journal {recorded}:\n{e}")
+        if not args.filename:
+            args.filename = header["recipes"]
+        if not args.tick:
+            args.tick = header.get("tick")
+    if not args.filename:
+        parser.error("a recipe file is required (or --resume/--replay JOURNAL)")
     if args.tick:
         app.settings.setValue("local_tick",args.tick)
     else:
@@ -941,21 +1225,69 @@ if __name__ == '__main__':
         else:
             app.settings.setValue("fixed_font", QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)   )
 
-    logger.info(f"Processing workflow {args.filename}")
+    filename = " + ".join(args.filename)
+    logger.info(f"Processing workflow {filename}")
     try:
-        with open(args.filename, "r") as file:
-            recipe_dict = jsonc.load(file)
-        w = WorkflowStream(args.filename, recipe_dict)
+        if len(args.filename) > 1: # one session, one schedule and one Speaker for the whole meal
+            w, warnings = load_meal(args.filename, lazy=args.lazy)
+        else:
+            w, warnings = load_workflow(args.filename[0], use_cache=not args.no_cache, lazy=args.lazy)
         logger.info(f"Loaded {w.name}; go_stream_name: {w.go_stream_name}")
     except OSError as e:
-        logger.error( f"Uable to open Workflow file {args.filename}:\n{e}" )
-        show_critical_message( f"Uable to open Workflow file {args.filename}:\n{e}" ) 
+        logger.error( f"Uable to open Workflow file {filename}:\n{e}" )
+        show_critical_message( f"Uable to open Workflow file {filename}:\n{e}" ) 
     except json.decoder.JSONDecodeError as e:
-        critical_error(f"Uable to interpret Workflow file {args.filename}\nIt should be JSON/JSONC:\n{e}")
-    warnings=w.build()
+        critical_error(f"Uable to interpret Workflow file {filename}\nIt should be JSON/JSONC:\n{e}")
+    if not args.lazy: # the trigger graph checks need every Stream resolved; a lazy start skips them
+        warnings = warnings + w.check_workflow_for_issues()
+        if args.cooks > 1:
+            assignment = CookAssignment(w, args.cooks)
+            warnings = warnings + assignment.warnings()
+        else:
+            warnings = warnings + ResourceSchedule(w).warnings()  # where one cook, or the equipment, can't keep up
+    elif args.cooks > 1:
+        logger.warning("--cooks needs every stream resolved; ignored with --lazy")
     handle_workflow_build_warnings(warnings)
 
-    window = MainWindow(w)
+    window = MainWindow(w, tick=int(app.settings.value("local_tick")), open_session=not recorded)
+    if args.replay: # a replay records nothing
+        try:
+            window.start_replay(args.replay, speed=args.speed, seek=parse_time(args.seek))
+        except (OSError, ValueError, KeyError) as e:
+            critical_error(f"Unable to replay {args.replay}:\n{e}")
+    else:
+        window.history_filename = args.history
+    if args.resume:
+        try:
+            window.resume_session(args.resume)
+        except (OSError, ValueError, KeyError) as e:
+            critical_error(f"Unable to resume from {args.resume}:\n{e}")
+    if args.cooks > 1 and not args.lazy:
+        window.assign_cooks(assignment)
+    if not recorded and (args.finish_together or args.serve_in is not None or args.serve_at): # a resumed journal has its own plan
+        serve_in = None
+        if args.serve_in is not None:
+            serve_in = int(args.serve_in * 60)
+        elif args.serve_at:
+            now = datetime.datetime.now()
+            serve_at = datetime.datetime.combine(now.date(), serve_at_time)
+            if serve_at < now:
+                serve_at += datetime.timedelta(days=1)
+            serve_in = int((serve_at - now).total_seconds())
+        plan = FinishTogetherPlan(w, serve_in)
+        handle_workflow_build_warnings(plan.warnings)
+        window.start_plan(plan, prompt=args.prompt_start)
+    if args.journal and not recorded:
+        window.start_journal(args.journal, args.filename)
+    elif args.journal:
+        logger.warning("--resume carries on journaling to the journal it resumed from, and --replay records nothing; --journal ignored")
+    app.aboutToQuit.connect(window.close_journal)
+    if args.watch and args.replay:
+        logger.warning("--watch edits the running recipe, which would take a replay off its recording; not watching")
+    elif args.watch and len(args.filename) > 1:
+        logger.warning("--watch follows a single recipe file; not watching the meal")
+    elif args.watch:
+        window.watch_recipe(args.filename[0], use_cache=not args.no_cache)
     #User feedback change -  Start the application in fullscreen mode
     window.showFullScreen()  
     sys.exit(app.exec())
@@ -0,0 +1,68 @@
+"""
+tracemalloc benchmark: bytes retained per Task by a built WorkflowStream - with the model classes as they
+were before __slots__ (the same classes with their attributes in an instance __dict__, reproduced by
+dict_backed_model below for comparison), with __slots__, and with __slots__ and the raw recipe
+dictionaries dropped (build(keep_dictionaries=False)).
+
+    python3 benchmarks/bench_memory.py [number_of_tasks]
+"""
+import contextlib
+import gc
+import os
+import sys
+import logging
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import WorkflowStream as model
+from WorkflowStream import WorkflowStream
+from bench_task_decoder import make_recipe
+
+logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+
+SLOTTED_CLASSES = ("Task", "Stream", "Checklist")
+
+
+def unslotted(cls):
+    """ cls without __slots__: the same methods, its attributes held in an instance __dict__ """
+    namespace = {key: value for key, value in vars(cls).items()
+                 if key not in cls.__slots__ and key not in ("__slots__", "__getstate__", "__setstate__")}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+@contextlib.contextmanager
+def dict_backed_model():
+    """ WorkflowStream builds its Tasks, Streams and Checklists from the unslotted classes while in this block """
+    slotted = {name: getattr(model, name) for name in SLOTTED_CLASSES}
+    try:
+        for name, cls in slotted.items():
+            setattr(model, name, unslotted(cls))
+        yield
+    finally:
+        for name, cls in slotted.items():
+            setattr(model, name, cls)
+
+
+def retained_bytes(number_of_tasks, **build_options):
+    gc.collect()
+    tracemalloc.start()
+    w = WorkflowStream("benchmark", make_recipe(number_of_tasks))
+    w.build(**build_options)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del w
+    return current, peak
+
+
+if __name__ == "__main__":
+    number_of_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    options = [("before __slots__", dict_backed_model, {}),
+               ("keeping dictionaries", contextlib.nullcontext, {}),
+               ("dropping dictionaries", contextlib.nullcontext, {"keep_dictionaries": False})]
+    print(f"{number_of_tasks} tasks")
+    for label, context, build_options in options:
+        with context():
+            current, peak = retained_bytes(number_of_tasks, **build_options)
+        print(f"  {label:22}: {current / number_of_tasks:8.0f} bytes/task retained  ({current / 1e6:.1f}MB, peak {peak / 1e6:.1f}MB)")
@@ -0,0 +1,127 @@
+"""
+Benchmark: the stages of loading a recipe into the model, on synthetic recipes (RecipeGenerator.py) from
+10 to 100k tasks - parsing the JSONC text (jsonc.loads, as RecipeCache does on a cache miss), WorkflowStream
+construction, build(), and walking the built model with iterator(), iterator_visualiser() and display().
+Each stage is timed on a fresh recipe, best of --repeat runs (one run for sizes that take over 10s - at 100k
+tasks that is minutes, nearly all of it jsonc). The results (seconds, and microseconds per task) are written
+as JSON so two runs - before and after a change to Helper or Stream, say - can be compared.
+
+    python3 benchmarks/bench_model_build.py [--sizes 10 100 1000 10000 100000] [--fanout 3] [--output bench_model_build.json]
+"""
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import contextlib
+import datetime
+import io
+import platform
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import jsonc
+from RecipeCache import _plain
+from RecipeGenerator import RecipeGenerator, OPTIONAL_FIELDS
+from WorkflowStream import WorkflowStream
+
+logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+
+LONG_RUN_SECONDS = 10   # a size that takes longer than this is only run once
+
+STAGES = ("parse", "construct", "build", "iterator", "iterator_visualiser", "display")
+
+
+def time_stages(text):
+    """ Seconds for each stage, on one fresh copy of the recipe """
+    seconds = {}
+    start = time.perf_counter()
+    dictionary = _plain(jsonc.loads(text))
+    seconds["parse"] = time.perf_counter() - start
+    with contextlib.redirect_stdout(io.StringIO()):   # build() and display() print as they go
+        start = time.perf_counter()
+        w = WorkflowStream("benchmark", dictionary)
+        seconds["construct"] = time.perf_counter() - start
+        start = time.perf_counter()
+        w.build()
+        seconds["build"] = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in w.iterator():
+            pass
+        seconds["iterator"] = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in w.iterator_visualiser():
+            pass
+        seconds["iterator_visualiser"] = time.perf_counter() - start
+        start = time.perf_counter()
+        w.display()
+        seconds["display"] = time.perf_counter() - start
+    return seconds
+
+
+def benchmark(number_of_tasks, tasks_per_stream, fanout, fields, repeat):
+    streams = max(1, number_of_tasks // tasks_per_stream)
+    generator = RecipeGenerator(streams, min(tasks_per_stream, number_of_tasks), fanout, fields=fields)
+    text = generator.jsonc()
+    best = {}
+    runs = 0
+    while runs < repeat:
+        timings = time_stages(text)
+        runs += 1
+        for stage, seconds in timings.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+        if sum(timings.values()) > LONG_RUN_SECONDS:
+            break
+    return {
+        "tasks": generator.number_of_tasks,
+        "streams": generator.streams,
+        "depth": max(generator.levels),
+        "bytes": len(text.encode("utf-8")),
+        "runs": runs,
+        "seconds": best,
+        "us_per_task": {stage: 1e6 * seconds / generator.number_of_tasks for stage, seconds in best.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times parsing, building and walking synthetic recipes of increasing size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000], help="numbers of tasks")
+    parser.add_argument("--tasks-per-stream", type=int, default=10)
+    parser.add_argument("--fanout", type=int, default=3, help="Streams triggered by each Stream")
+    parser.add_argument("--bare", action="store_true", help="only the required task fields (default: every optional field)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--output", default="bench_model_build.json", help="where to write the results (JSON)")
+    args = parser.parse_args()
+
+    fields = () if args.bare else OPTIONAL_FIELDS
+    results = []
+    print(f"{'tasks':>8} {'streams':>8}  " + " ".join(f"{stage:>20}" for stage in STAGES) + "   (ms)")
+    for number_of_tasks in args.sizes:
+        result = benchmark(number_of_tasks, args.tasks_per_stream, args.fanout, fields, args.repeat)
+        results.append(result)
+        print(f"{result['tasks']:8} {result['streams']:8}  " + " ".join(f"{1000 * result['seconds'][stage]:20.2f}" for stage in STAGES))
+    report = {
+        "benchmark": "model_build",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "tasks_per_stream": args.tasks_per_stream,
+        "fanout": args.fanout,
+        "fields": list(fields),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {args.output}")
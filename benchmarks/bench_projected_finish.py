@@ -0,0 +1,64 @@
+"""
+Microbenchmark: cost of keeping projected finish times (ETAs) up to date with many Streams running at once.
+The recipe has a GoStream whose tasks each trigger a Stream, and each of those triggers a follow-on Stream
+part way through, so there are hundreds of running Streams each with pending successors.
+
+    python3 benchmarks/bench_projected_finish.py [number_of_concurrent_streams]
+"""
+import os
+import sys
+import time
+import logging
+import contextlib
+import io
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from WorkflowStream import WorkflowStream
+from WorkflowTiming import ProjectedFinish
+
+logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+
+
+def make_recipe(number_of_streams, tasks_per_stream=10):
+    streams = {"Go": {f"Start_{index}": {"DurationSeconds": 5, "Trigger": [f"Side_{index}"]} for index in range(number_of_streams)}}
+    for index in range(number_of_streams):
+        streams[f"Side_{index}"] = {f"Task_{task}": {"DurationSeconds": 60 + task,
+                                                     "Trigger": [f"After_{index}"] if task == tasks_per_stream // 2 else []}
+                                    for task in range(tasks_per_stream)}
+        streams[f"After_{index}"] = {f"Task_{task}": {"DurationSeconds": 30} for task in range(tasks_per_stream)}
+    return {"Identity": {"Name": "ETA benchmark"}, "GoStream": "Go", "PreFlight": {}, "PostFlight": {}, "Streams": streams}
+
+
+def per_call(function, calls):
+    start = time.perf_counter()
+    for call in range(calls):
+        function(call)
+    return (time.perf_counter() - start) / calls
+
+
+if __name__ == "__main__":
+    number_of_streams = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with contextlib.redirect_stdout(io.StringIO()):
+        w = WorkflowStream("benchmark", make_recipe(number_of_streams))
+        w.build()
+    projection = ProjectedFinish(w)
+    now = 0
+    for index in range(number_of_streams):  # every side Stream running, each with a pending follow-on
+        stream = w.stream_name_to_stream_reference_map[f"Side_{index}"]
+        projection.set_task(stream.name, stream.task_first, stream.task_first.duration, now)
+    names = [f"Side_{index}" for index in range(number_of_streams)]
+    print(f"{len(projection.running)} running streams, {len(projection.root)} pending")
+
+    calls = 20000
+    extend = per_call(lambda call: projection.adjust(names[call % number_of_streams], 30), calls)
+    pause = per_call(lambda call: (projection.pause(names[call % number_of_streams], now), projection.resume(names[call % number_of_streams], now)), calls)
+    second_tasks = [w.stream_name_to_stream_reference_map[name].task_first.task_next for name in names]
+    done = per_call(lambda call: projection.set_task(names[call % number_of_streams], second_tasks[call % number_of_streams], 60, now), calls)
+    eta = per_call(lambda call: projection.stream_eta(f"After_{call % number_of_streams}", now), calls)
+    everything = per_call(lambda call: projection.workflow_eta(now), 200)
+    print(f"  extend/reduce          : {1e6 * extend:8.2f}us")
+    print(f"  pause + resume         : {1e6 * pause:8.2f}us")
+    print(f"  next task (successors) : {1e6 * done:8.2f}us")
+    print(f"  one stream ETA         : {1e6 * eta:8.2f}us")
+    print(f"  whole workflow ETA     : {1e6 * everything:8.2f}us  ({len(projection.stream_duration)} streams)")
@@ -0,0 +1,97 @@
+"""
+Microbenchmark: decoding Task dictionaries with the compiled TASK_DECODER versus the previous
+one-Helper-lookup-per-field approach (reproduced in helper_decode below for comparison).
+
+    python3 benchmarks/bench_task_decoder.py [number_of_tasks]
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from WorkflowStream import Helper, Task, WorkflowStream, TASK_DECODER
+
+# both approaches log coercion warnings; keep the console out of the timings
+logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+
+
+class Target:
+    pass
+
+
+def helper_decode(target, dictionary):
+    target.title = Helper._get_str_from_dict(dictionary, level1="Title", default="")
+    target.description = Helper._get_str_from_dict(dictionary, level1="Description", default="")
+    target.steps = Helper._get_strlist_from_dict(dictionary, level1="Steps", default=["No action needed here!"])
+    target.type = Helper._get_str_from_dict(dictionary, level1="Type", default="Background")
+    target.stakes = Helper._get_str_from_dict(dictionary, level1="Stakes", default="Low")
+    target.Autoprogress = Helper._get_bool_from_dict(dictionary, level1="Autoprogress", default=False)
+    target.duration = Helper._get_int_from_dict(dictionary, level1="DurationSeconds", default=0)
+    target.StartMessage = Helper._get_str_from_dict(dictionary, level1="StartMessage", default="")
+    target.CheckEverySeconds = Helper._get_int_from_dict(dictionary, level1="CheckEverySeconds", default=0)
+    target.CheckMessage = Helper._get_str_from_dict(dictionary, level1="CheckMessage", default="")
+    target.red = Helper._get_int_from_dict(dictionary, level1="Red", default=0)
+    target.amber = Helper._get_int_from_dict(dictionary, level1="Amber", default=0)
+    target.green = Helper._get_int_from_dict(dictionary, level1="Green", default=0)
+    target.trigger_stream_namelist = Helper._get_strlist_from_dict(dictionary, level1="Trigger", default=[])
+
+
+def make_task(index):
+    return {
+        "Title": f"Task {index}",
+        "Description": "Click Done when boiled",
+        "Steps": ["Pour the water into the Kettle", "Close lid", "Turn on"],
+        "Type": "Active" if index % 2 else "Background",
+        "DurationSeconds": 120,
+        "Green": 80,
+        "Amber": 120,
+        "Red": 150,
+        "CheckMessage": "Water Boiling?",
+        "CheckEverySeconds": 45,
+    }
+
+
+def make_recipe(number_of_tasks, tasks_per_stream=50):
+    streams = {}
+    for index in range(number_of_tasks):
+        stream = streams.setdefault(f"Stream_{index // tasks_per_stream}", {"Settings": {"Title": "Bench"}})
+        stream[f"Task_{index}"] = make_task(index)
+    return {
+        "Identity": {"Name": "Decoder benchmark"},
+        "GoStream": "Stream_0",
+        "PreFlight": {},
+        "PostFlight": {},
+        "Streams": streams,
+    }
+
+
+def best_of(function, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    number_of_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    task_dicts = [make_task(index) for index in range(number_of_tasks)]
+    target = Target()
+
+    helper_seconds = best_of(lambda: [helper_decode(target, d) for d in task_dicts])
+    decoder_seconds = best_of(lambda: [TASK_DECODER.decode(target, d) for d in task_dicts])
+    print(f"{number_of_tasks} task dictionaries")
+    print(f"  Helper lookups per field : {1000 * helper_seconds:8.2f}ms")
+    print(f"  TASK_DECODER single pass : {1000 * decoder_seconds:8.2f}ms  ({helper_seconds / decoder_seconds:.1f}x faster)")
+
+    task_seconds = best_of(lambda: [Task(f"Task_{i}", d, "Bench") for i, d in enumerate(task_dicts)])
+    print(f"  Task() construction      : {1000 * task_seconds:8.2f}ms")
+
+    def build_recipe():
+        w = WorkflowStream("benchmark", make_recipe(number_of_tasks))
+        w.build()
+    logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+    print(f"  WorkflowStream + build() : {1000 * best_of(build_recipe, repeat=3):8.2f}ms")
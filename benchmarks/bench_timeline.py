@@ -0,0 +1,61 @@
+"""
+Microbenchmark: "which tasks are running / which alerts fire between t1 and t2" from the Timeline index
+versus walking every Stream's task list (as the code had to before).
+The recipe has one GoStream task per Stream, each starting a Stream of short tasks, so most of the
+tasks are over long before any given window and only a few are in it.
+
+    python3 benchmarks/bench_timeline.py [number_of_streams]
+"""
+import os
+import sys
+import time
+import random
+import logging
+import contextlib
+import io
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from WorkflowStream import WorkflowStream
+
+logging.getLogger("WorkflowStream").setLevel(logging.ERROR)
+
+
+def make_recipe(number_of_streams, tasks_per_stream=20):
+    streams = {"Go": {f"Start_{index}": {"DurationSeconds": 60, "Trigger": [f"Side_{index}"]} for index in range(number_of_streams)}}
+    for index in range(number_of_streams):
+        streams[f"Side_{index}"] = {f"Task_{task}": {"DurationSeconds": 30 + task, "Red": 10} for task in range(tasks_per_stream)}
+    return {"Identity": {"Name": "Timeline benchmark"}, "GoStream": "Go", "PreFlight": {}, "PostFlight": {}, "Streams": streams}
+
+
+def walk_streams(w, timing, t1, t2):
+    found = []
+    for stream in w.stream_list:
+        task = stream.task_first
+        while task is not None:
+            start = timing.earliest_start.get(task.fullname)
+            if start is not None and start < t2 and timing.earliest_finish[task.fullname] > t1:
+                found.append(task)
+            task = task.task_next
+    return found
+
+
+if __name__ == "__main__":
+    number_of_streams = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with contextlib.redirect_stdout(io.StringIO()):
+        w = WorkflowStream("benchmark", make_recipe(number_of_streams))
+        w.build()
+    timing = w.timing()
+    start = time.perf_counter()
+    timeline = w.timeline()
+    print(f"{len(timeline)} tasks, {len(timeline.alerts)} alerts; index built in {1000 * (time.perf_counter() - start):.1f}ms")
+
+    windows = [(t1, t1 + 60) for t1 in (random.Random(0).randint(0, timeline.makespan) for _ in range(200))]
+    start = time.perf_counter()
+    indexed = [len(timeline.tasks_between(t1, t2)) + len(timeline.alerts_between(t1, t2)) for t1, t2 in windows]
+    index_seconds = (time.perf_counter() - start) / len(windows)
+    start = time.perf_counter()
+    walked = [len(walk_streams(w, timing, t1, t2)) for t1, t2 in windows[:20]]
+    walk_seconds = (time.perf_counter() - start) / 20
+    print(f"  timeline index : {1e6 * index_seconds:10.1f}us per 60s window (tasks + alerts), {sum(indexed) / len(indexed):.0f} answers on average")
+    print(f"  walking streams: {1e6 * walk_seconds:10.1f}us per 60s window (tasks only)")